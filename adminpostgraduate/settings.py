@@ -55,6 +55,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",  # Manejo de sesiones de usuario
     "django.contrib.messages",  # Sistema de mensajes de usuario
     "django.contrib.staticfiles",  # Manejo de archivos estáticos
+    "django.contrib.postgres",  # Búsquedas por trigramas (pg_trgm) y otros recursos de PostgreSQL
     "django_extensions",  # Extensiones útiles para Django
     "rest_framework",  # Django Rest Framework
     "drf_spectacular",  # Generación de esquemas OpenAPI para DRF
@@ -77,6 +78,8 @@ CORS_ALLOW_CREDENTIALS = True
 # solicitud antes de pasarla al siguiente middleware.
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",  # Seguridad de la aplicación
+    "main.middleware.CompressionMiddleware",  # Compresión zstd/brotli/gzip de las respuestas
+    "main.middleware.InvalidationBusMiddleware",  # Invalidación de cachés publicada por otros procesos
     "django.contrib.sessions.middleware.SessionMiddleware",  # Manejo de sesiones
     "django.middleware.common.CommonMiddleware",  # Funciones comunes como la redirección de URLs
     "django.middleware.csrf.CsrfViewMiddleware",  # Prevención de CSRF (Cross Site Request Forgery)
@@ -183,6 +186,41 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",  # Requiere que el usuario esté autenticado
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "main.renderers.FastJSONRenderer",  # JSON con orjson (o json estándar si no está instalado)
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "main.renderers.FastJSONParser",  # Lectura de cuerpos JSON con orjson
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+}
+
+##
+# @brief Configuración de la caché compartida de Django.
+#
+# Guarda las versiones de token de los usuarios, las versiones por tabla de los ETag y el bus de invalidación entre
+# procesos. Por defecto se usa la caché en memoria local, válida para desarrollo y pruebas con un solo proceso; con
+# varios workers debe configurarse un backend compartido, por ejemplo:
+# `CACHE_BACKEND=django.core.cache.backends.redis.RedisCache` y `CACHE_LOCATION=redis://127.0.0.1:6379/1`.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", "adminpostgraduate"),
+        "KEY_PREFIX": "adminpostgraduate",
+    }
+}
+
+##
+# @brief Configuración del bus de invalidación entre procesos.
+#
+# Cada proceso revisa en la caché compartida, como mucho una vez cada `POLL_INTERVAL` segundos, si otro proceso
+# modificó alguna tabla cacheada en memoria (catálogos, usuarios autenticados). Es el retraso máximo con el que
+# un proceso puede servir datos desactualizados. Requiere una caché compartida (`CACHES`).
+INVALIDATION_BUS = {
+    "POLL_INTERVAL": 1.0,  # Intervalo mínimo entre consultas a la caché compartida (segundos)
+    "EVENT_TTL": 600,  # Tiempo que se conservan los usuarios modificados publicados (segundos)
 }
 
 ##
@@ -200,3 +238,81 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": True,  # Invalida los tokens de refresco rotados
     "UPDATE_LAST_LOGIN": False,  # No actualiza la fecha del último acceso del usuario
 }
+
+##
+# @brief Configuración de la caché de usuarios autenticados.
+#
+# `CustomJWTAuthentication` guarda en memoria de cada proceso el usuario asociado a cada token de acceso, para no
+# consultar `datos_login` en cada solicitud. `TTL` (en segundos) nunca supera la expiración del propio token.
+PRINCIPAL_CACHE = {
+    "MAX_ENTRIES": 2048,  # Número máximo de tokens en caché por proceso
+    "TTL": 300,  # Tiempo de vida de cada entrada (5 minutos)
+}
+
+##
+# @brief Configuración de los catálogos en memoria de las tablas de referencia.
+#
+# `datos_maestria`, `roles`, `materias_pensum` y `Cohorte` se guardan completas en memoria de cada proceso
+# (ver `main/catalog.py`). Se invalidan con las señales de los modelos; `TTL` (en segundos) limita además cuánto
+# tiempo puede un proceso conservar una copia que otro proceso haya dejado desactualizada.
+CATALOG_CACHE = {
+    "TTL": 300,  # Tiempo de vida de cada catálogo (5 minutos)
+}
+
+##
+# @brief Configuración de las tareas de eliminación de usuarios en segundo plano.
+#
+# `/api/eliminar-usuarios/` con `"asincrono": true` crea una tarea que borra los usuarios y sus datos en bloques de
+# `CHUNK_SIZE` cédulas, cada uno en su propia transacción (ver `main/deletion.py`). Con `RUN_IN_THREAD` en falso
+# las tareas solo las procesa `python manage.py procesar_eliminaciones`.
+DELETION_JOBS = {
+    "CHUNK_SIZE": 500,  # Cédulas eliminadas por transacción
+    "RUN_IN_THREAD": os.getenv("DELETION_RUN_IN_THREAD", "True") == "True",  # Procesar en el proceso que recibe
+}
+
+##
+# @brief Configuración de las exportaciones a XLSX (ver `main/exports.py`).
+#
+# Los archivos se generan en un grupo de `WORKERS` procesos, separado de los que atienden solicitudes, y se
+# guardan en `DIRECTORY` durante `TTL` segundos; `procesar_exportaciones` elimina los vencidos. Requiere la
+# librería opcional `openpyxl`.
+EXPORT_JOBS = {
+    "DIRECTORY": os.getenv("EXPORT_DIRECTORY", str(BASE_DIR / "exports")),
+    "WORKERS": 2,  # Procesos que generan archivos en paralelo
+    "TTL": 24 * 60 * 60,  # Tiempo que se conserva cada archivo (1 día)
+}
+
+##
+# @brief Escala de calificaciones de `listado_estudiantes.nota` (ver `main/grades.py`).
+GRADES = {
+    "MIN": 0,
+    "MAX": 20,
+    "PASSING": 15,  # Nota mínima aprobatoria
+}
+
+##
+# @brief Autenticación sin estado basada solo en los claims del token.
+#
+# Si está activo, `CustomJWTAuthentication` construye el usuario con la cédula y el tipo de usuario incluidos en el
+# token al iniciar sesión, sin consultar `datos_login`. Los tokens se revocan incrementando la versión del usuario,
+# que se comprueba contra la caché compartida de Django (`CACHES`).
+JWT_STATELESS_AUTH = os.getenv("JWT_STATELESS_AUTH", "False") == "True"
+
+##
+# @brief Configuración de las respuestas transmitidas por partes.
+#
+# Número de filas que se leen por cada vuelta del cursor del lado del servidor y que se emiten por bloque cuando un
+# listado se solicita con `stream=1`.
+STREAMING_CHUNK_SIZE = 2000
+
+##
+# @brief Configuración de la compresión de respuestas.
+#
+# `CompressionMiddleware` elige la primera codificación de `ENCODINGS` que acepte el cliente; zstd y brotli solo se
+# usan si están instaladas las librerías `zstandard` y `brotli`. Las respuestas menores que `MIN_SIZE` bytes se
+# envían sin comprimir.
+RESPONSE_COMPRESSION = {
+    "MIN_SIZE": 1024,  # Tamaño mínimo (en bytes) para comprimir una respuesta
+    "ENCODINGS": ["zstd", "br", "gzip"],  # Orden de preferencia del servidor
+    "LEVELS": {"zstd": 3, "br": 4, "gzip": 6},  # Niveles rápidos, adecuados para respuestas dinámicas
+}
@@ -23,3 +23,13 @@ class MainConfig(AppConfig):
 
     default_auto_field = 'django.db.models.BigAutoField'  # Definir el campo automático por defecto como BigAutoField
     name = 'main'  # Nombre de la aplicación Django
+
+    def ready(self):
+        """
+        @brief Registra los receptores de señales y las verificaciones de sistema de la aplicación y construye el
+        índice de permisos de las rutas.
+        """
+        from . import checks, signals  # noqa: F401
+        from .route_permissions import route_index
+
+        route_index.build()
@@ -13,11 +13,38 @@
 # @see `rest_framework_simplejwt`
 #
 
+import time
+
+from django.conf import settings
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
-from .models import datos_login
-from rest_framework_simplejwt.tokens import AccessToken
-from rest_framework.permissions import AllowAny
+from .cache import (
+    TOKEN_VERSION_DELETED, get_token_version, principal_cache, set_token_version
+)
+from .models import datos_login, roles
+from . import route_permissions
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+
+def generar_tokens(user):
+    """
+    @brief Emite el par de tokens (acceso y refresco) para un registro de `datos_login`.
+
+    Además del `user_id`, los tokens incluyen la cédula, el tipo de usuario y la versión de token vigente,
+    de modo que `CustomJWTAuthentication` pueda construir el usuario sin consultar la base de datos.
+
+    @param user Registro de `datos_login` autenticado.
+
+    @return dict: Diccionario con las claves `access` y `refresh`.
+    """
+    refresh = RefreshToken.for_user(user)
+    refresh['cedula_usuario'] = user.cedula_usuario_id
+    refresh['tipo_usuario'] = user.tipo_usuario_id
+    refresh['ver'] = user.version_token
+    return {
+        "access": str(refresh.access_token),
+        "refresh": str(refresh),
+    }
 
 
 class CustomJWTAuthentication(BaseAuthentication):
@@ -28,6 +55,9 @@ class CustomJWTAuthentication(BaseAuthentication):
     autenticación personalizada utilizando el esquema de token Bearer. El token debe estar incluido
     en el encabezado `Authorization` de la solicitud. Se valida el token, se extrae el payload y 
     se obtiene el usuario correspondiente.
+
+    Si `JWT_STATELESS_AUTH` está activo, el usuario se construye solo a partir de los claims del token
+    y únicamente se comprueba su versión contra la caché compartida.
     
     @throws AuthenticationFailed Si el token no es válido o el usuario no existe.
     """
@@ -76,21 +106,91 @@ class CustomJWTAuthentication(BaseAuthentication):
             raise AuthenticationFailed(f'Invalid token: {str(e)}')
 
         # Usar el payload del token para obtener el usuario correspondiente
+        if getattr(settings, 'JWT_STATELESS_AUTH', False) and 'tipo_usuario' in payload:
+            user = self.get_stateless_user(payload)
+        else:
+            user = self.get_user(payload)
+
+        # Si la autenticación es exitosa, devolver el usuario y el token
+        return (user, token)
+
+    def get_user(self, payload):
+        """
+        @brief Obtiene el registro de `datos_login` asociado al token, consultando primero la caché del proceso.
+
+        Las entradas se indexan por el `jti` del token y nunca viven más allá de la expiración del mismo.
+        Si el usuario no está en caché, se consulta la base de datos (incluyendo su rol) y se guarda.
+
+        @param payload Token de acceso ya validado.
+
+        @return datos_login: Usuario autenticado.
+
+        @throws AuthenticationFailed Si el usuario asociado al token no existe.
+        """
+        user_id = payload['user_id']
+        key = payload.get('jti') or f'user:{user_id}'
+
+        user = principal_cache.get(key)
+        if user is not None:
+            return user
+
         try:
-            user = datos_login.objects.get(id=payload['user_id'])
-            
+            user = datos_login.objects.select_related('tipo_usuario').get(id=user_id)
         except datos_login.DoesNotExist:
             # Si no se encuentra el usuario asociado al token, lanzar una excepción
             raise AuthenticationFailed('User not found')
 
-        # Si la autenticación es exitosa, devolver el usuario y el token
-        return (user, token)
-    def has_allow_any_permission(self, request):   
-        # Acceder a la vista actual
-        view = request.resolver_match.func  # Esto puede variar según tu configuración
-        
-        # Obtener los permisos aplicados a la vista
-        permissions = getattr(view, 'permission_classes', [])
-        
-        # Comprobar si AllowAny está en los permisos
-        return AllowAny in permissions
+        if payload.get('ver', user.version_token) != user.version_token:
+            raise AuthenticationFailed('Token revoked')
+
+        # El TTL de la entrada nunca supera el tiempo de vida restante del token
+        principal_cache.set(key, user, ttl=payload['exp'] - time.time())
+        return user
+
+    def get_stateless_user(self, payload):
+        """
+        @brief Construye el usuario a partir de los claims del token, sin consultar `datos_login`.
+
+        Solo se verifica que la versión del token coincida con la versión vigente del usuario. La versión se
+        lee de la caché compartida y, si no está, se carga una única vez desde la base de datos.
+
+        @param payload Token de acceso ya validado.
+
+        @return datos_login: Instancia no persistida con el id, la cédula y el rol del usuario.
+
+        @throws AuthenticationFailed Si el token fue revocado o el usuario ya no existe.
+        """
+        user_id = payload['user_id']
+
+        version = get_token_version(user_id)
+        if version is None:
+            version = datos_login.objects.filter(id=user_id).values_list(
+                'version_token', flat=True
+            ).first()
+            if version is None:
+                version = TOKEN_VERSION_DELETED
+            set_token_version(user_id, version)
+
+        if version == TOKEN_VERSION_DELETED:
+            raise AuthenticationFailed('User not found')
+        if payload.get('ver', 0) != version:
+            raise AuthenticationFailed('Token revoked')
+
+        return datos_login(
+            id=user_id,
+            cedula_usuario_id=payload['cedula_usuario'],
+            tipo_usuario=roles(codigo_rol=payload['tipo_usuario']),
+            version_token=version,
+        )
+
+    def has_allow_any_permission(self, request):
+        """
+        @brief Indica si la vista resuelta para la solicitud puede usarse sin token con su método HTTP.
+
+        Consulta el índice precalculado de `main/route_permissions.py`, por lo que no inspecciona la vista
+        en cada solicitud.
+        """
+        match = request.resolver_match
+        if match is None:
+            return False
+        return route_permissions.route_index.is_public(match.func, request.method)
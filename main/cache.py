@@ -0,0 +1,200 @@
+##
+# @file cache.py
+# @brief Cachés en memoria del proceso utilizadas por la API.
+#
+# Este archivo contiene una caché acotada con expiración por entrada (TTL) y política de reemplazo LRU,
+# junto con la instancia que guarda los usuarios autenticados (`datos_login`) asociados a cada token JWT.
+# Las cachés son locales a cada proceso (worker) y protegen su estado con un candado, por lo que pueden
+# usarse desde servidores con varios hilos.
+#
+# También contiene el registro de versiones de token por usuario, que se guarda en la caché compartida de
+# Django (`CACHES`) para que todos los procesos vean la misma versión al revocar tokens, y
+# `shared_cache_configured`, que indica si esa caché realmente se comparte entre procesos.
+#
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+class TTLCache:
+    """
+    @brief Caché acotada en memoria con expiración por entrada y reemplazo LRU.
+
+    Cada entrada guarda su instante de expiración. Cuando la caché alcanza `max_entries`, se descarta la
+    entrada usada hace más tiempo. Lleva contadores de aciertos, fallos y descartes para poder exponerlos.
+    """
+
+    def __init__(self, max_entries=1024, ttl=300):
+        """
+        @brief Inicializa la caché.
+        @param max_entries Número máximo de entradas que se mantienen en memoria.
+        @param ttl Tiempo de vida por defecto de una entrada, en segundos.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        @brief Devuelve el valor asociado a `key`, o None si no existe o ya expiró.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        """
+        @brief Guarda `value` bajo `key` durante `ttl` segundos (o el TTL por defecto).
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        """
+        @brief Elimina la entrada `key` si existe.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_where(self, predicate):
+        """
+        @brief Elimina todas las entradas cuyo valor cumple `predicate`.
+        @return Número de entradas eliminadas.
+        """
+        with self._lock:
+            keys = [key for key, (_, value) in self._data.items() if predicate(value)]
+            for key in keys:
+                del self._data[key]
+        return len(keys)
+
+    def clear(self):
+        """
+        @brief Vacía la caché sin reiniciar los contadores.
+        """
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """
+        @brief Devuelve los contadores de la caché en un diccionario serializable.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class PrincipalCache(TTLCache):
+    """
+    @brief Caché de usuarios autenticados indexada por el `jti` del token de acceso.
+
+    Evita consultar `datos_login` en cada solicitud autenticada. Las entradas se invalidan cuando el registro
+    de `datos_login` correspondiente se modifica o se elimina (ver `main/signals.py`).
+    """
+
+    def invalidate_user(self, user_id):
+        """
+        @brief Elimina todas las entradas que pertenecen al usuario `user_id` (clave de `datos_login`).
+        """
+        return self.delete_where(lambda user: user.pk == user_id)
+
+    def invalidate_users(self, user_ids):
+        """
+        @brief Elimina las entradas de los usuarios `user_ids`; con None vacía la caché completa.
+        """
+        if user_ids is None:
+            self.clear()
+            return
+        user_ids = set(user_ids)
+        self.delete_where(lambda user: user.pk in user_ids)
+
+
+_principal_settings = getattr(settings, "PRINCIPAL_CACHE", {})
+
+## @brief Caché de usuarios autenticados compartida por `CustomJWTAuthentication`.
+principal_cache = PrincipalCache(
+    max_entries=_principal_settings.get("MAX_ENTRIES", 2048),
+    ttl=_principal_settings.get("TTL", 300),
+)
+
+
+def shared_cache_configured():
+    """
+    @brief Indica si la caché `default` de Django se comparte entre procesos.
+
+    `LocMemCache` vive en la memoria de cada proceso y `DummyCache` no guarda nada, así que con ellas cada
+    worker tendría su propia copia de los datos que deben ser comunes.
+    """
+    return not isinstance(caches["default"], (LocMemCache, DummyCache))
+
+
+## @brief Versión que se guarda para los usuarios eliminados; ningún token la contiene.
+TOKEN_VERSION_DELETED = -1
+
+
+def _token_version_key(user_id):
+    return f"token_version:{user_id}"
+
+
+def get_token_version(user_id):
+    """
+    @brief Devuelve la versión de token vigente del usuario `user_id` según la caché compartida.
+    @return int o None si la versión no está en caché.
+    """
+    return cache.get(_token_version_key(user_id))
+
+
+def set_token_version(user_id, version):
+    """
+    @brief Publica en la caché compartida la versión de token vigente del usuario `user_id`.
+    """
+    cache.set(_token_version_key(user_id), version, timeout=None)
+
+
+def set_token_versions(versions):
+    """
+    @brief Publica con una sola escritura las versiones de token de varios usuarios.
+    @param versions Diccionario clave de `datos_login` -> versión vigente.
+    """
+    cache.set_many({_token_version_key(user_id): version for user_id, version in versions.items()}, timeout=None)
+
+
+def revoke_token_versions(user_ids):
+    """
+    @brief Marca como eliminados a los usuarios `user_ids` en la caché compartida, revocando todos sus tokens.
+
+    Equivale a `set_token_version(user_id, TOKEN_VERSION_DELETED)` para cada usuario, con una sola escritura.
+    """
+    set_token_versions(dict.fromkeys(user_ids, TOKEN_VERSION_DELETED))
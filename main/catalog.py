@@ -0,0 +1,177 @@
+##
+# @file catalog.py
+# @brief Catálogos en memoria de las tablas de referencia.
+#
+# Las tablas `datos_maestria`, `roles`, `materias_pensum` y `Cohorte` son pequeñas, cambian poco y se consultan en
+# casi todas las solicitudes. Cada `Catalog` carga su tabla completa una sola vez por proceso y responde las
+# búsquedas por clave primaria (y por los índices secundarios declarados) desde diccionarios en memoria.
+#
+# Los catálogos se invalidan con las señales `post_save` y `post_delete` de los modelos involucrados (ver
+# `main/signals.py`) y, como protección, expiran tras `CATALOG_CACHE["TTL"]` segundos.
+#
+# Las instancias devueltas son compartidas entre solicitudes: se pueden usar como valores de claves foráneas o para
+# serializar, pero no deben modificarse.
+#
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+
+from .models import Cohorte, datos_maestria, materias_pensum, roles
+
+
+class Catalog:
+    """
+    @brief Copia en memoria de una tabla de referencia con búsquedas O(1) por clave.
+
+    La tabla se carga completa en la primera consulta. `invalidate` descarta la copia y la siguiente consulta la
+    vuelve a cargar; una carga que estuviera en curso al invalidar no se guarda, para no conservar datos viejos.
+    """
+
+    def __init__(self, model, index_by=(), select_related=(), depends_on=(), ttl=300):
+        """
+        @brief Inicializa el catálogo.
+        @param model Modelo de la tabla de referencia.
+        @param index_by Atributos (por ejemplo, `cod_maestria_id`) por los que se construye un índice secundario.
+        @param select_related Relaciones que se cargan junto con cada fila.
+        @param depends_on Otros modelos cuyos cambios también invalidan el catálogo.
+        @param ttl Tiempo máximo de vida de la copia, en segundos.
+        """
+        self.model = model
+        self.index_by = tuple(index_by)
+        self.select_related = tuple(select_related)
+        self.depends_on = tuple(depends_on)
+        self.ttl = ttl
+        self._rows = None
+        self._indexes = {}
+        self._expires_at = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+
+    def _data(self):
+        now = time.monotonic()
+        rows = self._rows
+        if rows is not None and self._expires_at > now:
+            self.hits += 1
+            return rows, self._indexes
+        self.misses += 1
+        return self._load(now)
+
+    def _load(self, now):
+        with self._lock:
+            if self._rows is not None and self._expires_at > now:
+                return self._rows, self._indexes
+            generation = self._generation
+            queryset = self.model.objects.all()
+            if self.select_related:
+                queryset = queryset.select_related(*self.select_related)
+            rows = {obj.pk: obj for obj in queryset}
+            indexes = {attr: {} for attr in self.index_by}
+            for obj in rows.values():
+                for attr, index in indexes.items():
+                    index.setdefault(getattr(obj, attr), []).append(obj)
+            self.loads += 1
+            if generation == self._generation:
+                self._rows, self._indexes = rows, indexes
+                self._expires_at = now + self.ttl
+            return rows, indexes
+
+    def _coerce_pk(self, pk):
+        try:
+            return self.model._meta.pk.to_python(pk)
+        except ValidationError:
+            return None
+
+    def get(self, pk, default=None):
+        """
+        @brief Devuelve la fila con clave primaria `pk`, o `default` si no existe.
+
+        La clave se convierte al tipo de la columna, de modo que `"3"` y `3` encuentran el mismo rol.
+        """
+        rows, _ = self._data()
+        pk = self._coerce_pk(pk)
+        if pk is None:
+            return default
+        return rows.get(pk, default)
+
+    def exists(self, pk):
+        """
+        @brief Indica si existe una fila con clave primaria `pk`.
+        """
+        return self.get(pk) is not None
+
+    def filter_by(self, attr, value):
+        """
+        @brief Devuelve las filas cuyo atributo indexado `attr` vale `value`, en el orden de la tabla.
+        """
+        _, indexes = self._data()
+        return list(indexes[attr].get(value, ()))
+
+    def all(self):
+        """
+        @brief Devuelve todas las filas del catálogo.
+        """
+        rows, _ = self._data()
+        return list(rows.values())
+
+    def invalidate(self, **kwargs):
+        """
+        @brief Descarta la copia en memoria; acepta los argumentos de una señal para usarse como receptor.
+        """
+        with self._lock:
+            self._generation += 1
+            self._rows = None
+            self._indexes = {}
+
+    def stats(self):
+        """
+        @brief Devuelve los contadores del catálogo en un diccionario serializable.
+        """
+        rows = self._rows
+        return {
+            "entries": len(rows) if rows is not None else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "loads": self.loads,
+        }
+
+
+_catalog_ttl = getattr(settings, "CATALOG_CACHE", {}).get("TTL", 300)
+
+## @brief Catálogo de maestrías (`datos_maestria`), por `cod_maestria`.
+maestria_catalog = Catalog(datos_maestria, ttl=_catalog_ttl)
+
+## @brief Catálogo de roles de usuario, por `codigo_rol`.
+role_catalog = Catalog(roles, ttl=_catalog_ttl)
+
+## @brief Catálogo de materias del pensum, por `cod_materia` y por maestría (`cod_maestria_id`).
+materia_catalog = Catalog(
+    materias_pensum,
+    index_by=("cod_maestria_id",),
+    select_related=("cod_maestria",),
+    depends_on=(datos_maestria,),
+    ttl=_catalog_ttl,
+)
+
+## @brief Catálogo de cohortes, por `codigo_cohorte`.
+cohorte_catalog = Catalog(Cohorte, ttl=_catalog_ttl)
+
+## @brief Catálogos registrados, indexados por el nombre con el que se exponen sus estadísticas.
+CATALOGS = {
+    "maestrias": maestria_catalog,
+    "roles": role_catalog,
+    "materias": materia_catalog,
+    "cohortes": cohorte_catalog,
+}
+
+
+def catalog_stats():
+    """
+    @brief Devuelve las estadísticas de todos los catálogos.
+    """
+    return {name: catalog.stats() for name, catalog in CATALOGS.items()}
@@ -0,0 +1,35 @@
+##
+# @file checks.py
+# @brief Verificaciones de sistema (`manage.py check`) propias de la aplicación "main".
+#
+# Los receptores se registran al cargar la aplicación desde `MainConfig.ready`.
+#
+# @see Django Docs: https://docs.djangoproject.com/en/stable/topics/checks/
+#
+
+from django.core.checks import Tags, Warning, register
+
+from .cache import shared_cache_configured
+
+
+@register(Tags.caches, deploy=True)
+def verificar_cache_compartida(app_configs, **kwargs):
+    """
+    @brief Advierte si la caché `default` no se comparte entre procesos.
+
+    Sin una caché compartida los listados no envían ETag (ver `main/table_versions.py`) y el bus de
+    invalidación no avisa a los demás procesos (ver `main/invalidation.py`).
+    """
+    if shared_cache_configured():
+        return []
+    return [
+        Warning(
+            "La caché 'default' no se comparte entre procesos.",
+            hint=(
+                "Configure CACHE_BACKEND con Redis, Memcached, la base de datos o archivos; "
+                "mientras tanto los listados no envían ETag y los demás procesos no se enteran de los "
+                "cambios de usuarios, roles ni catálogos."
+            ),
+            id="main.W001",
+        )
+    ]
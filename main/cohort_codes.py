@@ -0,0 +1,125 @@
+##
+# @file cohort_codes.py
+# @brief Asignación de códigos de cohorte sin colisiones.
+#
+# Los códigos tienen la forma `<prefijo><letras>-<año>`, por ejemplo `GG-BAR-A-2024`, donde las letras numeran
+# las cohortes de un mismo prefijo y año. Pasada la `Z` se continúa con `AA`, `AB`, ..., como en las columnas de
+# una hoja de cálculo.
+#
+# `next_free_code` obtiene con una sola consulta todos los códigos existentes del prefijo y año y devuelve el
+# primero libre a partir del solicitado. `create_cohort` además toma un bloqueo consultivo de PostgreSQL por
+# prefijo y año (`pg_advisory_xact_lock`) hasta el final de la transacción, de modo que dos administradores que
+# crean cohortes a la vez no eligen el mismo código; en otras bases de datos, o si aun así el código ya existe,
+# se reintenta con el siguiente.
+#
+
+import re
+
+from django.db import IntegrityError, connection, transaction
+
+from .models import Cohorte
+
+## @brief Formato de un código de cohorte: prefijo, letras y año.
+CODE_RE = re.compile(r"^(?P<prefix>(?:.*[^A-Z])?)(?P<letters>[A-Z]+)-(?P<year>\d{4})$")
+
+## @brief Intentos de inserción antes de desistir cuando el código elegido ya existe.
+MAX_ATTEMPTS = 5
+
+
+def letters_to_number(letters):
+    """
+    @brief Convierte las letras de un código en su número de orden (`A` = 1, `Z` = 26, `AA` = 27, ...).
+    """
+    number = 0
+    for letter in letters:
+        number = number * 26 + ord(letter) - ord("A") + 1
+    return number
+
+
+def number_to_letters(number):
+    """
+    @brief Convierte un número de orden (desde 1) en las letras del código.
+    """
+    letters = []
+    while number > 0:
+        number, rest = divmod(number - 1, 26)
+        letters.append(chr(ord("A") + rest))
+    return "".join(reversed(letters))
+
+
+def parse_code(code):
+    """
+    @brief Separa un código de cohorte en (prefijo, número de orden, año).
+
+    @throws ValueError Si el código no tiene la forma `<prefijo><letras>-<año>`.
+    """
+    match = CODE_RE.match(code)
+    if match is None:
+        raise ValueError(f"Código de cohorte con formato inválido: {code}")
+    return match["prefix"], letters_to_number(match["letters"]), match["year"]
+
+
+def format_code(prefix, number, year):
+    """
+    @brief Construye el código de cohorte a partir de sus partes.
+    """
+    return f"{prefix}{number_to_letters(number)}-{year}"
+
+
+def next_free_code(code):
+    """
+    @brief Devuelve `code` si está libre o, si no, el primer código libre posterior con el mismo prefijo y año.
+
+    @throws ValueError Si el código ya existe y no tiene un formato que permita calcular el siguiente.
+    """
+    try:
+        prefix, number, year = parse_code(code)
+    except ValueError:
+        if Cohorte.objects.filter(codigo_cohorte=code).exists():
+            raise
+        return code
+
+    used = set()
+    for existing in Cohorte.objects.filter(
+        codigo_cohorte__startswith=prefix, codigo_cohorte__endswith=f"-{year}"
+    ).values_list("codigo_cohorte", flat=True):
+        match = CODE_RE.match(existing)
+        if match is not None and match["prefix"] == prefix:
+            used.add(letters_to_number(match["letters"]))
+    while number in used:
+        number += 1
+    return format_code(prefix, number, year)
+
+
+def _lock_code_family(code):
+    # Bloqueo consultivo por prefijo y año, liberado automáticamente al terminar la transacción
+    if connection.vendor != "postgresql":
+        return
+    try:
+        prefix, _, year = parse_code(code)
+        key = f"cohorte:{prefix}{year}"
+    except ValueError:
+        key = f"cohorte:{code}"
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", [key])
+
+
+def create_cohort(codigo_cohorte, **fields):
+    """
+    @brief Crea una cohorte con el primer código libre a partir de `codigo_cohorte`.
+
+    @param codigo_cohorte Código solicitado.
+    @param fields Resto de los campos de `Cohorte`.
+    @return Cohorte: La cohorte creada; su código puede diferir del solicitado.
+    @throws ValueError Si el código solicitado no tiene un formato válido y ya existe.
+    @throws IntegrityError Si tras `MAX_ATTEMPTS` intentos no se pudo insertar.
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                _lock_code_family(codigo_cohorte)
+                code = next_free_code(codigo_cohorte)
+                return Cohorte.objects.create(codigo_cohorte=code, **fields)
+        except IntegrityError:
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
@@ -0,0 +1,197 @@
+##
+# @file deletion.py
+# @brief Eliminación de usuarios por bloques en segundo plano.
+#
+# Eliminar un registro de `Datos_basicos` con `QuerySet.delete()` hace que el recolector de Django cargue en
+# memoria todas las filas relacionadas (`estudiante_datos`, `datos_login`, `listado_estudiantes`, `tabla_pagos`,
+# `tabla_solicitudes`, `profesores`, `PlanificacionProfesor`, ...) para enviar sus señales antes de borrarlas. Con
+# una cohorte completa eso bloquea las tablas durante minutos.
+#
+# Aquí la cascada se resuelve en la base de datos: `cascade_plan` recorre las relaciones `on_delete=CASCADE` del
+# modelo y genera, para cada tabla dependiente, un `DELETE ... WHERE clave IN (SELECT ...)` explícito que se
+# ejecuta antes que el de la tabla padre. Cada bloque de `DELETION_JOBS["CHUNK_SIZE"]` cédulas se elimina en su
+# propia transacción, junto con el avance de la tarea (`TareaEliminacion`), de modo que los bloqueos duran poco y
+# una tarea interrumpida se reanuda donde quedó. La fila de la tarea se bloquea en cada bloque, así que un
+# proceso que reanuda la tarea nunca procesa el mismo bloque que otro.
+#
+# Con `DELETION_JOBS["RUN_IN_THREAD"]` las tareas se procesan en un hilo del proceso que las recibió; si no, quedan
+# pendientes para `procesar_eliminaciones`, que puede ejecutarse como proceso de trabajo aparte.
+#
+# Como no se envían señales, al confirmar cada bloque se hace explícitamente lo que harían los receptores de
+# `main/signals.py`: revocar los tokens de los usuarios eliminados y cambiar la versión de las tablas afectadas,
+# lo que también invalida las cachés de los demás procesos a través del bus de invalidación.
+#
+# @see `main/management/commands/procesar_eliminaciones.py`
+#
+
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from .cache import principal_cache, revoke_token_versions
+from .invalidation import invalidation_bus
+from .models import Datos_basicos, TareaEliminacion, datos_login
+from .table_versions import bump_table_version
+
+logger = logging.getLogger(__name__)
+
+_deletion_settings = getattr(settings, "DELETION_JOBS", {})
+
+## @brief Cédulas que se eliminan por transacción.
+CHUNK_SIZE = _deletion_settings.get("CHUNK_SIZE", 500)
+
+## @brief Si las tareas se procesan en un hilo del proceso que las crea.
+RUN_IN_THREAD = _deletion_settings.get("RUN_IN_THREAD", True)
+
+
+def cascade_plan(queryset):
+    """
+    @brief Devuelve los querysets a eliminar para borrar `queryset` con su cascada, de las hojas a la raíz.
+
+    Cada tabla dependiente se filtra con una subconsulta sobre su padre, por lo que ninguna fila se carga en
+    memoria. Una tabla puede aparecer más de una vez si se alcanza por varios caminos.
+
+    @throws ValueError Si alguna relación no es `CASCADE` o `DO_NOTHING`; esos casos requieren `QuerySet.delete()`.
+    """
+    plan = []
+    for rel in queryset.model._meta.related_objects:
+        if rel.on_delete is models.DO_NOTHING:
+            continue
+        if rel.on_delete is not models.CASCADE or rel.many_to_many:
+            raise ValueError(f"{rel.related_model.__name__}.{rel.field.name} no se elimina en cascada.")
+        children = rel.related_model._base_manager.filter(
+            **{f"{rel.field.name}__in": queryset.values(rel.field.target_field.attname)}
+        )
+        plan.extend(cascade_plan(children))
+    plan.append(queryset)
+    return plan
+
+
+def delete_rows(queryset):
+    """
+    @brief Ejecuta un único `DELETE` de las filas de `queryset`, sin cargarlas ni enviar señales.
+
+    @return int: Filas eliminadas.
+    """
+    model = queryset.model
+    select, params = queryset.values_list("pk").query.sql_with_params()
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {quote(model._meta.db_table)} WHERE {quote(model._meta.pk.column)} IN ({select})",
+            params,
+        )
+        return cursor.rowcount
+
+
+def delete_users(cedulas):
+    """
+    @brief Elimina los usuarios `cedulas` y sus filas dependientes sin cargarlas en memoria.
+
+    Debe ejecutarse dentro de una transacción; los tokens y las versiones se publican al confirmarla.
+
+    @return dict: Nombre de la tabla -> filas eliminadas.
+    """
+    logins = set(
+        datos_login._base_manager.filter(cedula_usuario__in=cedulas).values_list("pk", flat=True)
+    )
+    plan = cascade_plan(Datos_basicos._base_manager.filter(cedula__in=cedulas))
+    detalle = {}
+    for step in plan:
+        count = delete_rows(step)
+        if count:
+            label = step.model._meta.label_lower
+            detalle[label] = detalle.get(label, 0) + count
+
+    touched = tuple(dict.fromkeys(step.model for step in plan))
+
+    def publish():
+        revoke_token_versions(logins)
+        principal_cache.invalidate_users(logins)
+        invalidation_bus.publish_keys(datos_login, logins)
+        bump_table_version(*touched)
+
+    transaction.on_commit(publish)
+    return detalle
+
+
+def run_job(tarea_id, resume=False):
+    """
+    @brief Procesa la tarea `tarea_id` por bloques hasta terminarla.
+
+    Solo la toma si está pendiente (o en proceso, con `resume`). Aunque dos procesos reanuden la misma tarea,
+    cada bloque se elimina una sola vez (ver `process_chunk`).
+
+    @return bool: Si la tarea se procesó.
+    """
+    estados = [TareaEliminacion.PENDIENTE]
+    if resume:
+        estados.append(TareaEliminacion.EN_PROCESO)
+    if not TareaEliminacion.objects.filter(pk=tarea_id, estado__in=estados).update(
+        estado=TareaEliminacion.EN_PROCESO
+    ):
+        return False
+
+    try:
+        while process_chunk(tarea_id):
+            pass
+        TareaEliminacion.objects.filter(pk=tarea_id, estado=TareaEliminacion.EN_PROCESO).update(
+            estado=TareaEliminacion.COMPLETADA, fecha_actualizacion=timezone.now()
+        )
+    except Exception as e:
+        logger.exception("Falló la tarea de eliminación %s", tarea_id)
+        TareaEliminacion.objects.filter(pk=tarea_id).update(estado=TareaEliminacion.FALLIDA, error=str(e))
+    return True
+
+
+def process_chunk(tarea_id):
+    """
+    @brief Elimina el siguiente bloque de la tarea `tarea_id` y guarda su avance en la misma transacción.
+
+    La fila de la tarea se bloquea mientras tanto, de modo que dos procesos no eliminan el mismo bloque.
+
+    @return bool: Si quedan cédulas por procesar.
+    """
+    with transaction.atomic():
+        tarea = TareaEliminacion.objects.select_for_update().get(pk=tarea_id)
+        if tarea.estado != TareaEliminacion.EN_PROCESO:
+            return False
+        bloque = tarea.cedulas[tarea.procesados:tarea.procesados + CHUNK_SIZE]
+        if not bloque:
+            return False
+        detalle = delete_users(bloque)
+        tarea.procesados += len(bloque)
+        tarea.eliminados += detalle.get(Datos_basicos._meta.label_lower, 0)
+        for label, count in detalle.items():
+            tarea.detalle[label] = tarea.detalle.get(label, 0) + count
+        tarea.save(update_fields=["procesados", "eliminados", "detalle", "fecha_actualizacion"])
+        return tarea.procesados < len(tarea.cedulas)
+
+
+def _run_in_thread(tarea_id):
+    try:
+        run_job(tarea_id)
+    finally:
+        # El hilo tiene su propia conexión, que Django no cierra al terminar una solicitud
+        connection.close()
+
+
+def start_job(cedulas):
+    """
+    @brief Crea una tarea de eliminación y, con `RUN_IN_THREAD`, la procesa en un hilo al confirmar la transacción.
+
+    El hilo no es de tipo daemon: al apagar el proceso se espera a que termine la tarea en lugar de cortarla.
+
+    @return TareaEliminacion: La tarea creada, en estado pendiente.
+    """
+    tarea = TareaEliminacion.objects.create(cedulas=list(dict.fromkeys(cedulas)))
+    if RUN_IN_THREAD:
+        transaction.on_commit(
+            lambda: threading.Thread(
+                target=_run_in_thread, args=(tarea.pk,), name=f"eliminacion-{tarea.pk}"
+            ).start()
+        )
+    return tarea
@@ -0,0 +1,112 @@
+##
+# @file enrollment.py
+# @brief Inscripción en lote de estudiantes en una materia de una cohorte.
+#
+# `listado_estudiantes` guarda, además de las claves, copias del nombre del estudiante, del nombre de la materia y
+# de los datos del profesor. `enroll_students` inscribe una sección completa con un único
+# `INSERT ... SELECT ... ON CONFLICT DO NOTHING`: el `SELECT` une los estudiantes de `Datos_basicos` con la materia
+# de `materias_pensum` para completar esas columnas, y la restricción única (estudiante, materia, cohorte) hace
+# que las inscripciones repetidas se ignoren en lugar de duplicarse. `RETURNING` indica qué estudiantes se
+# inscribieron realmente.
+#
+
+from dataclasses import dataclass, field
+
+from django.db import connection, transaction
+
+from .models import AsignarProfesorMateria, Datos_basicos, PlanificacionProfesor, listado_estudiantes, materias_pensum
+from .table_versions import bump_table_version
+
+
+@dataclass
+class EnrollmentResult:
+    """
+    @brief Resultado de una inscripción en lote.
+    """
+
+    inscritos: list = field(default_factory=list)
+    ya_inscritos: list = field(default_factory=list)
+    no_encontrados: list = field(default_factory=list)
+
+    def as_dict(self):
+        """
+        @brief Devuelve el resultado en un diccionario serializable.
+        """
+        return {
+            "inscritos": self.inscritos,
+            "ya_inscritos": self.ya_inscritos,
+            "no_encontrados": self.no_encontrados,
+        }
+
+
+def find_teacher(cod_materia, codigo_cohorte, cedula_profesor=None):
+    """
+    @brief Busca el profesor de la materia en la cohorte.
+
+    Se usa la planificación del profesor (que además identifica `codplanificacion`) y, si no existe, la asignación
+    de `AsignarProfesorMateria`. Con `cedula_profesor` solo se acepta ese profesor.
+
+    @return tuple: (cédula, nombre, apellido, codplanificacion) o None si la materia no tiene profesor.
+    """
+    filtros = {"cod_materia": cod_materia, "codigo_cohorte": codigo_cohorte, "cedula_profesor__isnull": False}
+    if cedula_profesor:
+        filtros["cedula_profesor"] = cedula_profesor
+
+    planificacion = (
+        PlanificacionProfesor.objects.filter(**filtros)
+        .values_list("cedula_profesor", "cedula_profesor__nombre", "cedula_profesor__apellido", "codplanificacion")
+        .order_by("codplanificacion")
+        .first()
+    )
+    if planificacion is not None:
+        return planificacion
+    asignacion = (
+        AsignarProfesorMateria.objects.filter(**filtros)
+        .values_list("cedula_profesor", "cedula_profesor__nombre", "cedula_profesor__apellido")
+        .order_by("-id")
+        .first()
+    )
+    return None if asignacion is None else (*asignacion, None)
+
+
+def enroll_students(codigo_cohorte, cod_materia, cedulas, profesor):
+    """
+    @brief Inscribe a los estudiantes `cedulas` en la materia `cod_materia` de la cohorte `codigo_cohorte`.
+
+    @param profesor Tupla (cédula, nombre, apellido, codplanificacion) devuelta por `find_teacher`.
+    @return EnrollmentResult: Cédulas inscritas, ya inscritas antes y no registradas en `Datos_basicos`.
+    """
+    cedulas = list(dict.fromkeys(cedulas))
+    result = EnrollmentResult()
+    if not cedulas:
+        return result
+
+    q = connection.ops.quote_name
+    basicos = Datos_basicos._meta.db_table
+    materias = materias_pensum._meta.db_table
+    placeholders = ", ".join(["%s"] * len(cedulas))
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {q(listado_estudiantes._meta.db_table)} "
+            f"(cedula_estudiante, nombre, apellido, cod_materia, codigo_cohorte, nombre_materia, profesor_ci, "
+            f"nom_profesor_materia, ape_profesor_materia, codplanificacion) "
+            f"SELECT e.cedula, e.nombre, e.apellido, m.cod_materia, %s, m.nombre_materia, %s, %s, %s, %s "
+            f"FROM {q(basicos)} AS e JOIN {q(materias)} AS m ON m.cod_materia = %s "
+            f"WHERE e.cedula IN ({placeholders}) "
+            f"ON CONFLICT (cedula_estudiante, cod_materia, codigo_cohorte) DO NOTHING "
+            f"RETURNING cedula_estudiante",
+            [codigo_cohorte, *profesor, cod_materia, *cedulas],
+        )
+        inscritos = {cedula for cedula, in cursor.fetchall()}
+        pendientes = [cedula for cedula in cedulas if cedula not in inscritos]
+        existentes = set(
+            Datos_basicos.objects.filter(cedula__in=pendientes).values_list("cedula", flat=True)
+        ) if pendientes else set()
+        if inscritos:
+            # El INSERT directo no dispara señales, por lo que la versión de la tabla se cambia explícitamente
+            transaction.on_commit(lambda: bump_table_version(listado_estudiantes))
+
+    result.inscritos = [cedula for cedula in cedulas if cedula in inscritos]
+    result.ya_inscritos = [cedula for cedula in pendientes if cedula in existentes]
+    result.no_encontrados = [cedula for cedula in pendientes if cedula not in existentes]
+    return result
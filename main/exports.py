@@ -0,0 +1,296 @@
+##
+# @file exports.py
+# @brief Exportación de listados a CSV (transmitido) y a XLSX (generado en otro proceso).
+#
+# Los listados exportables son el de estudiantes por materia (`listado_estudiantes`), el de pagos (`pagos`) y el
+# de usuarios (`usuarios`), con los mismos filtros que sus rutas de consulta (`q_code`, `m_code`, `estado_pago`,
+# `tipo_usuario`).
+#
+# - CSV: `streaming_csv_response` recorre el queryset con un cursor del lado del servidor y emite el archivo por
+#   bloques, por lo que la memoria usada no depende del tamaño del listado.
+# - XLSX: el formato no permite transmitirlo mientras se genera, así que `start_xlsx_job` crea una
+#   `TareaExportacion` y la procesa en un `ProcessPoolExecutor`, fuera de los hilos que atienden solicitudes. El
+#   archivo queda en `EXPORT_JOBS["DIRECTORY"]` y se descarga cuando la tarea termina. Requiere `openpyxl`.
+#   Pasados `EXPORT_JOBS["TTL"]` segundos el archivo se elimina y la tarea pasa a `EXPIRADA`, ya sea al intentar
+#   descargarlo o con el comando `procesar_exportaciones`, que además reanuda las tareas interrumpidas.
+#
+# @see `main/streaming.py`
+#
+
+import csv
+import datetime
+import io
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.db import connection, transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import Datos_basicos, TareaExportacion, listado_estudiantes, tabla_pagos
+
+try:
+    import openpyxl
+except ImportError:  # pragma: no cover - dependencia opcional, solo para XLSX
+    openpyxl = None
+
+logger = logging.getLogger(__name__)
+
+_config = getattr(settings, "EXPORT_JOBS", {})
+
+## @brief Carpeta donde se guardan los archivos XLSX generados.
+EXPORT_DIRECTORY = str(_config.get("DIRECTORY", os.path.join(settings.BASE_DIR, "exports")))
+
+## @brief Procesos que generan archivos XLSX en paralelo.
+EXPORT_WORKERS = _config.get("WORKERS", 2)
+
+## @brief Segundos que se conserva cada archivo XLSX generado.
+EXPORT_TTL = _config.get("TTL", 24 * 60 * 60)
+
+
+def _listado_estudiantes(params):
+    queryset = listado_estudiantes.objects.all()
+    if params.get("q_code"):
+        queryset = queryset.filter(codigo_cohorte=params["q_code"])
+    if params.get("m_code"):
+        queryset = queryset.filter(cod_materia=params["m_code"])
+    return queryset
+
+
+def _pagos(params):
+    queryset = tabla_pagos.objects.all()
+    if params.get("estado_pago"):
+        queryset = queryset.filter(estado_pago=params["estado_pago"])
+    return queryset
+
+
+def _usuarios(params):
+    queryset = Datos_basicos.objects.all()
+    if params.get("tipo_usuario"):
+        queryset = queryset.filter(tipo_usuario=params["tipo_usuario"])
+    return queryset
+
+
+## @brief Listados exportables: nombre -> (función que construye el queryset, columnas, parámetros de filtro).
+EXPORTS = {
+    "listado_estudiantes": (
+        _listado_estudiantes,
+        ("cedula_estudiante", "nombre", "apellido", "codigo_cohorte", "cod_materia", "nombre_materia",
+         "profesor_ci", "nom_profesor_materia", "ape_profesor_materia", "nota"),
+        ("q_code", "m_code"),
+    ),
+    "pagos": (
+        _pagos,
+        ("numero_referencia", "cedula_responsable", "nombre_estudiante", "apellido_estudiante", "banco_pago",
+         "fecha_pago", "monto_pago", "estado_pago"),
+        ("estado_pago",),
+    ),
+    # Nunca se exporta la contraseña
+    "usuarios": (
+        _usuarios,
+        ("cedula", "nombre", "apellido", "tipo_usuario", "correo"),
+        ("tipo_usuario",),
+    ),
+}
+
+
+## @brief Parámetros de filtro numéricos y el error que se informa si no son enteros.
+INTEGER_PARAMS = {
+    "tipo_usuario": "El tipo de usuario debe ser un número entero",
+}
+
+
+def export_params(nombre, query_params):
+    """
+    @brief Extrae de los parámetros de la solicitud los filtros que admite el listado `nombre`.
+
+    @throws ValueError Si un filtro numérico no es un entero.
+    """
+    _, _, filtros = EXPORTS[nombre]
+    params = {param: query_params[param] for param in filtros if query_params.get(param)}
+    for param, error in INTEGER_PARAMS.items():
+        if param in params:
+            try:
+                params[param] = int(params[param])
+            except ValueError:
+                raise ValueError(error) from None
+    return params
+
+
+def export_rows(nombre, params):
+    """
+    @brief Devuelve las columnas del listado y un iterador de sus filas, leídas con un cursor del lado del servidor.
+    """
+    build_queryset, columns, _ = EXPORTS[nombre]
+    queryset = build_queryset(params).order_by("pk").values_list(*columns)
+    return columns, queryset.iterator(chunk_size=getattr(settings, "STREAMING_CHUNK_SIZE", 2000))
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime.datetime):
+        return timezone.localtime(value).isoformat() if timezone.is_aware(value) else value.isoformat()
+    return value
+
+
+def iter_csv(columns, rows, rows_per_chunk=None):
+    """
+    @brief Genera los bytes de un CSV en UTF-8 por bloques de filas.
+
+    El archivo empieza con la marca BOM para que Excel reconozca la codificación de los acentos.
+    """
+    rows_per_chunk = rows_per_chunk or getattr(settings, "STREAMING_CHUNK_SIZE", 2000)
+    buffer = io.StringIO()
+    buffer.write("\ufeff")
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    pending = 0
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def streaming_csv_response(nombre, params):
+    """
+    @brief Devuelve una respuesta que transmite el listado `nombre` como CSV adjunto.
+    """
+    columns, rows = export_rows(nombre, params)
+    response = StreamingHttpResponse(iter_csv(columns, rows), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{nombre}.csv"'
+    return response
+
+
+def _xlsx_value(value):
+    # openpyxl no admite fechas con zona horaria
+    if isinstance(value, datetime.datetime) and timezone.is_aware(value):
+        return timezone.make_naive(value)
+    return value
+
+
+def build_xlsx(tarea_id, resume=False):
+    """
+    @brief Genera el archivo XLSX de la tarea `tarea_id`; se ejecuta en un proceso del `ProcessPoolExecutor`.
+
+    Usa el modo de solo escritura de openpyxl, que escribe las filas a disco a medida que se agregan. Solo toma la
+    tarea si está pendiente (o en proceso, con `resume`); una tarea interrumpida se genera de nuevo desde el inicio.
+
+    @return bool: Si la tarea se procesó.
+    """
+    estados = [TareaExportacion.PENDIENTE]
+    if resume:
+        estados.append(TareaExportacion.EN_PROCESO)
+    if not TareaExportacion.objects.filter(pk=tarea_id, estado__in=estados).update(
+        estado=TareaExportacion.EN_PROCESO
+    ):
+        return False
+    tarea = TareaExportacion.objects.get(pk=tarea_id)
+    ruta = os.path.join(EXPORT_DIRECTORY, f"{tarea.listado}-{tarea.pk}.xlsx")
+    try:
+        os.makedirs(EXPORT_DIRECTORY, exist_ok=True)
+        libro = openpyxl.Workbook(write_only=True)
+        hoja = libro.create_sheet(tarea.listado)
+        columns, rows = export_rows(tarea.listado, tarea.parametros)
+        hoja.append(columns)
+        filas = 0
+        for row in rows:
+            hoja.append([_xlsx_value(value) for value in row])
+            filas += 1
+        libro.save(ruta)
+        TareaExportacion.objects.filter(pk=tarea_id).update(
+            estado=TareaExportacion.COMPLETADA, archivo=ruta, filas=filas, fecha_actualizacion=timezone.now()
+        )
+    except Exception as e:
+        logger.exception("Falló la exportación %s", tarea_id)
+        TareaExportacion.objects.filter(pk=tarea_id).update(
+            estado=TareaExportacion.FALLIDA, error=str(e), fecha_actualizacion=timezone.now()
+        )
+    finally:
+        connection.close()
+    return True
+
+
+def is_expired(tarea, now=None):
+    """
+    @brief Indica si el archivo de una tarea completada superó `EXPORT_TTL`.
+    """
+    now = now or timezone.now()
+    return (
+        tarea.estado == TareaExportacion.COMPLETADA
+        and tarea.fecha_actualizacion < now - datetime.timedelta(seconds=EXPORT_TTL)
+    )
+
+
+def expire(tarea):
+    """
+    @brief Elimina el archivo de la tarea, si todavía existe, y la marca como expirada.
+    """
+    if tarea.archivo:
+        try:
+            os.remove(tarea.archivo)
+        except FileNotFoundError:
+            pass
+    TareaExportacion.objects.filter(pk=tarea.pk).update(
+        estado=TareaExportacion.EXPIRADA, archivo=None, fecha_actualizacion=timezone.now()
+    )
+
+
+def expire_files(now=None):
+    """
+    @brief Elimina los archivos vencidos de las tareas completadas.
+
+    @return int: Cantidad de tareas expiradas.
+    """
+    now = now or timezone.now()
+    vencidas = TareaExportacion.objects.filter(
+        estado=TareaExportacion.COMPLETADA,
+        fecha_actualizacion__lt=now - datetime.timedelta(seconds=EXPORT_TTL),
+    )
+    total = 0
+    for tarea in vencidas.only("pk", "archivo"):
+        expire(tarea)
+        total += 1
+    return total
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=EXPORT_WORKERS,
+                # Con "spawn" los procesos no heredan las conexiones abiertas; cada uno inicializa Django
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=django.setup,
+            )
+        return _executor
+
+
+def start_xlsx_job(nombre, params):
+    """
+    @brief Crea una tarea de exportación XLSX y la envía al grupo de procesos al confirmar la transacción.
+
+    @return TareaExportacion: La tarea creada, en estado pendiente.
+    @throws RuntimeError Si `openpyxl` no está instalado.
+    """
+    if openpyxl is None:
+        raise RuntimeError("La exportación a XLSX requiere la librería openpyxl.")
+    tarea = TareaExportacion.objects.create(listado=nombre, parametros=params)
+    transaction.on_commit(lambda: _get_executor().submit(build_xlsx, tarea.pk))
+    return tarea
@@ -0,0 +1,99 @@
+##
+# @file fast_serialization.py
+# @brief Serialización rápida de solo lectura para los listados grandes.
+#
+# Instanciar un modelo por fila y recorrer los campos de un `ModelSerializer` domina el uso de CPU en los listados
+# grandes. `RowSerializer` analiza una sola vez los campos de un serializador de modelo y construye la
+# representación directamente desde las filas de `.values()`, aplicando solo las conversiones necesarias
+# (fechas, opciones, claves foráneas). La salida es idéntica a la del serializador original.
+#
+# Solo se usa con serializadores que no redefinen `to_representation` y cuyos campos corresponden directamente
+# a columnas del modelo; para el resto, `RowSerializer.for_serializer` devuelve None.
+#
+# @see `SerializacionRapidaTests` en `main/tests.py`
+#
+
+import functools
+
+from rest_framework import serializers
+
+## @brief Campos de DRF cuya representación coincide con el valor leído de la base de datos.
+IDENTITY_FIELDS = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+class RowSerializer:
+    """
+    @brief Convierte filas de `.values()` en la misma representación que un `ModelSerializer`.
+    """
+
+    def __init__(self, serializer_class, fields=None):
+        """
+        @brief Precompila las columnas y conversiones de `serializer_class`.
+        @param serializer_class Serializador de modelo compatible (ver `supports`).
+        @param fields Campos a incluir, como en el argumento `fields` de los serializadores.
+        """
+        self.serializer = serializer_class(fields=fields)
+        self.model = serializer_class.Meta.model
+        self.plan = []
+        for field in self.serializer._readable_fields:
+            converter = None if type(field) in IDENTITY_FIELDS else field.to_representation
+            self.plan.append((field.field_name, field.source, converter))
+        self.columns = [source for _, source, _ in self.plan]
+
+    @classmethod
+    def supports(cls, serializer_class):
+        """
+        @brief Indica si la representación de `serializer_class` puede construirse desde `.values()`.
+        """
+        if not issubclass(serializer_class, serializers.ModelSerializer):
+            return False
+        if serializer_class.to_representation is not serializers.ModelSerializer.to_representation:
+            return False
+        concrete = {field.name for field in serializer_class.Meta.model._meta.concrete_fields}
+        return all(
+            not isinstance(field, serializers.SerializerMethodField) and field.source in concrete
+            for field in serializer_class()._readable_fields
+        )
+
+    @classmethod
+    def for_serializer(cls, serializer_class, fields=None):
+        """
+        @brief Devuelve el serializador rápido (en caché) para `serializer_class`, o None si no es compatible.
+        """
+        return _compiled(serializer_class, None if fields is None else tuple(fields))
+
+    def values(self, queryset, *extra):
+        """
+        @brief Restringe el queryset a las columnas necesarias (más `extra`) y devuelve diccionarios.
+        """
+        columns = list(self.columns)
+        columns += [column for column in extra if column not in columns]
+        return queryset.values(*columns)
+
+    def __call__(self, row):
+        """
+        @brief Construye la representación de una fila de `.values()`.
+        """
+        data = {}
+        for name, source, converter in self.plan:
+            value = row[source]
+            if value is None or converter is None:
+                data[name] = value
+            else:
+                data[name] = converter(value)
+        return data
+
+
+## @brief Planes compilados que se conservan; la clave incluye los `?fields=` de la solicitud.
+COMPILED_CACHE_SIZE = 256
+
+
+@functools.lru_cache(maxsize=COMPILED_CACHE_SIZE)
+def _compiled(serializer_class, fields):
+    if not RowSerializer.supports(serializer_class):
+        return None
+    return RowSerializer(serializer_class, fields)
@@ -0,0 +1,216 @@
+##
+# @file grades.py
+# @brief Carga en lote de las notas de una sección, con control de concurrencia optimista, y estadísticas de notas.
+#
+# Cada fila de `listado_estudiantes` tiene una `version` que se incrementa con cada cambio (ver
+# `main/signals.py`). El profesor envía, junto con cada nota, la versión de la fila que leyó, y `apply_grades`
+# guarda todas las notas con un único `UPDATE`: `nota` toma su valor de un `CASE` por estudiante y el `WHERE` solo
+# acepta las filas de la sección del profesor cuya versión sigue siendo la enviada. Si alguna fila no coincide, es
+# decir, otra persona la modificó o no pertenece a la sección, se revierte la carga completa y se informa cuáles
+# fallaron con sus valores actuales. No se bloquea el listado mientras el profesor edita las notas.
+#
+# `grade_statistics` calcula en PostgreSQL, con una sola consulta de agregación, las estadísticas de las notas por
+# sección (cohorte y materia) o por profesor: cantidad, promedio, desviación, percentiles (`percentile_cont`),
+# porcentaje de aprobados respecto a `PASSING_GRADE` e histograma (`width_bucket`). Solo viajan a Python las filas
+# ya agregadas, una por grupo. Los índices (`codigo_cohorte`, `cod_materia`, `nota`) y (`profesor_ci`, `nota`) le
+# entregan las notas de cada grupo ya ordenadas, sin leer la tabla.
+#
+
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import NotSupportedError, connection, models, transaction
+from django.db.models import Case, F, Q, Value, When
+
+from .models import listado_estudiantes
+from .table_versions import bump_table_version
+
+_config = getattr(settings, "GRADES", {})
+
+## @brief Nota mínima de la escala.
+GRADE_MIN = _config.get("MIN", 0)
+
+## @brief Nota máxima de la escala.
+GRADE_MAX = _config.get("MAX", 20)
+
+## @brief Nota mínima aprobatoria.
+PASSING_GRADE = _config.get("PASSING", 15)
+
+
+@dataclass
+class GradeResult:
+    """
+    @brief Resultado de una carga de notas.
+    """
+
+    actualizados: list = field(default_factory=list)
+    conflictos: list = field(default_factory=list)
+    no_encontrados: list = field(default_factory=list)
+
+    def as_dict(self):
+        """
+        @brief Devuelve el resultado en un diccionario serializable.
+        """
+        return {
+            "actualizados": self.actualizados,
+            "conflictos": self.conflictos,
+            "no_encontrados": self.no_encontrados,
+        }
+
+
+def apply_grades(codigo_cohorte, cod_materia, profesor_ci, notas):
+    """
+    @brief Guarda las notas de la sección `cod_materia` de `codigo_cohorte` que dicta `profesor_ci`.
+
+    La carga es todo o nada: si falla alguna fila no se guarda ninguna nota.
+
+    @param notas Lista de diccionarios con `cedula_estudiante`, `nota` y `version` (sin cédulas repetidas).
+    @return GradeResult: Con la carga guardada, las notas y versiones nuevas en `actualizados`; si no, las filas
+        modificadas por otra persona (con su nota y versión actuales) en `conflictos` y las que no pertenecen a la
+        sección en `no_encontrados`.
+    """
+    result = GradeResult()
+    if not notas:
+        return result
+
+    seccion = listado_estudiantes.objects.filter(
+        codigo_cohorte=codigo_cohorte, cod_materia=cod_materia, profesor_ci=profesor_ci
+    )
+    vigentes = Q()
+    for item in notas:
+        vigentes |= Q(cedula_estudiante=item["cedula_estudiante"], version=item["version"])
+
+    with transaction.atomic():
+        actualizadas = seccion.filter(vigentes).update(
+            nota=Case(
+                *[When(cedula_estudiante=item["cedula_estudiante"], then=Value(item["nota"])) for item in notas],
+                default=F("nota"),
+                output_field=models.IntegerField(),
+            ),
+            version=F("version") + 1,
+        )
+        if actualizadas == len(notas):
+            # `update` no dispara señales, por lo que la versión de la tabla se cambia explícitamente
+            transaction.on_commit(lambda: bump_table_version(listado_estudiantes))
+            result.actualizados = [
+                {"cedula_estudiante": item["cedula_estudiante"], "nota": item["nota"], "version": item["version"] + 1}
+                for item in notas
+            ]
+            return result
+        transaction.set_rollback(True)
+
+    # Fuera del bloque revertido se leen los valores vigentes de las filas enviadas
+    actuales = {
+        cedula: (nota, version)
+        for cedula, nota, version in seccion.filter(
+            cedula_estudiante__in=[item["cedula_estudiante"] for item in notas]
+        ).values_list("cedula_estudiante", "nota", "version")
+    }
+    for item in notas:
+        cedula = item["cedula_estudiante"]
+        if cedula not in actuales:
+            result.no_encontrados.append(cedula)
+        elif actuales[cedula][1] != item["version"]:
+            nota, version = actuales[cedula]
+            result.conflictos.append({"cedula_estudiante": cedula, "nota": nota, "version": version})
+    return result
+
+
+## @brief Columnas por las que se agrupan las estadísticas.
+STATISTICS_GROUPS = {
+    "seccion": ("codigo_cohorte", "cod_materia"),
+    "profesor": ("profesor_ci",),
+}
+
+## @brief Percentiles que se calculan en cada grupo.
+PERCENTILES = (0.25, 0.5, 0.75, 0.9)
+
+
+def histogram_ranges(buckets):
+    """
+    @brief Devuelve los límites [desde, hasta) de cada cubeta de `width_bucket` entre `GRADE_MIN` y `GRADE_MAX`.
+    """
+    width = (GRADE_MAX + 1 - GRADE_MIN) / buckets
+    return [
+        (round(GRADE_MIN + index * width, 2), round(GRADE_MIN + (index + 1) * width, 2))
+        for index in range(buckets)
+    ]
+
+
+def grade_statistics(agrupar="seccion", buckets=None, codigo_cohorte=None, cod_materia=None, profesor_ci=None):
+    """
+    @brief Calcula las estadísticas de `listado_estudiantes.nota` agrupadas por sección o por profesor.
+
+    Los percentiles, el promedio y el histograma consideran solo las inscripciones con nota; `inscritos` cuenta
+    todas. Las notas fuera de la escala quedan en `fuera_de_escala` en lugar de en el histograma.
+
+    @param agrupar Clave de `STATISTICS_GROUPS`.
+    @param buckets Cubetas del histograma; por defecto, una por cada nota de la escala.
+    @return list: Un diccionario por grupo, ordenados por las columnas del grupo.
+    @throws NotSupportedError Si la base de datos no es PostgreSQL.
+    """
+    if connection.vendor != "postgresql":
+        raise NotSupportedError("Las estadísticas de notas requieren PostgreSQL.")
+
+    columns = STATISTICS_GROUPS[agrupar]
+    buckets = buckets or GRADE_MAX - GRADE_MIN + 1
+    filtros = []
+    params = []
+    for column, value in (
+        ("codigo_cohorte", codigo_cohorte), ("cod_materia", cod_materia), ("profesor_ci", profesor_ci)
+    ):
+        if value:
+            filtros.append(f"{column} = %s")
+            params.append(value)
+    where = f"WHERE {' AND '.join(filtros)}" if filtros else ""
+    keys = ", ".join(columns)
+
+    # `width_bucket` devuelve 0 o `buckets + 1` para las notas fuera de la escala
+    sql = (
+        f"WITH base AS NOT MATERIALIZED ("
+        f"  SELECT {keys}, nota FROM {connection.ops.quote_name(listado_estudiantes._meta.db_table)} {where}"
+        f"), estadisticas AS ("
+        f"  SELECT {keys}, count(*), count(nota), avg(nota), stddev_samp(nota), min(nota), max(nota),"
+        f"  percentile_cont(%s::float8[]) WITHIN GROUP (ORDER BY nota), count(*) FILTER (WHERE nota >= %s)"
+        f"  FROM base GROUP BY {keys}"
+        f"), histograma AS ("
+        f"  SELECT {keys}, array_agg(cubeta), array_agg(cantidad) FROM ("
+        f"    SELECT {keys}, width_bucket(nota, %s, %s, %s) AS cubeta, count(*) AS cantidad"
+        f"    FROM base WHERE nota IS NOT NULL GROUP BY {keys}, cubeta"
+        f"  ) AS h GROUP BY {keys}"
+        f") "
+        f"SELECT * FROM estadisticas LEFT JOIN histograma USING ({keys}) ORDER BY {keys}"
+    )
+    params += [list(PERCENTILES), PASSING_GRADE, GRADE_MIN, GRADE_MAX + 1, buckets]
+
+    ranges = histogram_ranges(buckets)
+    grupos = []
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        for row in cursor.fetchall():
+            (
+                inscritos, evaluados, promedio, desviacion, minima, maxima, percentiles, aprobados, cubetas,
+                cantidades,
+            ) = row[len(columns):]
+            cubetas = dict(zip(cubetas or (), cantidades or ()))
+            grupos.append({
+                **dict(zip(columns, row)),
+                "inscritos": inscritos,
+                "evaluados": evaluados,
+                "promedio": None if promedio is None else round(float(promedio), 2),
+                "desviacion": None if desviacion is None else round(float(desviacion), 2),
+                "minima": minima,
+                "maxima": maxima,
+                "percentiles": {
+                    f"p{round(p * 100)}": None if valor is None else round(valor, 2)
+                    for p, valor in zip(PERCENTILES, percentiles or [None] * len(PERCENTILES))
+                },
+                "aprobados": aprobados,
+                "porcentaje_aprobados": round(100 * aprobados / evaluados, 2) if evaluados else None,
+                "histograma": [
+                    {"desde": desde, "hasta": hasta, "cantidad": cubetas.get(index, 0)}
+                    for index, (desde, hasta) in enumerate(ranges, start=1)
+                ],
+                "fuera_de_escala": cubetas.get(0, 0) + cubetas.get(buckets + 1, 0),
+            })
+    return grupos
@@ -0,0 +1,199 @@
+##
+# @file invalidation.py
+# @brief Bus de invalidación entre procesos para las cachés en memoria.
+#
+# Los catálogos (`main/catalog.py`) y la caché de usuarios autenticados (`main/cache.py`) viven en la memoria de
+# cada proceso, y las señales de Django solo llegan al proceso que hizo el cambio. Para que los demás procesos
+# también descarten sus copias, cada cambio publica una nueva versión del modelo en la caché compartida de Django
+# (`CACHES`), reutilizando las versiones por tabla de `main/table_versions.py`: publicar un cambio es llamar a
+# `bump_table_version`, que las señales ya hacen al confirmar cada transacción.
+#
+# Cada proceso consulta esas versiones, como mucho una vez cada `INVALIDATION_BUS["POLL_INTERVAL"]` segundos y
+# al inicio de una solicitud (ver `InvalidationBusMiddleware` en `main/middleware.py`). Si la versión de un modelo
+# cambió, se ejecutan los receptores locales suscritos a ese modelo. Así ningún proceso sirve datos con más
+# retraso que ese intervalo.
+#
+# Cuando basta con descartar algunas filas, como los usuarios autenticados de un `datos_login` modificado, los
+# cambios se publican por clave con `publish_keys`: cada publicación toma el siguiente número de un contador en la
+# caché compartida y guarda las claves bajo ese número durante `INVALIDATION_BUS["EVENT_TTL"]` segundos. Al
+# consultar, cada proceso lee las publicaciones posteriores a la última que vio y entrega sus claves a los
+# receptores de `subscribe_keys`; si alguna ya expiró, los receptores reciben None y descartan todo.
+#
+# Con `LocMemCache` o `DummyCache` la caché no se comparte entre procesos y el bus no hace nada (ver
+# `main/checks.py`).
+#
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache import shared_cache_configured
+from .table_versions import table_versions
+
+## @brief Número máximo de publicaciones por clave que se leen en una consulta; si hay más, se descarta todo.
+MAX_EVENTS_PER_POLL = 1000
+
+
+def _counter_key(model):
+    return f"invalidation_events:{model._meta.label_lower}"
+
+
+def _event_key(model, number):
+    return f"invalidation_events:{model._meta.label_lower}:{number}"
+
+
+class InvalidationBus:
+    """
+    @brief Difunde cambios de modelos entre procesos mediante versiones guardadas en la caché compartida.
+    """
+
+    def __init__(self, poll_interval=1.0, event_ttl=600):
+        """
+        @brief Inicializa el bus.
+        @param poll_interval Tiempo mínimo, en segundos, entre dos consultas a la caché compartida.
+        @param event_ttl Tiempo, en segundos, que se conservan las claves publicadas con `publish_keys`.
+        """
+        self.poll_interval = poll_interval
+        self.event_ttl = event_ttl
+        self._subscribers = {}
+        self._key_subscribers = {}
+        self._seen = {}
+        self._seen_events = {}
+        self._next_poll = 0
+        self._lock = threading.Lock()
+        self.polls = 0
+        self.invalidations = 0
+
+    @property
+    def models(self):
+        """
+        @brief Modelos con al menos un receptor suscrito.
+        """
+        return tuple(self._subscribers)
+
+    def subscribe(self, model, callback):
+        """
+        @brief Registra `callback` (sin argumentos) para ejecutarse cuando otro proceso modifique `model`.
+        """
+        callbacks = self._subscribers.setdefault(model, [])
+        if callback not in callbacks:
+            callbacks.append(callback)
+
+    def subscribe_keys(self, model, callback):
+        """
+        @brief Registra `callback(keys)` para recibir las claves de `model` que otro proceso publicó como cambiadas.
+
+        `keys` es un conjunto de claves primarias, o None si no se pudo saber cuáles cambiaron.
+        """
+        callbacks = self._key_subscribers.setdefault(model, [])
+        if callback not in callbacks:
+            callbacks.append(callback)
+
+    def publish_keys(self, model, keys):
+        """
+        @brief Publica que cambiaron las filas `keys` de `model`; debe llamarse una vez confirmada la transacción.
+        """
+        keys = list(keys)
+        if not keys or not shared_cache_configured():
+            return
+        counter = _counter_key(model)
+        cache.add(counter, 0, timeout=None)
+        try:
+            number = cache.incr(counter)
+        except ValueError:
+            # El contador se descartó entre `add` e `incr`
+            cache.add(counter, 1, timeout=None)
+            number = 1
+        cache.set(_event_key(model, number), keys, timeout=self.event_ttl)
+
+    def poll(self, force=False):
+        """
+        @brief Compara las versiones publicadas con las vistas por este proceso e invalida lo que cambió.
+
+        Solo consulta la caché compartida si es compartida entre procesos y pasó `poll_interval` desde la
+        última consulta (o si `force`). Un modelo cuya versión se ve por primera vez también se invalida, ya que
+        no se sabe si la copia local se cargó antes o después de esa versión.
+
+        @return list: Modelos invalidados, incluidos los que tuvieron claves publicadas.
+        """
+        now = time.monotonic()
+        if not force and now < self._next_poll:
+            return []
+        if not shared_cache_configured():
+            return []
+        if not self._lock.acquire(blocking=False):
+            # Otro hilo del proceso ya está consultando
+            return []
+        try:
+            self._next_poll = now + self.poll_interval
+            models = self.models
+            changed = []
+            for model, version in zip(models, table_versions(models)):
+                if self._seen.get(model) != version:
+                    self._seen[model] = version
+                    changed.append(model)
+            changed_keys = self._read_events()
+            self.polls += 1
+        finally:
+            self._lock.release()
+
+        for model in changed:
+            for callback in self._subscribers[model]:
+                callback()
+        for model, keys in changed_keys.items():
+            for callback in self._key_subscribers[model]:
+                callback(keys)
+        self.invalidations += len(changed) + len(changed_keys)
+        return changed + [model for model in changed_keys if model not in changed]
+
+    def _read_events(self):
+        """
+        @brief Lee las claves publicadas desde la última consulta para cada modelo de `subscribe_keys`.
+
+        @return dict: Modelo -> conjunto de claves, o None si alguna publicación ya no está disponible.
+        """
+        models = tuple(self._key_subscribers)
+        counters = cache.get_many([_counter_key(model) for model in models])
+        changed = {}
+        for model in models:
+            last = counters.get(_counter_key(model), 0)
+            seen = self._seen_events.get(model)
+            self._seen_events[model] = last
+            if seen is None or last == seen:
+                # Al ver el contador por primera vez la copia local aún no tiene datos de antes
+                continue
+            if last < seen or last - seen > MAX_EVENTS_PER_POLL:
+                # El contador se reinició o hay demasiadas publicaciones pendientes
+                changed[model] = None
+                continue
+            event_keys = [_event_key(model, number) for number in range(seen + 1, last + 1)]
+            events = cache.get_many(event_keys)
+            if len(events) < len(event_keys):
+                changed[model] = None
+            else:
+                changed[model] = {key for keys in events.values() for key in keys}
+        return changed
+
+    def stats(self):
+        """
+        @brief Devuelve los contadores del bus en un diccionario serializable.
+        """
+        return {
+            "shared": shared_cache_configured(),
+            "models": [model._meta.label_lower for model in self.models],
+            "key_models": [model._meta.label_lower for model in self._key_subscribers],
+            "poll_interval": self.poll_interval,
+            "polls": self.polls,
+            "invalidations": self.invalidations,
+        }
+
+
+_bus_settings = getattr(settings, "INVALIDATION_BUS", {})
+
+## @brief Bus de invalidación del proceso; los receptores se suscriben en `main/signals.py`.
+invalidation_bus = InvalidationBus(
+    poll_interval=_bus_settings.get("POLL_INTERVAL", 1.0),
+    event_ttl=_bus_settings.get("EVENT_TTL", 600),
+)
@@ -0,0 +1,46 @@
+##
+# @file importar_usuarios.py
+# @brief Comando que registra usuarios en lote a partir de un archivo CSV.
+#
+# Usa la misma importación que la ruta `/api/importar-usuarios/` (ver `main/user_import.py`): valida cada fila,
+# carga las válidas con `COPY` en una tabla temporal y las fusiona con `Datos_basicos`, `datos_login` y
+# `profesores`. Las filas inválidas se listan con su número de línea.
+#
+# Uso: `python manage.py importar_usuarios ingresos.csv` (o `-` para leer de la entrada estándar)
+#
+
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import NotSupportedError
+
+from main.user_import import import_users
+
+
+class Command(BaseCommand):
+    """
+    @brief Importa usuarios desde un CSV y muestra el resumen y los errores por fila.
+    """
+
+    help = "Registra usuarios en lote desde un CSV (cedula, nombre, apellido, tipo_usuario, contraseña, correo)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("archivo", help="Ruta del CSV, o '-' para leerlo de la entrada estándar.")
+
+    def handle(self, *args, **options):
+        try:
+            if options["archivo"] == "-":
+                result = import_users(sys.stdin)
+            else:
+                with open(options["archivo"], encoding="utf-8-sig", newline="") as archivo:
+                    result = import_users(archivo)
+        except (OSError, ValueError, NotSupportedError) as e:
+            raise CommandError(str(e))
+
+        for error in result.errores:
+            self.stderr.write(f"Fila {error['fila']} ({error['cedula']}): {error['errores']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{result.total} filas: {result.creados} usuarios creados, {result.actualizados} actualizados, "
+            f"{result.logins_creados} logins creados, {result.logins_actualizados} logins actualizados, "
+            f"{result.profesores_creados} profesores creados, {len(result.errores)} filas con errores."
+        ))
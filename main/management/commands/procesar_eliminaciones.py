@@ -0,0 +1,44 @@
+##
+# @file procesar_eliminaciones.py
+# @brief Comando que procesa las tareas de eliminación de usuarios pendientes o interrumpidas.
+#
+# Las tareas creadas por `EliminarUsuariosView` con `"asincrono": true` se procesan en un hilo del proceso que las
+# recibió, salvo que `DELETION_JOBS["RUN_IN_THREAD"]` sea falso. Si ese proceso se reinicia antes de terminar, la
+# tarea queda `EN_PROCESO`; este comando la reanuda desde el último bloque confirmado. También procesa las tareas
+# que sigan `PENDIENTE`, por lo que puede ejecutarse periódicamente como proceso de trabajo.
+#
+# Uso: `python manage.py procesar_eliminaciones [--tarea ID]`
+#
+
+from django.core.management.base import BaseCommand
+
+from main.deletion import run_job
+from main.models import TareaEliminacion
+
+
+class Command(BaseCommand):
+    """
+    @brief Procesa en primer plano las tareas de eliminación sin terminar.
+    """
+
+    help = "Procesa (o reanuda) las tareas de eliminación de usuarios pendientes o interrumpidas."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tarea", type=int, help="Procesa solo la tarea con este identificador.")
+
+    def handle(self, *args, **options):
+        tareas = TareaEliminacion.objects.filter(
+            estado__in=[TareaEliminacion.PENDIENTE, TareaEliminacion.EN_PROCESO]
+        ).order_by("pk")
+        if options["tarea"] is not None:
+            tareas = tareas.filter(pk=options["tarea"])
+
+        for tarea_id in tareas.values_list("pk", flat=True):
+            if not run_job(tarea_id, resume=True):
+                continue
+            tarea = TareaEliminacion.objects.get(pk=tarea_id)
+            self.stdout.write(
+                f"Tarea {tarea.pk}: {tarea.estado}, {tarea.eliminados} usuarios eliminados "
+                f"({tarea.procesados}/{len(tarea.cedulas)} cédulas procesadas)"
+            )
+        self.stdout.write(self.style.SUCCESS("No quedan tareas de eliminación pendientes."))
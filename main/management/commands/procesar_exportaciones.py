@@ -0,0 +1,47 @@
+##
+# @file procesar_exportaciones.py
+# @brief Comando que elimina los archivos de exportación vencidos y procesa las tareas pendientes o interrumpidas.
+#
+# Las exportaciones a XLSX se envían al grupo de procesos de `main/exports.py` al confirmar la transacción. Si el
+# envío no llega a ocurrir o el proceso que generaba el archivo termina antes de tiempo, la tarea queda
+# `PENDIENTE` o `EN_PROCESO`; este comando la genera de nuevo en primer plano. Antes elimina los archivos que
+# superaron `EXPORT_JOBS["TTL"]`, por lo que conviene ejecutarlo periódicamente (por ejemplo, con cron).
+#
+# Uso: `python manage.py procesar_exportaciones [--tarea ID]`
+#
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main import exports
+from main.models import TareaExportacion
+
+
+class Command(BaseCommand):
+    """
+    @brief Expira los archivos vencidos y procesa en primer plano las exportaciones sin terminar.
+    """
+
+    help = "Elimina los archivos de exportación vencidos y procesa las exportaciones pendientes o interrumpidas."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tarea", type=int, help="Procesa solo la tarea con este identificador.")
+
+    def handle(self, *args, **options):
+        expiradas = exports.expire_files()
+        self.stdout.write(f"{expiradas} archivos de exportación vencidos eliminados.")
+
+        tareas = TareaExportacion.objects.filter(
+            estado__in=[TareaExportacion.PENDIENTE, TareaExportacion.EN_PROCESO]
+        ).order_by("pk")
+        if options["tarea"] is not None:
+            tareas = tareas.filter(pk=options["tarea"])
+        tareas = list(tareas.values_list("pk", flat=True))
+        if tareas and exports.openpyxl is None:
+            raise CommandError("La exportación a XLSX requiere la librería openpyxl.")
+
+        for tarea_id in tareas:
+            if not exports.build_xlsx(tarea_id, resume=True):
+                continue
+            tarea = TareaExportacion.objects.get(pk=tarea_id)
+            self.stdout.write(f"Tarea {tarea.pk}: {tarea.estado}, {tarea.filas} filas ({tarea.listado})")
+        self.stdout.write(self.style.SUCCESS("No quedan exportaciones pendientes."))
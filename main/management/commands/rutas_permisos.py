@@ -0,0 +1,49 @@
+##
+# @file rutas_permisos.py
+# @brief Comando que imprime la clasificación de autenticación de cada ruta de la API.
+#
+# Uso: `python manage.py rutas_permisos`
+#
+
+from django.core.management.base import BaseCommand
+
+from main.route_permissions import RouteIndex
+
+
+class Command(BaseCommand):
+    """
+    @brief Imprime, para cada ruta, si es pública o requiere token y qué permisos la determinan.
+    """
+
+    help = "Imprime el índice de requisitos de autenticación de las rutas de la API."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--publicas",
+            action="store_true",
+            help="Muestra solo las rutas que no requieren token para leer.",
+        )
+
+    def handle(self, *args, **options):
+        index = RouteIndex()
+        index.build()
+
+        rows = []
+        for route, name, _, rule in index.routes():
+            if options["publicas"] and not (rule.drf and rule.public):
+                continue
+            permissions = ", ".join(p.__name__ for p in rule.permission_classes) or "-"
+            rows.append(
+                (
+                    "/" + route,
+                    name or "-",
+                    rule.view_name,
+                    rule.access,
+                    permissions,
+                )
+            )
+
+        headers = ("RUTA", "NOMBRE", "VISTA", "ACCESO", "PERMISOS")
+        widths = [max(len(str(row[i])) for row in rows + [headers]) for i in range(len(headers))]
+        for row in [headers] + rows:
+            self.stdout.write("  ".join(str(value).ljust(width) for value, width in zip(row, widths)))
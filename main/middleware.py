@@ -0,0 +1,225 @@
+##
+# @file middleware.py
+# @brief Middleware propio de la API.
+#
+# Este archivo contiene `InvalidationBusMiddleware`, que aplica las invalidaciones publicadas por otros procesos
+# antes de atender cada solicitud, y `CompressionMiddleware`, que comprime las respuestas según el encabezado
+# `Accept-Encoding` del cliente. Admite gzip siempre y, si las librerías están instaladas, zstd (`zstandard`) y
+# brotli (`brotli`). Los listados de la API repiten los mismos nombres de campo y valores en cada fila, por lo que
+# se comprimen muy bien; las respuestas pequeñas se envían sin comprimir para no gastar CPU.
+#
+# La configuración se lee de `RESPONSE_COMPRESSION` en `settings.py`.
+#
+
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from .invalidation import invalidation_bus
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependencia opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dependencia opcional
+    zstandard = None
+
+
+class InvalidationBusMiddleware:
+    """
+    @brief Consulta el bus de invalidación al inicio de cada solicitud (limitado por `POLL_INTERVAL`).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        invalidation_bus.poll()
+        return self.get_response(request)
+
+
+class GzipEncoder:
+    """
+    @brief Compresor gzip incremental basado en `zlib`.
+    """
+
+    def __init__(self, level):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        return self._obj.compress(data)
+
+    def flush(self):
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._obj.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder:
+    """
+    @brief Compresor brotli incremental.
+    """
+
+    def __init__(self, level):
+        self._obj = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._obj.process(data)
+
+    def flush(self):
+        return self._obj.flush()
+
+    def finish(self):
+        return self._obj.finish()
+
+
+class ZstdEncoder:
+    """
+    @brief Compresor zstd incremental.
+    """
+
+    def __init__(self, level):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self._obj.compress(data)
+
+    def flush(self):
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+## @brief Compresores disponibles en este entorno, indexados por su nombre en `Content-Encoding`.
+ENCODERS = {"gzip": GzipEncoder}
+if brotli is not None:
+    ENCODERS["br"] = BrotliEncoder
+if zstandard is not None:
+    ENCODERS["zstd"] = ZstdEncoder
+
+## @brief Nivel de compresión por defecto de cada codificación (rápidos, pensados para respuestas dinámicas).
+DEFAULT_LEVELS = {"zstd": 3, "br": 4, "gzip": 6}
+
+## @brief Tipos de contenido que vale la pena comprimir.
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml")
+
+
+def parse_accept_encoding(header):
+    """
+    @brief Interpreta el encabezado `Accept-Encoding`.
+
+    @return dict: Codificación (en minúsculas) -> factor de calidad `q`.
+    """
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+def negotiate_encoding(header, preferred):
+    """
+    @brief Elige la codificación a usar según el cliente y el orden de preferencia del servidor.
+
+    Entre las codificaciones aceptadas con la mayor calidad, gana la primera de `preferred`. El comodín `*`
+    cubre las codificaciones que el cliente no menciona.
+
+    @return str o None si el cliente no acepta ninguna de las disponibles.
+    """
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for name in preferred:
+        if name not in ENCODERS:
+            continue
+        quality = accepted.get(name, wildcard)
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    @brief Comprime las respuestas con zstd, brotli o gzip según lo que acepte el cliente.
+
+    Las respuestas normales menores que `MIN_SIZE` bytes no se comprimen, y tampoco se usa la versión comprimida
+    si no resulta más pequeña. Las respuestas transmitidas (`StreamingHttpResponse`) se comprimen bloque a bloque
+    y se vacía el compresor tras cada bloque, de modo que el cliente sigue recibiendo los datos de forma
+    incremental. Como en `GZipMiddleware`, se añade `Vary: Accept-Encoding` y el ETag pasa a ser débil.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        config = getattr(settings, "RESPONSE_COMPRESSION", {})
+        self.min_size = config.get("MIN_SIZE", 1024)
+        self.preferred = tuple(config.get("ENCODINGS", ("zstd", "br", "gzip")))
+        self.levels = {**DEFAULT_LEVELS, **config.get("LEVELS", {})}
+
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding"):
+            return response
+        if not response.get("Content-Type", "").startswith(COMPRESSIBLE_TYPES):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        encoding = negotiate_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""), self.preferred)
+        if encoding is None:
+            return response
+        encoder = ENCODERS[encoding](self.levels[encoding])
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self._compress_async(response.streaming_content, encoder)
+            else:
+                response.streaming_content = self._compress_sequence(response.streaming_content, encoder)
+            # El tamaño comprimido no se conoce hasta terminar de transmitir
+            del response.headers["Content-Length"]
+        else:
+            compressed = encoder.compress(response.content) + encoder.finish()
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # Un ETag fuerte identifica bytes exactos; tras comprimir pasa a ser débil (RFC 9110, sección 8.8.1)
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    @staticmethod
+    def _compress_sequence(chunks, encoder):
+        for chunk in chunks:
+            data = encoder.compress(chunk) + encoder.flush()
+            if data:
+                yield data
+        yield encoder.finish()
+
+    @staticmethod
+    async def _compress_async(chunks, encoder):
+        async for chunk in chunks:
+            data = encoder.compress(chunk) + encoder.flush()
+            if data:
+                yield data
+        yield encoder.finish()
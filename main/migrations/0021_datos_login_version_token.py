@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-17 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0020_remove_materias_pensum_ape_profesor_materia_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datos_login',
+            name='version_token',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1 on 2026-10-17 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0021_datos_login_version_token'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tabla_pagos',
+            index=models.Index(fields=['fecha_pago', 'numero_referencia'], name='pagos_fecha_ref_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tabla_solicitudes',
+            index=models.Index(fields=['fecha_solicitud', 'cod_solicitudes'], name='solicitudes_fecha_cod_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1 on 2026-10-17 12:00
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0022_tabla_pagos_pagos_fecha_ref_idx_and_more'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='datos_basicos',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('cedula'), name='gin_trgm_ops'), name='basicos_cedula_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='datos_basicos',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('nombre'), name='gin_trgm_ops'), name='basicos_nombre_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='datos_basicos',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('apellido'), name='gin_trgm_ops'), name='basicos_apellido_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='datos_basicos',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('correo'), name='gin_trgm_ops'), name='basicos_correo_trgm_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1 on 2026-10-17 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0023_datos_basicos_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='datos_basicos',
+            index=models.Index(fields=['tipo_usuario'], name='basicos_tipo_usuario_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listado_estudiantes',
+            index=models.Index(fields=['codigo_cohorte', 'cod_materia'], name='listado_cohorte_materia_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tabla_pagos',
+            index=models.Index(fields=['estado_pago', 'fecha_pago', 'numero_referencia'], name='pagos_estado_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tabla_pagos',
+            index=models.Index(condition=models.Q(('estado_pago', 'Pendiente')), fields=['fecha_pago', 'numero_referencia'], name='pagos_pendientes_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1 on 2026-10-17 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0024_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TareaEliminacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('EN_PROCESO', 'En proceso'), ('COMPLETADA', 'Completada'), ('FALLIDA', 'Fallida')], default='PENDIENTE', max_length=10)),
+                ('cedulas', models.JSONField(default=list)),
+                ('procesados', models.IntegerField(default=0)),
+                ('eliminados', models.IntegerField(default=0)),
+                ('detalle', models.JSONField(default=dict)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
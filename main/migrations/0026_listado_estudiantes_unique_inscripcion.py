@@ -0,0 +1,53 @@
+# Generated by Django 5.1 on 2026-10-17 16:00
+
+from django.db import migrations, models
+
+
+def eliminar_inscripciones_repetidas(apps, schema_editor):
+    """
+    Deja una sola fila por (estudiante, materia, cohorte) antes de crear la restricción única.
+
+    Si en algún grupo repetido hay más de una fila con nota la migración se detiene sin borrar nada, porque no
+    se puede saber qué nota es la correcta: esas filas deben corregirse a mano. En los demás grupos se conserva la
+    fila con nota o, si ninguna la tiene, la más antigua, con un único `DELETE`. Las filas borradas son copias sin
+    nota, por lo que revertir la migración solo elimina la restricción.
+    """
+    listado = apps.get_model('main', 'listado_estudiantes')
+    conflictos = list(
+        listado.objects.values('cedula_estudiante', 'cod_materia', 'codigo_cohorte')
+        .annotate(con_nota=models.Count('nota'))
+        .filter(con_nota__gt=1)
+        .order_by('cedula_estudiante', 'cod_materia', 'codigo_cohorte')
+        .values_list('cedula_estudiante', 'cod_materia', 'codigo_cohorte')
+    )
+    if conflictos:
+        grupos = '; '.join(' / '.join(str(valor) for valor in grupo) for grupo in conflictos[:20])
+        raise RuntimeError(
+            f'Hay {len(conflictos)} inscripciones repetidas con más de una nota (estudiante / materia / cohorte): '
+            f'{grupos}. Corríjalas antes de aplicar la migración.'
+        )
+
+    q = schema_editor.quote_name
+    tabla = q(listado._meta.db_table)
+    schema_editor.execute(
+        f'DELETE FROM {tabla} AS r USING {tabla} AS s '
+        f'WHERE s.cedula_estudiante = r.cedula_estudiante AND s.cod_materia = r.cod_materia '
+        f'AND s.codigo_cohorte = r.codigo_cohorte AND s.id <> r.id '
+        f'AND ((s.nota IS NOT NULL AND r.nota IS NULL) '
+        f'OR ((s.nota IS NULL) = (r.nota IS NULL) AND s.id < r.id))'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0025_tareaeliminacion'),
+    ]
+
+    operations = [
+        migrations.RunPython(eliminar_inscripciones_repetidas, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='listado_estudiantes',
+            constraint=models.UniqueConstraint(fields=('cedula_estudiante', 'cod_materia', 'codigo_cohorte'), name='listado_estudiante_materia_cohorte_uniq'),
+        ),
+    ]
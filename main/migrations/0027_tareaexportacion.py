@@ -0,0 +1,27 @@
+# Generated by Django 5.1 on 2026-10-17 17:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0026_listado_estudiantes_unique_inscripcion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TareaExportacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('listado', models.CharField(max_length=30)),
+                ('parametros', models.JSONField(default=dict)),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('EN_PROCESO', 'En proceso'), ('COMPLETADA', 'Completada'), ('FALLIDA', 'Fallida')], default='PENDIENTE', max_length=10)),
+                ('archivo', models.TextField(blank=True, null=True)),
+                ('filas', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-17 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0027_tareaexportacion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listado_estudiantes',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1 on 2026-10-17 20:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0028_listado_estudiantes_version'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='listado_estudiantes',
+            name='listado_cohorte_materia_idx',
+        ),
+        migrations.AddIndex(
+            model_name='listado_estudiantes',
+            index=models.Index(fields=['codigo_cohorte', 'cod_materia', 'nota'], name='listado_coh_mat_nota_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listado_estudiantes',
+            index=models.Index(fields=['profesor_ci', 'nota'], name='listado_profesor_nota_idx'),
+        ),
+    ]
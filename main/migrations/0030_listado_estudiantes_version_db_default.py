@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0029_listado_estudiantes_nota_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='listado_estudiantes',
+            name='version',
+            field=models.PositiveIntegerField(db_default=0, default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-18 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0030_listado_estudiantes_version_db_default'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tareaexportacion',
+            name='estado',
+            field=models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('EN_PROCESO', 'En proceso'), ('COMPLETADA', 'Completada'), ('FALLIDA', 'Fallida'), ('EXPIRADA', 'Expirada')], default='PENDIENTE', max_length=10),
+        ),
+    ]
@@ -1,4 +1,6 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
 ##
 # @file models.py
@@ -46,6 +48,17 @@ class Datos_basicos(models.Model):
         """
         return f"{self.nombre} {self.apellido} {self.cedula} {self.tipo_usuario} {self.contraseña}"
 
+    class Meta:
+        # Índices de trigramas (pg_trgm) para la búsqueda parcial de personas. Se indexa `UPPER(columna)`, que es
+        # la expresión que genera Django para `icontains`, de modo que la misma búsqueda use el índice.
+        indexes = [
+            GinIndex(OpClass(Upper(campo), name="gin_trgm_ops"), name=f"basicos_{campo}_trgm_idx")
+            for campo in ("cedula", "nombre", "apellido", "correo")
+        ] + [
+            # Listado por tipo de usuario (/api/listar_usuarios/)
+            models.Index(fields=["tipo_usuario"], name="basicos_tipo_usuario_idx"),
+        ]
+
 
 ## @class datos_maestria
 # @brief Modelo que almacena información sobre los programas de maestría disponibles.
@@ -163,6 +176,9 @@ class datos_login(models.Model):
         roles, on_delete=models.CASCADE, to_field="codigo_rol", db_column="tipo_usuario"
     )  # CLAVE FORANEA
 
+    # Versión de los tokens emitidos; se incrementa al cambiar la contraseña o el rol para revocarlos
+    version_token = models.IntegerField(default=0)
+
     @property
     def is_authenticated(self):
         """
@@ -290,6 +306,22 @@ class listado_estudiantes(models.Model):
     Contiene información sobre el estudiante, la materia y el profesor que la imparte.
     """
 
+    class Meta:
+        indexes = [
+            # Filtro por cohorte y materia de /api/listado_estudiantes/?q_code=...&m_code=...; con `nota`, las
+            # estadísticas por sección (`main/grades.py`) leen las notas ya ordenadas solo desde el índice
+            models.Index(fields=["codigo_cohorte", "cod_materia", "nota"], name="listado_coh_mat_nota_idx"),
+            # Estadísticas de notas por profesor
+            models.Index(fields=["profesor_ci", "nota"], name="listado_profesor_nota_idx"),
+        ]
+        constraints = [
+            # Un estudiante se inscribe una sola vez en cada materia de una cohorte
+            models.UniqueConstraint(
+                fields=["cedula_estudiante", "cod_materia", "codigo_cohorte"],
+                name="listado_estudiante_materia_cohorte_uniq",
+            ),
+        ]
+
     cedula_estudiante = models.ForeignKey(
         Datos_basicos,
         on_delete=models.CASCADE,
@@ -319,6 +351,9 @@ class listado_estudiantes(models.Model):
     nom_profesor_materia = models.TextField(blank=True, null=True)
     ape_profesor_materia = models.TextField(blank=True, null=True)
     nota = models.IntegerField(blank=True, null=True)
+    # Se incrementa con cada cambio de la fila; detecta ediciones concurrentes al cargar notas. El valor por
+    # defecto también queda en la base de datos para los INSERT directos (`main/enrollment.py`)
+    version = models.PositiveIntegerField(default=0, db_default=0)
 
     codplanificacion = models.ForeignKey(
         PlanificacionProfesor,
@@ -371,6 +406,20 @@ class tabla_pagos(models.Model):
         # ordering = ["-fecha_pago"]  # Ordena por fecha de pago descendente
         verbose_name = "Pago"  # Nombre en singular en el admin de Django
         verbose_name_plural = "Pagos"
+        indexes = [
+            # Paginación por cursor de /api/pagos/ (fecha_pago, numero_referencia)
+            models.Index(fields=["fecha_pago", "numero_referencia"], name="pagos_fecha_ref_idx"),
+            # Pagos filtrados por estado y ordenados por fecha (/api/pagos/?estado_pago=...)
+            models.Index(
+                fields=["estado_pago", "fecha_pago", "numero_referencia"], name="pagos_estado_fecha_idx"
+            ),
+            # Cola de pagos por revisar: solo las filas pendientes, que son pocas frente al histórico
+            models.Index(
+                fields=["fecha_pago", "numero_referencia"],
+                condition=models.Q(estado_pago="Pendiente"),
+                name="pagos_pendientes_fecha_idx",
+            ),
+        ]
 
     ESTADOS_PAGO = [
         ("Pendiente", "Pendiente"),
@@ -411,6 +460,14 @@ class tabla_solicitudes(models.Model):
     Relaciona las solicitudes con los estudiantes y proporciona detalles sobre su estado y tipo.
     """
 
+    class Meta:
+        indexes = [
+            # Paginación por cursor de /api/solicitudes/ (fecha_solicitud, cod_solicitudes)
+            models.Index(
+                fields=["fecha_solicitud", "cod_solicitudes"], name="solicitudes_fecha_cod_idx"
+            ),
+        ]
+
     cedula_responsable = models.ForeignKey(
         Datos_basicos,
         on_delete=models.CASCADE,
@@ -424,3 +481,82 @@ class tabla_solicitudes(models.Model):
     fecha_solicitud = models.DateTimeField(null=False)
     status_solicitud = models.TextField(null=False)
     tipo_solicitud = models.TextField(null=False)
+
+
+## @class TareaEliminacion
+# @brief Tarea de eliminación de usuarios en segundo plano.
+class TareaEliminacion(models.Model):
+    """
+    @brief Tarea de eliminación de usuarios en segundo plano.
+
+    Guarda las cédulas a eliminar y el avance de la tarea, que se procesa por bloques en `main/deletion.py`.
+    `procesados` indica cuántas cédulas de la lista ya se procesaron, por lo que una tarea interrumpida se puede
+    reanudar desde ese punto.
+    """
+
+    PENDIENTE = "PENDIENTE"
+    EN_PROCESO = "EN_PROCESO"
+    COMPLETADA = "COMPLETADA"
+    FALLIDA = "FALLIDA"
+
+    ESTADOS_TAREA = [
+        (PENDIENTE, "Pendiente"),
+        (EN_PROCESO, "En proceso"),
+        (COMPLETADA, "Completada"),
+        (FALLIDA, "Fallida"),
+    ]
+
+    estado = models.CharField(max_length=10, choices=ESTADOS_TAREA, default=PENDIENTE)
+    cedulas = models.JSONField(default=list)
+    procesados = models.IntegerField(default=0)
+    eliminados = models.IntegerField(default=0)
+    detalle = models.JSONField(default=dict)  # Filas eliminadas por tabla
+    error = models.TextField(blank=True, null=True)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        """
+        @brief Representación en string de la tarea con su estado y avance.
+        """
+        return f"Eliminación {self.pk} - {self.estado} ({self.procesados}/{len(self.cedulas)})"
+
+
+## @class TareaExportacion
+# @brief Tarea de exportación de un listado a un archivo XLSX.
+class TareaExportacion(models.Model):
+    """
+    @brief Tarea de exportación de un listado a un archivo XLSX.
+
+    El archivo se genera en un proceso aparte (ver `main/exports.py`); la tarea guarda los filtros usados, su
+    estado y la ruta del archivo resultante. Cuando el archivo vence y se elimina, la tarea pasa a `EXPIRADA`.
+    """
+
+    PENDIENTE = "PENDIENTE"
+    EN_PROCESO = "EN_PROCESO"
+    COMPLETADA = "COMPLETADA"
+    FALLIDA = "FALLIDA"
+    EXPIRADA = "EXPIRADA"
+
+    ESTADOS_TAREA = [
+        (PENDIENTE, "Pendiente"),
+        (EN_PROCESO, "En proceso"),
+        (COMPLETADA, "Completada"),
+        (FALLIDA, "Fallida"),
+        (EXPIRADA, "Expirada"),
+    ]
+
+    listado = models.CharField(max_length=30)  # Nombre de la exportación (`exports.EXPORTS`)
+    parametros = models.JSONField(default=dict)  # Filtros de la solicitud
+    estado = models.CharField(max_length=10, choices=ESTADOS_TAREA, default=PENDIENTE)
+    archivo = models.TextField(blank=True, null=True)  # Ruta del archivo generado
+    filas = models.IntegerField(default=0)
+    error = models.TextField(blank=True, null=True)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        """
+        @brief Representación en string de la tarea con su listado y estado.
+        """
+        return f"Exportación {self.pk} - {self.listado} ({self.estado})"
@@ -0,0 +1,149 @@
+##
+# @file pagination.py
+# @brief Paginación por cursor (keyset) para los listados de la API.
+#
+# A diferencia de la paginación por desplazamiento (`OFFSET`), la paginación por cursor filtra a partir de la
+# última fila entregada usando una columna ordenable y la clave primaria como desempate, por lo que el costo de
+# cada página es constante sin importar su profundidad. El cursor es opaco para el cliente: codifica en base64
+# los valores de la última fila de la página.
+#
+# Ejemplo: `GET /api/pagos/?limit=50` y luego `GET /api/pagos/?limit=50&cursor=<next_cursor>`.
+#
+
+import base64
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+
+class KeysetPagination:
+    """
+    @brief Paginador por cursor basado en una columna ordenable y la clave primaria.
+
+    La paginación solo se aplica si la solicitud incluye `cursor` o `limit`; en caso contrario la vista
+    devuelve el listado completo como antes.
+    """
+
+    cursor_query_param = "cursor"
+    limit_query_param = "limit"
+    default_limit = 50
+    max_limit = 500
+
+    def __init__(self, ordering=None):
+        """
+        @brief Inicializa el paginador.
+        @param ordering Nombre de la columna de ordenamiento, con prefijo `-` para orden descendente.
+            Si es None se ordena por la clave primaria.
+        """
+        ordering = ordering or "pk"
+        self.descending = ordering.startswith("-")
+        self.field_name = ordering.lstrip("-")
+
+    def is_requested(self, request):
+        """
+        @brief Indica si la solicitud pide un listado paginado.
+        """
+        params = request.query_params
+        return self.cursor_query_param in params or self.limit_query_param in params
+
+    def get_limit(self, request):
+        """
+        @brief Obtiene el tamaño de página solicitado, acotado a `max_limit`.
+        """
+        value = request.query_params.get(self.limit_query_param)
+        if value in (None, ""):
+            return self.default_limit
+        try:
+            limit = int(value)
+        except ValueError:
+            raise ValidationError({"limit": "El límite debe ser un número entero."})
+        if limit <= 0:
+            raise ValidationError({"limit": "El límite debe ser mayor que cero."})
+        return min(limit, self.max_limit)
+
+    def get_ordering(self, model):
+        """
+        @brief Devuelve el ordenamiento estable (columna y clave primaria) que usa el paginador.
+        """
+        prefix = "-" if self.descending else ""
+        pk_name = model._meta.pk.name
+        if self.field_name in ("pk", pk_name):
+            return [f"{prefix}{pk_name}"]
+        return [f"{prefix}{self.field_name}", f"{prefix}{pk_name}"]
+
+    def cursor_fields(self, model):
+        """
+        @brief Devuelve los campos del modelo que identifican la posición del cursor.
+        """
+        pk_field = model._meta.pk
+        if self.field_name in ("pk", pk_field.name):
+            return [pk_field]
+        return [model._meta.get_field(self.field_name), pk_field]
+
+    def encode_cursor(self, model, obj):
+        """
+        @brief Construye el cursor opaco que apunta a la fila `obj` (instancia del modelo o fila de `.values()`).
+        """
+        values = []
+        for field in self.cursor_fields(model):
+            value = obj[field.name] if isinstance(obj, dict) else field.value_from_object(obj)
+            values.append(value.isoformat() if hasattr(value, "isoformat") else str(value))
+        raw = json.dumps(values, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, model, cursor):
+        """
+        @brief Decodifica el cursor y convierte sus valores al tipo de cada columna.
+        @return list: Valores de la última fila entregada (columna de ordenamiento y clave primaria).
+        @throws ValidationError Si el cursor no es válido.
+        """
+        fields = self.cursor_fields(model)
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            values = json.loads(raw)
+            if not isinstance(values, list) or len(values) != len(fields):
+                raise ValueError(cursor)
+            return [field.to_python(value) for field, value in zip(fields, values)]
+        except Exception:
+            raise ValidationError({"cursor": "Cursor inválido."})
+
+    def filter_after(self, queryset, values):
+        """
+        @brief Filtra las filas posteriores a la posición indicada por el cursor.
+        """
+        lookup = "lt" if self.descending else "gt"
+        if len(values) == 1:
+            return queryset.filter(**{f"pk__{lookup}": values[0]})
+        value, pk = values
+        return queryset.filter(
+            Q(**{f"{self.field_name}__{lookup}": value})
+            | Q(**{self.field_name: value, f"pk__{lookup}": pk})
+        )
+
+    def paginate_queryset(self, queryset, request):
+        """
+        @brief Obtiene una página del queryset a partir del cursor de la solicitud.
+        @return tuple: (lista de objetos de la página, cursor de la página siguiente o None).
+        """
+        model = queryset.model
+        limit = self.get_limit(request)
+        queryset = queryset.order_by(*self.get_ordering(model))
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = self.filter_after(queryset, self.decode_cursor(model, cursor))
+
+        page = list(queryset[: limit + 1])
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = self.encode_cursor(model, page[-1])
+        return page, next_cursor
+
+    def get_paginated_response(self, data, next_cursor):
+        """
+        @brief Construye la respuesta con los resultados de la página y el cursor siguiente.
+        """
+        return Response({"results": data, "next_cursor": next_cursor})
@@ -6,11 +6,13 @@ from main.models import Roles
 
 class IsPublic(permissions.BasePermission):
     """
-    Permiso personalizado que permite el acceso solo a usuarios con rol ...
+    Permiso personalizado que permite leer sin autenticación; las escrituras requieren un usuario autenticado.
     """
 
     def has_permission(self, request, view):
-        return True
+        return request.method in permissions.SAFE_METHODS or bool(
+            request.user and request.user.is_authenticated
+        )
 
 
 class IsProfesor(permissions.BasePermission):
@@ -30,3 +32,22 @@ class IsProfesor(permissions.BasePermission):
             raise PermissionDenied("Recurso requiere privilegios de profesor.")
 
         return True
+
+
+class IsAdmin(permissions.BasePermission):
+    """
+    Permiso personalizado que permite el acceso solo a usuarios con rol de administrador.
+    """
+
+    def has_permission(self, request, view):
+        # Verifica si el usuario está autenticado y tiene el rol adecuado
+        if not request.user.is_authenticated:
+            raise PermissionDenied("Usuario no autenticado")
+
+        if (
+            not getattr(request.user, "tipo_usuario", None).codigo_rol
+            == Roles.ADMIN.value
+        ):
+            raise PermissionDenied("Recurso requiere privilegios de administrador.")
+
+        return True
@@ -0,0 +1,154 @@
+##
+# @file renderers.py
+# @brief Serialización JSON rápida compartida por las vistas de la API.
+#
+# Este archivo contiene las funciones `json_dumps` y `json_loads`, el renderer y el parser de Django REST
+# Framework basados en ellas, y `JsonResponse` para las vistas basadas en funciones. Si la librería `orjson` está
+# instalada se usa para codificar y decodificar; si no, se recurre al módulo `json` de la librería estándar.
+#
+# La salida es la misma que la de `rest_framework.renderers.JSONRenderer` con la configuración por defecto
+# (UTF-8 sin escapar, separadores compactos, `\u2028`/`\u2029` escapados): las fechas, los decimales y demás
+# tipos que no son JSON nativos se convierten con el `JSONEncoder` de DRF. La única diferencia conocida es la
+# notación de los números de punto flotante con exponente (`1e16` en lugar de `1e+16`), que es JSON equivalente.
+#
+# También contiene `CSVStreamParser`, que entrega el cuerpo `text/csv` de una solicitud como líneas de texto sin
+# cargarlo completo en memoria.
+#
+
+import codecs
+import json
+
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - la API funciona igual sin orjson, solo más lenta
+    orjson = None
+
+_drf_encoder = encoders.JSONEncoder()
+
+if orjson is not None:
+    ## @brief Opciones de orjson: claves no textuales como `json` y fechas delegadas al encoder de DRF.
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def _escape_separators(content):
+    # Igual que DRF, se escapan U+2028 y U+2029 para que la salida sea un subconjunto estricto de JavaScript
+    if b"\xe2\x80\xa8" in content or b"\xe2\x80\xa9" in content:
+        content = content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+    return content
+
+
+def _stdlib_dumps(data):
+    return json.dumps(
+        data, cls=encoders.JSONEncoder, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode()
+
+
+def json_dumps(data):
+    """
+    @brief Serializa `data` a JSON compacto en UTF-8.
+
+    @param data Valor a serializar (listas, diccionarios, `ReturnList`, fechas, decimales, etc.).
+
+    @return bytes: Documento JSON.
+    """
+    if orjson is not None:
+        try:
+            return _escape_separators(orjson.dumps(data, default=_drf_encoder.default, option=ORJSON_OPTIONS))
+        except orjson.JSONEncodeError:
+            # Enteros de más de 64 bits y otros casos que orjson no admite: se usa la ruta estándar
+            pass
+    return _escape_separators(_stdlib_dumps(data))
+
+
+def json_loads(content):
+    """
+    @brief Decodifica un documento JSON recibido como `bytes` o `str`.
+
+    @throws ValueError Si el contenido no es JSON válido (`json.JSONDecodeError` o su subclase de orjson).
+    """
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content, parse_constant=_reject_constant)
+
+
+def _reject_constant(value):
+    # `NaN` e `Infinity` no son JSON válido; orjson también los rechaza
+    raise ValueError(f"Out of range float values are not JSON compliant: {value!r}")
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    @brief Renderer JSON de la API basado en `json_dumps`.
+
+    Si el cliente pide sangría (`Accept: application/json; indent=4`) o la configuración de DRF no es la
+    compacta en UTF-8, se delega en `JSONRenderer` para respetar ese formato.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact or not self.strict:
+            return super().render(data, accepted_media_type, renderer_context)
+        return json_dumps(data)
+
+
+class FastJSONParser(JSONParser):
+    """
+    @brief Parser JSON de la API basado en `json_loads`.
+    """
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if encoding.lower().replace("_", "-") not in ("utf-8", "utf8"):
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return json_loads(stream.read())
+        except ValueError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
+
+
+class JsonResponse(HttpResponse):
+    """
+    @brief Respuesta JSON para las vistas basadas en funciones, con el mismo formato que la API.
+
+    Sustituye a `django.http.JsonResponse` conservando su firma (`safe`, `status`, etc.).
+
+    @throws TypeError Si `safe` es verdadero y `data` no es un diccionario.
+    """
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError(
+                "In order to allow non-dict objects to be serialized set the safe parameter to False."
+            )
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(content=json_dumps(data), **kwargs)
+
+
+class CSVStreamParser(BaseParser):
+    """
+    @brief Parser de cuerpos `text/csv` que devuelve un iterador de líneas de texto.
+
+    Las líneas se decodifican a medida que se leen (UTF-8 por defecto, ignorando la marca BOM), por lo que el
+    archivo se puede procesar fila a fila.
+    """
+
+    media_type = "text/csv"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if encoding.lower().replace("_", "-") in ("utf-8", "utf8"):
+            encoding = "utf-8-sig"
+        return codecs.iterdecode(stream if stream is not None else (), encoding)
@@ -0,0 +1,154 @@
+##
+# @file route_permissions.py
+# @brief Índice precalculado de los requisitos de autenticación de cada ruta de la API.
+#
+# Este archivo recorre una sola vez la configuración de URLs del proyecto y clasifica cada vista según las
+# `permission_classes` que Django REST Framework le aplica realmente (las de la clase de la vista o las pasadas
+# a `as_view`). `CustomJWTAuthentication` consulta este índice en O(1) con la vista resuelta de la solicitud,
+# en lugar de inspeccionarla en cada llamada.
+#
+# Una vista pública solo lo es para los métodos de lectura (`SAFE_METHODS`): las escrituras siempre requieren
+# token, aunque la vista declare `AllowAny` o `IsPublic`.
+#
+# @see `main/management/commands/rutas_permisos.py`
+#
+
+import threading
+from dataclasses import dataclass
+
+from django.urls import URLPattern, URLResolver, get_resolver
+from rest_framework.permissions import SAFE_METHODS, AllowAny
+from rest_framework.views import APIView
+
+from .permissions import IsPublic
+
+## @brief Permisos que hacen que una ruta no requiera token para los métodos de lectura.
+PUBLIC_PERMISSIONS = (AllowAny, IsPublic)
+
+
+@dataclass(frozen=True)
+class RouteRule:
+    """
+    @brief Requisitos de autenticación de una vista.
+
+    `public` indica que los métodos de lectura (`SAFE_METHODS`) no requieren token. `drf` es falso para las
+    vistas de Django que no pasan por Django REST Framework; en ellas no se ejecuta `CustomJWTAuthentication`.
+    """
+
+    view_name: str
+    permission_classes: tuple
+    public: bool
+    drf: bool = True
+
+    @property
+    def access(self):
+        """
+        @brief Clasificación legible de la ruta: `LECTURA PUBLICA`, `TOKEN` o `SIN DRF`.
+        """
+        if not self.drf:
+            return "SIN DRF"
+        return "LECTURA PUBLICA" if self.public else "TOKEN"
+
+
+def view_class_of(func):
+    """
+    @brief Devuelve la clase de vista asociada a la función `func`, o None si es una vista de función simple.
+    """
+    return getattr(func, "cls", None) or getattr(func, "view_class", None)
+
+
+def effective_permission_classes(func):
+    """
+    @brief Devuelve las clases de permiso que Django REST Framework aplica realmente a la vista `func`.
+
+    Se toman de los argumentos de `as_view()` o, si no se indicaron, de la clase de la vista (para las vistas
+    `@api_view`, la clase que genera el decorador).
+
+    @param func Función de vista, tal como la devuelve `as_view()` o `@api_view`.
+
+    @return tuple: Clases de permiso, o una tupla vacía si la vista no es de Django REST Framework.
+    """
+    initkwargs = getattr(func, "initkwargs", None) or {}
+    if "permission_classes" in initkwargs:
+        return tuple(initkwargs["permission_classes"])
+    return tuple(getattr(view_class_of(func), "permission_classes", ()))
+
+
+def build_rule(func):
+    """
+    @brief Calcula la regla de autenticación de la vista `func`.
+    """
+    view_class = view_class_of(func)
+    view_name = (view_class or func).__name__
+    if view_class is None or not issubclass(view_class, APIView):
+        return RouteRule(view_name, (), public=True, drf=False)
+
+    permission_classes = effective_permission_classes(func)
+    public = not getattr(view_class, "authentication_classes", ()) or any(
+        isinstance(permission, type) and issubclass(permission, PUBLIC_PERMISSIONS)
+        for permission in permission_classes
+    )
+    return RouteRule(view_name, permission_classes, public)
+
+
+class RouteIndex:
+    """
+    @brief Índice de reglas de autenticación por función de vista.
+
+    Se construye al iniciar la aplicación (`MainConfig.ready`). Las vistas que no aparecen en el índice,
+    por ejemplo las de una configuración de URLs distinta, se clasifican la primera vez que se ven.
+    """
+
+    def __init__(self):
+        self._rules = {}
+        self._routes = []
+        self._lock = threading.Lock()
+
+    def build(self, urlconf=None):
+        """
+        @brief Recorre la configuración de URLs y calcula la regla de cada vista.
+        """
+        rules = {}
+        routes = []
+        for route, name, func in self._walk(get_resolver(urlconf).url_patterns):
+            rule = rules.get(func) or build_rule(func)
+            rules[func] = rule
+            routes.append((route, name, func, rule))
+
+        with self._lock:
+            self._rules = rules
+            self._routes = routes
+
+    def _walk(self, patterns, prefix=""):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                yield from self._walk(pattern.url_patterns, prefix + str(pattern.pattern))
+            elif isinstance(pattern, URLPattern):
+                yield prefix + str(pattern.pattern), pattern.name, pattern.callback
+
+    def rule_for(self, func):
+        """
+        @brief Devuelve la regla de la vista `func`, calculándola si aún no está en el índice.
+        """
+        rule = self._rules.get(func)
+        if rule is None:
+            rule = build_rule(func)
+            with self._lock:
+                self._rules[func] = rule
+        return rule
+
+    def is_public(self, func, method):
+        """
+        @brief Indica si la vista `func` puede usarse sin token con el método HTTP `method`.
+        """
+        return method in SAFE_METHODS and self.rule_for(func).public
+
+    def routes(self):
+        """
+        @brief Devuelve la lista de tuplas (ruta, nombre, vista, regla) en el orden de la configuración de URLs.
+        """
+        return list(self._routes)
+
+
+## @brief Índice compartido por `CustomJWTAuthentication`.
+route_index = RouteIndex()
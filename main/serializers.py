@@ -12,15 +12,157 @@ import logging
 logger = logging.getLogger(__name__)
 
 from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError as DjangoValidationError
 from . import models
+from .catalog import role_catalog
+from .grades import GRADE_MAX, GRADE_MIN
+
+
+## @class CamposDinamicosMixin
+# @brief Permite limitar los campos que devuelve un serializador de modelo.
+#
+# El serializador acepta el argumento `fields` con la lista de campos a incluir. Además, sabe qué columnas del
+# modelo se necesitan para esos campos, de modo que las vistas puedan restringir la consulta con `.only()`.
+class CamposDinamicosMixin:
+    """mixin"""
+
+    ## Campos que se agregan en `to_representation` y columnas del modelo que necesitan.
+    campos_extra = {}
+    ## Relaciones que deben cargarse con `select_related` para serializar cada campo extra sin consultas por fila.
+    relaciones_extra = {}
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop("fields", None)
+        super().__init__(*args, **kwargs)
+        self.campos_solicitados = None if fields is None else set(fields)
+        if fields is not None:
+            for name in set(self.fields) - self.campos_solicitados:
+                self.fields.pop(name)
+
+    def incluye_campo(self, name):
+        """
+        @brief Indica si el campo `name` forma parte de la representación solicitada.
+        """
+        return self.campos_solicitados is None or name in self.campos_solicitados
+
+    @classmethod
+    def validar_campos(cls, valor):
+        """
+        @brief Convierte el parámetro `fields` ("a,b,c") en una lista de campos válidos.
+        @return list o None si no se indicó el parámetro.
+        @throws ValidationError Si algún campo no existe en el serializador.
+        """
+        if not valor:
+            return None
+        # Sin repetidos, para que `?fields=a,a,...` no genere combinaciones nuevas
+        campos = list(dict.fromkeys(campo.strip() for campo in valor.split(",") if campo.strip()))
+        disponibles = set(cls().fields) | set(cls.campos_extra)
+        desconocidos = [campo for campo in campos if campo not in disponibles]
+        if desconocidos:
+            raise ValidationError(
+                {"fields": f"Campos no válidos: {', '.join(desconocidos)}."}
+            )
+        return campos
+
+    @classmethod
+    def cargar_relaciones(cls, queryset, campos=None):
+        """
+        @brief Agrega al queryset los `select_related` que necesitan los campos extra solicitados.
+
+        Así la representación anidada no ejecuta una consulta por cada fila (problema N+1).
+        """
+        relaciones = [
+            relacion
+            for campo, rels in cls.relaciones_extra.items()
+            if campos is None or campo in campos
+            for relacion in rels
+        ]
+        return queryset.select_related(*relaciones) if relaciones else queryset
+
+    @classmethod
+    def columnas_modelo(cls, campos):
+        """
+        @brief Devuelve las columnas del modelo necesarias para serializar `campos`.
+        """
+        concretos = {field.name for field in cls.Meta.model._meta.concrete_fields}
+        columnas = set()
+        for campo in campos:
+            if campo in cls.campos_extra:
+                columnas.update(cls.campos_extra[campo])
+            elif campo in concretos:
+                columnas.add(campo)
+        return sorted(columnas)
+
+
+## @class PrecargadoRelatedField
+# @brief Campo de clave foránea que resuelve la clave con instancias precargadas en el contexto.
+#
+# Si el contexto del serializador incluye `precargados[modelo]` (diccionario clave -> instancia), la validación no
+# consulta la base de datos; si no, se comporta como `PrimaryKeyRelatedField`.
+class PrecargadoRelatedField(serializers.PrimaryKeyRelatedField):
+    """field"""
+
+    def to_internal_value(self, data):
+        model = self.queryset.model
+        precargados = self.context.get("precargados", {}).get(model)
+        if precargados is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            return precargados[model._meta.pk.to_python(data)]
+        except (TypeError, DjangoValidationError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        except KeyError:
+            self.fail("does_not_exist", pk_value=data)
+
+
+## @class CargaMasivaMixin
+# @brief Permite validar lotes de filas con una consulta por relación en lugar de una por fila.
+#
+# `precargar_relaciones` obtiene con `in_bulk` todas las filas referenciadas por el lote (incluidas sus claves
+# foráneas obligatorias, para serializar la respuesta) y el resultado se pasa como contexto `precargados`.
+class CargaMasivaMixin:
+    """mixin"""
+
+    serializer_related_field = PrecargadoRelatedField
+
+    @classmethod
+    def precargar_relaciones(cls, items):
+        """
+        @brief Carga las instancias referenciadas por las claves foráneas de `items`.
+        @param items Lista de diccionarios con los datos de entrada.
+        @return dict: Modelo relacionado -> {clave: instancia}.
+        """
+        precargados = {}
+        for field in cls.Meta.model._meta.concrete_fields:
+            if not field.is_relation:
+                continue
+            target = field.target_field
+            claves = set()
+            for item in items:
+                valor = item.get(field.name) if isinstance(item, dict) else None
+                if valor is None or isinstance(valor, bool):
+                    continue
+                try:
+                    claves.add(target.to_python(valor))
+                except (TypeError, DjangoValidationError):
+                    continue
+            related = field.related_model
+            encontrados = related._default_manager.select_related().in_bulk(
+                claves, field_name=target.name
+            ) if claves else {}
+            precargados.setdefault(related, {}).update(encontrados)
+        return precargados
 
 
 ## @class PlanificacionProfesorSerializer
 # @brief Serializa el modelo `PlanificacionProfesor`.
 #
 # Este serializador convierte el modelo `PlanificacionProfesor` en un formato adecuado para su transmisión en la API.
-class PlanificacionProfesorSerializer(serializers.ModelSerializer):
+class PlanificacionProfesorSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """serializer"""
 
     class Meta:
@@ -32,7 +174,7 @@ class PlanificacionProfesorSerializer(serializers.ModelSerializer):
 # @brief Serializa el modelo `Datos_basicos`.
 #
 # Convierte el modelo `Datos_basicos` a un formato que pueda ser transmitido y manipulado fácilmente en la API.
-class DatosBasicosSerializer(serializers.ModelSerializer):
+class DatosBasicosSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """serializer"""
 
     class Meta:
@@ -69,7 +211,7 @@ class UserSerializer(serializers.ModelSerializer):
 # @brief Serializa el modelo `Datos_basicos`.
 #
 # Este serializador convierte el modelo `Datos_basicos` en un formato adecuado para su transmisión en formato JSON o XML.
-class DatosBasicosSerializer(serializers.ModelSerializer):
+class DatosBasicosSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """serializer"""
 
     class Meta:
@@ -81,7 +223,7 @@ class DatosBasicosSerializer(serializers.ModelSerializer):
 # @brief Serializa el modelo `datos_maestria`.
 #
 # Este serializador se encarga de convertir el modelo `datos_maestria` en un formato adecuado para su uso en la API.
-class DatosMaestriaSerializer(serializers.ModelSerializer):
+class DatosMaestriaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """serializer"""
 
     class Meta:
@@ -93,7 +235,7 @@ class DatosMaestriaSerializer(serializers.ModelSerializer):
 # @brief Serializa el modelo `estudiante_datos`.
 #
 # Este serializador convierte el modelo `estudiante_datos` en un formato adecuado para su serialización a JSON o XML.
-class EstudianteDatosSerializer(serializers.ModelSerializer):
+class EstudianteDatosSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """serializer"""
 
     class Meta:
@@ -105,7 +247,7 @@ class EstudianteDatosSerializer(serializers.ModelSerializer):
 # @brief Serializa el modelo `Cohorte`.
 #
 # Este serializador convierte el modelo `Cohorte` a un formato adecuado para su uso en la transmisión de datos.
-class CohorteSerializer(serializers.ModelSerializer):
+class CohorteSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """serializer"""
 
     class Meta:
@@ -117,7 +259,7 @@ class CohorteSerializer(serializers.ModelSerializer):
 # @brief Serializa el modelo `roles`.
 #
 # Este serializador convierte el modelo `roles` en un formato adecuado para la API, permitiendo su fácil transmisión.
-class RolesSerializer(serializers.ModelSerializer):
+class RolesSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """serializer"""
 
     class Meta:
@@ -130,11 +272,14 @@ class RolesSerializer(serializers.ModelSerializer):
 #
 # Este serializador convierte el modelo `materias_pensum` en un formato adecuado para la transmisión de datos
 # relacionados con las materias del pensum.
-class MateriasPensumSerializer(serializers.ModelSerializer):
+class MateriasPensumSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """serializer"""
 
     # cod_maestria = DatosMaestriaSerializer()
 
+    campos_extra = {"maestria": ("cod_maestria",)}
+    relaciones_extra = {"maestria": ("cod_maestria",)}
+
     class Meta:
         model = models.materias_pensum
         fields = "__all__"
@@ -142,13 +287,17 @@ class MateriasPensumSerializer(serializers.ModelSerializer):
     def to_representation(self, instance):
         representation = super().to_representation(instance)
         # Añadir la representación del modelo relacionado en la nueva propiedad 'materia'
-        representation["maestria"] = DatosMaestriaSerializer(instance.cod_maestria).data
+        if self.incluye_campo("maestria"):
+            representation["maestria"] = DatosMaestriaSerializer(instance.cod_maestria).data
         return representation
 
 
-class AsignarProfesorMateriaSerializer(serializers.ModelSerializer):
+class AsignarProfesorMateriaSerializer(CargaMasivaMixin, CamposDinamicosMixin, serializers.ModelSerializer):
 
     # cod_materia = MateriasPensumSerializer()
+    campos_extra = {"materia": ("cod_materia",)}
+    relaciones_extra = {"materia": ("cod_materia__cod_maestria",)}
+
     class Meta:
         model = models.AsignarProfesorMateria
         fields = "__all__"
@@ -158,7 +307,8 @@ class AsignarProfesorMateriaSerializer(serializers.ModelSerializer):
 
         # if self.context.get('resolve_relation', False):
         # Añadir la representación del modelo relacionado en la nueva propiedad 'materia'
-        representation["materia"] = MateriasPensumSerializer(instance.cod_materia).data
+        if self.incluye_campo("materia"):
+            representation["materia"] = MateriasPensumSerializer(instance.cod_materia).data
         return representation
 
 
@@ -167,7 +317,7 @@ class AsignarProfesorMateriaSerializer(serializers.ModelSerializer):
 #
 # Este serializador convierte el modelo `datos_login` en un formato adecuado para su transmisión, permitiendo el uso
 # de la información de inicio de sesión en la API.
-class DatosLoginSerializer(serializers.ModelSerializer):
+class DatosLoginSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """serializer"""
 
     class Meta:
@@ -179,19 +329,20 @@ class DatosLoginSerializer(serializers.ModelSerializer):
 # @brief Serializa el modelo `listado_estudiantes`.
 #
 # Este serializador convierte el modelo `listado_estudiantes` en un formato adecuado para su uso en la API.
-class ListadoEstudiantesSerializer(serializers.ModelSerializer):
+class ListadoEstudiantesSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """serializer"""
 
     class Meta:
         model = models.listado_estudiantes
         fields = "__all__"
+        read_only_fields = ("version",)
 
 
 ## @class ProfesoresSerializer
 # @brief Serializa el modelo `profesores`.
 #
 # Este serializador convierte el modelo `profesores` en un formato adecuado para la transmisión de datos en la API.
-class ProfesoresSerializer(serializers.ModelSerializer):
+class ProfesoresSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """serializer"""
 
     class Meta:
@@ -203,7 +354,7 @@ class ProfesoresSerializer(serializers.ModelSerializer):
 # @brief Serializa el modelo `tabla_pagos`.
 #
 # Este serializador convierte el modelo `tabla_pagos` en un formato adecuado para su uso en la API de pagos.
-class TablaPagosSerializer(serializers.ModelSerializer):
+class TablaPagosSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """serializer"""
 
     # cedula_responsable = DatosBasicosSerializer()
@@ -244,9 +395,80 @@ class TablaPagosSerializer(serializers.ModelSerializer):
 # @brief Serializa el modelo `tabla_solicitudes`.
 #
 # Este serializador convierte el modelo `tabla_solicitudes` en un formato adecuado para su uso en la API de solicitudes.
-class TablaSolicitudesSerializer(serializers.ModelSerializer):
+class TablaSolicitudesSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """serializer"""
 
     class Meta:
         model = models.tabla_solicitudes
         fields = "__all__"
+
+
+## @class ImportacionUsuarioSerializer
+# @brief Valida una fila de la importación masiva de usuarios (`main/user_import.py`).
+#
+# Aplica las mismas reglas que `DatosBasicosSerializer` sobre los campos de `Datos_basicos`, pero sin la validación
+# de unicidad de la cédula, que en la importación significa actualizar al usuario existente. El tipo de usuario
+# debe existir en el catálogo de roles, como exige `DatosBasicosCreateView`.
+class ImportacionUsuarioSerializer(serializers.Serializer):
+    """serializer"""
+
+    cedula = serializers.CharField()
+    nombre = serializers.CharField()
+    apellido = serializers.CharField()
+    tipo_usuario = serializers.IntegerField()
+    contraseña = serializers.CharField()
+    correo = serializers.EmailField(allow_blank=True, max_length=254)
+
+    def validate_tipo_usuario(self, value):
+        if not role_catalog.exists(value):
+            raise ValidationError("Tipo de usuario no encontrado.")
+        return value
+
+
+## @class NotaEstudianteSerializer
+# @brief Valida la nota de un estudiante en la carga de notas de una sección (`main/grades.py`).
+#
+# `version` es la versión de la inscripción que el profesor leyó; `nota` puede ser nula para borrar la nota.
+class NotaEstudianteSerializer(serializers.Serializer):
+    """serializer"""
+
+    cedula_estudiante = serializers.CharField()
+    nota = serializers.IntegerField(min_value=GRADE_MIN, max_value=GRADE_MAX, allow_null=True)
+    version = serializers.IntegerField(min_value=0)
+
+    def validate_cedula_estudiante(self, value):
+        return value.upper()
+
+
+## @class InscripcionEstudiantesSerializer
+# @brief Valida la inscripción en lote de estudiantes en una materia de una cohorte (`main/enrollment.py`).
+#
+# Las claves se normalizan a mayúsculas, como en el resto de las vistas. Las cédulas registradas en `Datos_basicos`
+# deben ser de estudiantes; las que no están registradas se informan como no encontradas al inscribir.
+class InscripcionEstudiantesSerializer(serializers.Serializer):
+    """serializer"""
+
+    codigo_cohorte = serializers.CharField()
+    cod_materia = serializers.CharField()
+    cedula_profesor = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    cedulas = serializers.ListField(child=serializers.CharField(), allow_empty=False)
+
+    def validate_codigo_cohorte(self, value):
+        return value.upper()
+
+    def validate_cod_materia(self, value):
+        return value.upper()
+
+    def validate_cedula_profesor(self, value):
+        return value.upper() if value else None
+
+    def validate_cedulas(self, value):
+        cedulas = [cedula.upper() for cedula in value]
+        no_estudiantes = sorted(
+            models.Datos_basicos.objects.filter(cedula__in=cedulas)
+            .exclude(tipo_usuario=models.Roles.ESTUDIANTE.value)
+            .values_list("cedula", flat=True)
+        )
+        if no_estudiantes:
+            raise ValidationError(f"Las cédulas {', '.join(no_estudiantes)} no son de estudiantes.")
+        return cedulas
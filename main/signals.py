@@ -0,0 +1,163 @@
+##
+# @file signals.py
+# @brief Receptores de señales de los modelos de la aplicación "main".
+#
+# Este archivo conecta las señales `post_save` y `post_delete` de Django con la invalidación de las cachés
+# en memoria definidas en `main/cache.py`, con la revocación de tokens por versión y con las versiones por
+# tabla que usan los ETag de los listados y con los catálogos de tablas de referencia (`main/catalog.py`). También
+# suscribe esas cachés al bus de invalidación (`main/invalidation.py`) para que los demás procesos las descarten.
+# Los receptores se registran al cargar la aplicación desde `MainConfig.ready`.
+#
+# @see Django Docs: https://docs.djangoproject.com/en/stable/topics/signals/
+#
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .cache import TOKEN_VERSION_DELETED, principal_cache, set_token_version
+from .catalog import CATALOGS
+from .invalidation import invalidation_bus
+from .models import (
+    AsignarProfesorMateria, Cohorte, Datos_basicos, datos_login, datos_maestria,
+    listado_estudiantes, materias_pensum, profesores, roles, tabla_pagos, tabla_solicitudes,
+)
+from .table_versions import bump_table_version
+
+## @brief Modelos cuyos listados se sirven con ETag (ver `main/table_versions.py`).
+VERSIONED_MODELS = (
+    AsignarProfesorMateria, Cohorte, Datos_basicos, datos_maestria, listado_estudiantes,
+    materias_pensum, profesores, tabla_pagos, tabla_solicitudes,
+)
+
+
+@receiver([post_save, post_delete], sender=datos_login)
+def invalidar_usuario_autenticado(sender, instance, **kwargs):
+    """
+    @brief Descarta de la caché los tokens del usuario cuyo registro de login cambió o se eliminó.
+
+    Al eliminar un registro de `Datos_basicos`, la eliminación en cascada de `datos_login` también dispara
+    esta señal, por lo que `EliminarUsuariosView` invalida la caché sin pasos adicionales. Al confirmar la
+    transacción se publica la clave del usuario para que los demás procesos descarten solo sus entradas.
+    """
+    principal_cache.invalidate_user(instance.pk)
+    pk = instance.pk
+    transaction.on_commit(lambda: invalidation_bus.publish_keys(datos_login, [pk]))
+
+
+@receiver(pre_save, sender=datos_login)
+def detectar_cambio_credenciales(sender, instance, **kwargs):
+    """
+    @brief Marca la instancia si su contraseña o su rol cambian respecto a lo guardado en la base de datos.
+    """
+    if instance.pk is None:
+        return
+    anterior = sender.objects.filter(pk=instance.pk).values(
+        "contraseña_usuario", "tipo_usuario_id"
+    ).first()
+    instance._revocar_tokens = anterior is not None and (
+        anterior["contraseña_usuario"] != instance.contraseña_usuario
+        or anterior["tipo_usuario_id"] != instance.tipo_usuario_id
+    )
+
+
+@receiver(post_save, sender=datos_login)
+def publicar_version_token(sender, instance, **kwargs):
+    """
+    @brief Incrementa la versión de token del usuario si cambiaron sus credenciales y la publica en la caché.
+
+    El incremento se hace con una actualización atómica, ya que `update_or_create` guarda solo los campos
+    indicados y no incluiría el nuevo valor de `version_token`.
+    """
+    if getattr(instance, "_revocar_tokens", False):
+        sender.objects.filter(pk=instance.pk).update(version_token=F("version_token") + 1)
+        instance.refresh_from_db(fields=["version_token"])
+        instance._revocar_tokens = False
+        principal_cache.invalidate_user(instance.pk)
+    set_token_version(instance.pk, instance.version_token)
+
+
+@receiver(post_delete, sender=datos_login)
+def revocar_tokens_usuario_eliminado(sender, instance, **kwargs):
+    """
+    @brief Revoca todos los tokens de un usuario eliminado.
+    """
+    set_token_version(instance.pk, TOKEN_VERSION_DELETED)
+
+
+@receiver(pre_save, sender=listado_estudiantes)
+def incrementar_version_inscripcion(sender, instance, **kwargs):
+    """
+    @brief Incrementa la versión de una inscripción existente al guardarla (ver `main/grades.py`).
+
+    El incremento se hace en la base de datos, para no partir de la versión de una instancia leída antes.
+    """
+    if not instance._state.adding:
+        instance.version = F("version") + 1
+
+
+@receiver(post_save, sender=listado_estudiantes)
+def recargar_version_inscripcion(sender, instance, created, **kwargs):
+    """
+    @brief Reemplaza la expresión de incremento por la versión guardada.
+    """
+    if not created:
+        instance.refresh_from_db(fields=["version"])
+
+
+@receiver([post_save, post_delete], sender=roles)
+def invalidar_roles(sender, instance, **kwargs):
+    """
+    @brief Vacía la caché de usuarios cuando cambia un rol, ya que cada usuario guarda su rol precargado.
+    """
+    principal_cache.clear()
+
+
+def cambiar_version_tabla(sender, **kwargs):
+    """
+    @brief Cambia la versión de la tabla del modelo modificado una vez confirmada la transacción.
+
+    Si la versión cambiara antes del commit, otra solicitud podría asociar la versión nueva a los datos viejos.
+    """
+    transaction.on_commit(lambda: bump_table_version(sender))
+
+
+for _catalog in CATALOGS.values():
+    for _model in (_catalog.model, *_catalog.depends_on):
+        invalidation_bus.subscribe(_model, _catalog.invalidate)
+
+# Los demás procesos descartan solo los usuarios modificados; un cambio de rol vacía la caché, ya que cada usuario
+# guarda su rol precargado
+invalidation_bus.subscribe_keys(datos_login, principal_cache.invalidate_users)
+invalidation_bus.subscribe(roles, principal_cache.clear)
+
+## @brief Modelos que publican su versión: los listados con ETag y los que tienen cachés suscritas al bus.
+BROADCAST_MODELS = tuple(dict.fromkeys(VERSIONED_MODELS + invalidation_bus.models))
+
+for _model in BROADCAST_MODELS:
+    post_save.connect(cambiar_version_tabla, sender=_model, dispatch_uid=f"version_{_model.__name__}_save")
+    post_delete.connect(cambiar_version_tabla, sender=_model, dispatch_uid=f"version_{_model.__name__}_delete")
+
+
+def invalidar_catalogos(sender, **kwargs):
+    """
+    @brief Descarta los catálogos en memoria que dependen del modelo modificado.
+
+    Se invalida de inmediato, para que la propia transacción no lea datos viejos, y otra vez al confirmarla, por
+    si otra solicitud recargó el catálogo con los datos anteriores mientras tanto.
+    """
+    for catalog in CATALOGS.values():
+        if sender is catalog.model or sender in catalog.depends_on:
+            catalog.invalidate()
+            transaction.on_commit(catalog.invalidate)
+
+
+## @brief Modelos que alimentan algún catálogo, sin repetir.
+CATALOG_MODELS = tuple(dict.fromkeys(
+    model for catalog in CATALOGS.values() for model in (catalog.model, *catalog.depends_on)
+))
+
+for _model in CATALOG_MODELS:
+    post_save.connect(invalidar_catalogos, sender=_model, dispatch_uid=f"catalogo_{_model.__name__}_save")
+    post_delete.connect(invalidar_catalogos, sender=_model, dispatch_uid=f"catalogo_{_model.__name__}_delete")
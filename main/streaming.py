@@ -0,0 +1,65 @@
+##
+# @file streaming.py
+# @brief Respuestas JSON transmitidas por partes para listados grandes.
+#
+# Los listados normales construyen toda la lista en memoria antes de enviar el primer byte. Las funciones de este
+# archivo recorren el queryset con `.iterator(chunk_size=...)` (cursor del lado del servidor en PostgreSQL) y
+# emiten el arreglo JSON de forma incremental mediante `StreamingHttpResponse`, de modo que la memoria usada y el
+# tiempo hasta el primer byte no dependen del tamaño de la tabla.
+#
+# Ejemplo: `GET /api/listado_estudiantes/?q_code=...&stream=1`.
+#
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+from .renderers import json_dumps
+
+## @brief Valores del parámetro `stream` que activan la transmisión por partes.
+STREAM_TRUE_VALUES = ("1", "true", "si", "sí")
+
+
+def streaming_requested(params):
+    """
+    @brief Indica si los parámetros de la solicitud (`query_params` o `GET`) piden una respuesta transmitida.
+    """
+    return params.get("stream", "").lower() in STREAM_TRUE_VALUES
+
+
+def iter_json_array(items, to_representation, rows_per_chunk=None):
+    """
+    @brief Genera los bytes de un arreglo JSON por bloques de filas, con el mismo formato que el renderer de la API.
+
+    @param items Iterable de filas (por ejemplo, `queryset.iterator()`).
+    @param to_representation Función que convierte cada fila en un valor serializable.
+    @param rows_per_chunk Número de filas por bloque emitido.
+    """
+    rows_per_chunk = rows_per_chunk or getattr(settings, "STREAMING_CHUNK_SIZE", 2000)
+    yield b"["
+    buffer = []
+    first = True
+    for item in items:
+        encoded = json_dumps(to_representation(item))
+        buffer.append(encoded if first else b"," + encoded)
+        first = False
+        if len(buffer) >= rows_per_chunk:
+            yield b"".join(buffer)
+            buffer = []
+    if buffer:
+        yield b"".join(buffer)
+    yield b"]"
+
+
+def streaming_json_response(queryset, to_representation=None):
+    """
+    @brief Devuelve una respuesta que transmite el queryset como arreglo JSON sin cargarlo completo en memoria.
+
+    @param queryset Queryset (o `values()`) a recorrer con un cursor del lado del servidor.
+    @param to_representation Conversión de cada fila; por defecto la fila se emite tal cual.
+    """
+    chunk_size = getattr(settings, "STREAMING_CHUNK_SIZE", 2000)
+    rows = queryset.iterator(chunk_size=chunk_size)
+    return StreamingHttpResponse(
+        iter_json_array(rows, to_representation or (lambda row: row), chunk_size),
+        content_type="application/json",
+    )
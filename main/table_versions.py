@@ -0,0 +1,125 @@
+##
+# @file table_versions.py
+# @brief Versiones por tabla y respuestas condicionales (ETag / If-None-Match) para los listados.
+#
+# Cada modelo listado por la API tiene un token de versión guardado en la caché de Django (`CACHES`). El token
+# cambia cada vez que se guarda o elimina una fila (señales `post_save`/`post_delete` en `main/signals.py`) o
+# cuando una vista modifica filas de forma masiva. Las vistas calculan un ETag fuerte a partir de las versiones
+# de las tablas que intervienen en la respuesta y de la URL solicitada, y responden `304 Not Modified` antes de
+# consultar la base de datos si el cliente ya tiene esa versión.
+#
+# Los tokens solo son coherentes entre workers si la caché es compartida (Redis, Memcached, base de datos o
+# archivos). Con `LocMemCache` cada proceso tendría sus propios tokens y podría responder 304 con datos que otro
+# proceso ya modificó, por lo que en ese caso los listados no envían ETag (ver también `main/checks.py`).
+#
+# @see RFC 9110, sección 13.1.2 (If-None-Match)
+#
+
+import hashlib
+import uuid
+
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+from .cache import shared_cache_configured
+
+
+def _version_key(model):
+    return f"table_version:{model._meta.label_lower}"
+
+
+def table_versions(models):
+    """
+    @brief Devuelve el token de versión de cada modelo, con una sola consulta a la caché.
+
+    Si un modelo aún no tiene versión (caché vacía o entrada descartada), se le asigna una nueva aleatoria,
+    lo que invalida cualquier ETag calculado antes.
+
+    @param models Secuencia de clases de modelo.
+    @return list: Tokens de versión en el mismo orden que `models`.
+    """
+    keys = [_version_key(model) for model in models]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def bump_table_version(*models):
+    """
+    @brief Cambia el token de versión de los modelos indicados.
+
+    Debe llamarse después de cualquier escritura que no dispare señales, como `QuerySet.update()`,
+    `bulk_create()` o `bulk_update()`.
+    """
+    cache.set_many({_version_key(model): uuid.uuid4().hex for model in models}, timeout=None)
+
+
+def compute_etag(request, models):
+    """
+    @brief Calcula el ETag fuerte de un listado a partir de las versiones de sus tablas y de la URL.
+    """
+    digest = hashlib.sha1()
+    for version in table_versions(models):
+        digest.update(version.encode())
+    digest.update(request.get_full_path().encode())
+    renderer = getattr(request, "accepted_media_type", "") or ""
+    digest.update(renderer.encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(request, etag):
+    """
+    @brief Indica si el encabezado `If-None-Match` de la solicitud contiene `etag`.
+
+    Usa la comparación débil, por lo que también acepta el ETag debilitado (`W/"..."`) por la compresión.
+    """
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    candidates = [value.strip() for value in header.split(",")]
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag for candidate in candidates
+    )
+
+
+class ConditionalListMixin:
+    """
+    @brief Mixin para vistas de listado que responden `304 Not Modified` según las versiones de sus tablas.
+
+    Las vistas indican en `etag_models` las tablas de las que depende la respuesta (incluyendo las relaciones
+    que se serializan anidadas).
+    """
+
+    etag_models = ()
+
+    def get_etag_models(self):
+        """
+        @brief Devuelve los modelos de los que depende la respuesta del listado.
+        """
+        return self.etag_models
+
+    def not_modified_response(self, request):
+        """
+        @brief Calcula el ETag del listado y, si el cliente ya lo tiene, devuelve la respuesta 304.
+        @return tuple: (etag o None si la caché no es compartida, respuesta 304 o None).
+        """
+        if not shared_cache_configured():
+            return None, None
+        etag = compute_etag(request, self.get_etag_models())
+        if etag_matches(request, etag):
+            return etag, self.with_etag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+        return etag, None
+
+    def with_etag(self, response, etag):
+        """
+        @brief Agrega a la respuesta el ETag y la política de revalidación, si se calculó un ETag.
+        """
+        if etag is None:
+            return response
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
@@ -1,7 +1,1614 @@
-'''
-no utilize el archivo tests.py
-'''
+##
+# @file tests.py
+# @brief Pruebas de regresión de la aplicación "main".
+#
+# Se ejecutan sobre PostgreSQL con las migraciones aplicadas: `python manage.py test main`.
+#
 
-from django.test import TestCase
+import datetime
+import decimal
+import importlib
+import inspect
+import io
+import json
+import os
+import tempfile
+import unittest
+import uuid
+import zlib
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed, ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from . import cohort_codes, deletion, exports, grades, renderers, serializers, user_import
+from .authentication import CustomJWTAuthentication, generar_tokens
+from .cache import principal_cache
+from .catalog import CATALOGS, materia_catalog, role_catalog
+from .enrollment import enroll_students
+from .fast_serialization import COMPILED_CACHE_SIZE, RowSerializer, _compiled
+from .invalidation import InvalidationBus, _event_key, invalidation_bus
+from .middleware import ENCODERS, negotiate_encoding
+from .models import (
+    AsignarProfesorMateria, Cohorte, Datos_basicos, PlanificacionProfesor, Roles, TareaEliminacion,
+    TareaExportacion, datos_login,
+    datos_maestria, estudiante_datos, listado_estudiantes, materias_pensum, profesores, roles, tabla_pagos,
+    tabla_solicitudes,
+)
+from .route_permissions import RouteIndex, view_class_of
+from .serializers import DatosBasicosSerializer
+from .views import BaseCRUDView
+
+
+def cache_compartida():
+    """
+    @brief Configuración de `CACHES` con un backend compartido entre procesos (archivos en un directorio temporal).
+    """
+    return {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": tempfile.mkdtemp(prefix="cache-pruebas-"),
+        }
+    }
+
+
+def nombres_indices(plan):
+    """
+    @brief Devuelve los nombres de los índices recorridos en un plan de `EXPLAIN (FORMAT JSON)`.
+    """
+    encontrados = []
+    pendientes = [plan]
+    while pendientes:
+        nodo = pendientes.pop()
+        if isinstance(nodo, list):
+            pendientes.extend(nodo)
+        elif isinstance(nodo, dict):
+            if "Index Name" in nodo:
+                encontrados.append(nodo["Index Name"])
+            pendientes.extend(nodo.get("Plans", ()))
+            if "Plan" in nodo:
+                pendientes.append(nodo["Plan"])
+    return encontrados
+
+
+def tipos_de_nodo(plan):
+    """
+    @brief Devuelve los pares (tipo de nodo, tabla) de un plan de `EXPLAIN (FORMAT JSON)`.
+    """
+    encontrados = []
+    pendientes = [plan]
+    while pendientes:
+        nodo = pendientes.pop()
+        if isinstance(nodo, list):
+            pendientes.extend(nodo)
+        elif isinstance(nodo, dict):
+            if "Node Type" in nodo:
+                encontrados.append((nodo["Node Type"], nodo.get("Relation Name")))
+            pendientes.extend(nodo.get("Plans", ()))
+            if "Plan" in nodo:
+                pendientes.append(nodo["Plan"])
+    return encontrados
+
+
+def indices_de_la_consulta(sql):
+    """
+    @brief Ejecuta `EXPLAIN` sobre `sql` sin recorridos secuenciales y devuelve los índices que usa el plan.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        cursor.execute("EXPLAIN (FORMAT JSON) " + sql)
+        plan = cursor.fetchone()[0]
+        cursor.execute("RESET enable_seqscan")
+    return nombres_indices(json.loads(plan) if isinstance(plan, str) else plan)
+
+
+def sembrar_listados(indices):
+    """
+    @brief Crea, para cada índice, una fila con sus relaciones en cada tabla listada por `BaseCRUDView`.
+
+    Cada fila apunta a relaciones distintas, de modo que una consulta por fila se note en el total.
+    """
+    ahora = timezone.now()
+    for i in indices:
+        usuario = Datos_basicos.objects.create(
+            cedula=f"U{i}", nombre=f"NOMBRE{i}", apellido="APELLIDO", tipo_usuario=2, contraseña="x", correo="",
+        )
+        maestria = datos_maestria.objects.create(cod_maestria=i, nombre_maestria=f"MAESTRIA{i}")
+        materia = materias_pensum.objects.create(cod_materia=f"M{i}", cod_maestria=maestria, nombre_materia="MATERIA")
+        cohorte = Cohorte.objects.create(
+            codigo_cohorte=f"C{i}", fecha_inicio=ahora, fecha_fin=ahora, sede_cohorte="barcelona", tipo_maestria="GG",
+        )
+        profesores.objects.create(ci_profesor=usuario, cod_maestria_prof=maestria)
+        AsignarProfesorMateria.objects.create(
+            cod_materia=materia, nom_materia="MATERIA", cedula_profesor=usuario, fecha_inicio=ahora, fecha_fin=ahora,
+            codigo_cohorte=cohorte,
+        )
+        listado_estudiantes.objects.create(
+            cedula_estudiante=usuario, nombre="NOMBRE", apellido="APELLIDO", cod_materia=materia,
+            codigo_cohorte=cohorte, nombre_materia="MATERIA", profesor_ci="P", nota=i % 21,
+        )
+        tabla_pagos.objects.create(
+            cedula_responsable=usuario, numero_referencia=i, banco_pago="BANCO", fecha_pago=ahora, monto_pago=i,
+        )
+        tabla_solicitudes.objects.create(
+            cedula_responsable=usuario, cod_solicitudes=f"S{i}", nombre_estudiante="NOMBRE",
+            apellido_estudiante="APELLIDO", fecha_solicitud=ahora, status_solicitud="PENDIENTE", tipo_solicitud="X",
+        )
+
+
+class UsuariosMixin:
+    """
+    @brief Crea los roles y permite registrar usuarios con su `datos_login` y autenticar al cliente de pruebas.
+    """
+
+    @classmethod
+    def crear_roles(cls):
+        for rol in Roles:
+            roles.objects.get_or_create(codigo_rol=rol.value, defaults={"nombre_rol": rol.name.lower()})
+
+    @classmethod
+    def crear_usuario(cls, cedula, rol=Roles.ADMIN):
+        Datos_basicos.objects.create(
+            cedula=cedula, nombre="NOMBRE", apellido="APELLIDO", tipo_usuario=rol.value, contraseña="x", correo="",
+        )
+        return datos_login.objects.create(cedula_usuario_id=cedula, contraseña_usuario="x", tipo_usuario_id=rol.value)
+
+    @classmethod
+    def crear_pagos(cls, cedula, referencias, fecha=None):
+        fecha = fecha or timezone.now()
+        return tabla_pagos.objects.bulk_create(
+            tabla_pagos(
+                cedula_responsable_id=cedula, numero_referencia=referencia, banco_pago="BANCO",
+                fecha_pago=fecha - datetime.timedelta(days=referencia // 2), monto_pago=10 * referencia,
+                nombre_estudiante="NOMBRE", apellido_estudiante="APELLIDO",
+            )
+            for referencia in referencias
+        )
+
+    def cliente(self, login=None):
+        client = APIClient()
+        if login is not None:
+            client.credentials(HTTP_AUTHORIZATION="Bearer " + generar_tokens(login)["access"])
+        return client
+
+
+class InscripcionEstudiantesTests(UsuariosMixin, TestCase):
+    """
+    @brief Inscripción en lote de `main/enrollment.py` sobre el esquema migrado.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.crear_roles()
+        cls.admin = cls.crear_usuario("A1")
+        cls.crear_usuario("P1", Roles.PROFESOR)
+        maestria = datos_maestria.objects.create(cod_maestria=1, nombre_maestria="GERENCIA")
+        cohorte = Cohorte.objects.create(
+            codigo_cohorte="C-A-2026", fecha_inicio=timezone.now(), fecha_fin=timezone.now(),
+            sede_cohorte="barcelona", tipo_maestria="GG",
+        )
+        materia = materias_pensum.objects.create(cod_materia="MAT1", cod_maestria=maestria, nombre_materia="FINANZAS")
+        AsignarProfesorMateria.objects.create(
+            cod_materia=materia, nom_materia="FINANZAS", cedula_profesor_id="P1", fecha_inicio=timezone.now(),
+            fecha_fin=timezone.now(), codigo_cohorte=cohorte,
+        )
+        for cedula in ("E1", "E2"):
+            Datos_basicos.objects.create(
+                cedula=cedula, nombre="NOMBRE", apellido="APELLIDO", tipo_usuario=2, contraseña="x", correo="",
+            )
+
+    def setUp(self):
+        for catalog in CATALOGS.values():
+            catalog.invalidate()
+            self.addCleanup(catalog.invalidate)
+
+    def inscribir(self, cuerpo):
+        return self.cliente(self.admin).post("/api/inscribir-estudiantes/", cuerpo, format="json")
+
+    def test_inscripcion_usa_version_inicial(self):
+        """
+        @brief El `INSERT` directo de `enroll_students` no lista `version`; la columna toma su valor por defecto.
+        """
+        result = enroll_students("C-A-2026", "MAT1", ["E1", "E2", "E1"], ("P1", "PROF", "X", None))
+
+        self.assertEqual(result.inscritos, ["E1", "E2"])
+        self.assertEqual(
+            set(listado_estudiantes.objects.values_list("cedula_estudiante", "version")), {("E1", 0), ("E2", 0)}
+        )
+
+    def test_reinscripcion_se_omite(self):
+        """
+        @brief Las inscripciones repetidas se informan como ya inscritas sin duplicarse.
+        """
+        enroll_students("C-A-2026", "MAT1", ["E1"], ("P1", "PROF", "X", None))
+        result = enroll_students("C-A-2026", "MAT1", ["E1", "E9"], ("P1", "PROF", "X", None))
+
+        self.assertEqual(result.inscritos, [])
+        self.assertEqual(result.ya_inscritos, ["E1"])
+        self.assertEqual(result.no_encontrados, ["E9"])
+        self.assertEqual(listado_estudiantes.objects.count(), 1)
+
+    def test_vista_inscribe_con_claves_en_mayusculas(self):
+        response = self.inscribir({"codigo_cohorte": "c-a-2026", "cod_materia": "mat1", "cedulas": ["e1", "E9"]})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {"inscritos": ["E1"], "ya_inscritos": [], "no_encontrados": ["E9"]})
+        self.assertEqual(listado_estudiantes.objects.get().profesor_ci, "P1")
+
+    def test_vista_rechaza_cuerpos_invalidos(self):
+        validos = {"codigo_cohorte": "C-A-2026", "cod_materia": "MAT1", "cedulas": ["E1"]}
+
+        for cuerpo in ([validos], {**validos, "cedulas": []}, {**validos, "cedulas": "E1"},
+                       {**validos, "cedulas": [["E1"]]}, {**validos, "cod_materia": None}):
+            with self.subTest(cuerpo=cuerpo):
+                self.assertEqual(self.inscribir(cuerpo).status_code, 400)
+        self.assertFalse(listado_estudiantes.objects.exists())
+
+    def test_vista_solo_inscribe_estudiantes(self):
+        response = self.inscribir({"codigo_cohorte": "C-A-2026", "cod_materia": "MAT1", "cedulas": ["E1", "P1"]})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("P1", str(response.json()["cedulas"]))
+        self.assertFalse(listado_estudiantes.objects.exists())
+
+
+class InscripcionesRepetidasMigracionTests(TestCase):
+    """
+    @brief Limpieza de inscripciones repetidas de la migración 0026 antes de crear la restricción única.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        sembrar_listados([1])
+
+    def setUp(self):
+        # Sin la restricción se pueden crear las filas repetidas que la migración debe limpiar. Las claves foráneas
+        # diferidas se verifican antes, porque PostgreSQL no altera una tabla con verificaciones pendientes.
+        with connection.cursor() as cursor:
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        with connection.schema_editor() as editor:
+            editor.remove_constraint(listado_estudiantes, listado_estudiantes._meta.constraints[0])
+        self.migracion = importlib.import_module("main.migrations.0026_listado_estudiantes_unique_inscripcion")
+
+    def repetir(self, *notas):
+        original = listado_estudiantes.objects.get()
+        for nota in notas:
+            listado_estudiantes.objects.create(
+                cedula_estudiante_id="U1", nombre="NOMBRE", apellido="APELLIDO", cod_materia_id="M1",
+                codigo_cohorte_id="C1", nombre_materia="MATERIA", profesor_ci="P", nota=nota,
+            )
+        return original
+
+    def limpiar(self):
+        with connection.schema_editor() as editor:
+            self.migracion.eliminar_inscripciones_repetidas(apps, editor)
+
+    def test_conserva_la_fila_con_nota(self):
+        listado_estudiantes.objects.update(nota=None)
+        self.repetir(None, 15, None)
+
+        self.limpiar()
+
+        self.assertEqual(list(listado_estudiantes.objects.values_list("nota", flat=True)), [15])
+
+    def test_sin_notas_conserva_la_mas_antigua(self):
+        original = self.repetir()
+        listado_estudiantes.objects.update(nota=None)
+        self.repetir(None, None)
+
+        self.limpiar()
+
+        self.assertEqual(list(listado_estudiantes.objects.values_list("pk", flat=True)), [original.pk])
+
+    def test_se_detiene_con_mas_de_una_nota(self):
+        self.repetir(None, 12)
+
+        with self.assertRaisesMessage(RuntimeError, "U1 / M1 / C1"):
+            self.limpiar()
+        self.assertEqual(listado_estudiantes.objects.count(), 3)
+
+
+class ExportacionParametrosTests(TestCase):
+    """
+    @brief Validación de los filtros de `main/exports.py`.
+    """
+
+    def test_tipo_usuario_se_convierte_a_entero(self):
+        self.assertEqual(exports.export_params("usuarios", {"tipo_usuario": "3"}), {"tipo_usuario": 3})
+
+    def test_tipo_usuario_no_numerico(self):
+        with self.assertRaisesMessage(ValueError, "El tipo de usuario debe ser un número entero"):
+            exports.export_params("usuarios", {"tipo_usuario": "abc"})
+
+
+class ExpiracionExportacionesTests(TestCase):
+    """
+    @brief Eliminación de los archivos XLSX vencidos de `main/exports.py`.
+    """
+
+    def crear_tarea(self, antiguedad):
+        descriptor, ruta = tempfile.mkstemp(suffix=".xlsx")
+        os.close(descriptor)
+        self.addCleanup(lambda: os.path.exists(ruta) and os.remove(ruta))
+        tarea = TareaExportacion.objects.create(
+            listado="usuarios", estado=TareaExportacion.COMPLETADA, archivo=ruta
+        )
+        TareaExportacion.objects.filter(pk=tarea.pk).update(fecha_actualizacion=timezone.now() - antiguedad)
+        return TareaExportacion.objects.get(pk=tarea.pk)
+
+    def test_expira_solo_los_archivos_vencidos(self):
+        vencida = self.crear_tarea(datetime.timedelta(seconds=exports.EXPORT_TTL + 60))
+        vigente = self.crear_tarea(datetime.timedelta(seconds=60))
+
+        self.assertTrue(exports.is_expired(vencida))
+        self.assertFalse(exports.is_expired(vigente))
+        self.assertEqual(exports.expire_files(), 1)
+
+        self.assertFalse(os.path.exists(vencida.archivo))
+        self.assertTrue(os.path.exists(vigente.archivo))
+        vencida.refresh_from_db()
+        self.assertEqual(vencida.estado, TareaExportacion.EXPIRADA)
+        self.assertIsNone(vencida.archivo)
+
+    def test_expirar_sin_archivo(self):
+        tarea = self.crear_tarea(datetime.timedelta(seconds=exports.EXPORT_TTL + 60))
+        os.remove(tarea.archivo)
+
+        exports.expire(tarea)
+
+        tarea.refresh_from_db()
+        self.assertEqual(tarea.estado, TareaExportacion.EXPIRADA)
+
+
+class CamposDinamicosTests(TestCase):
+    """
+    @brief Parámetro `?fields=` de `CamposDinamicosMixin` y caché de planes de `main/fast_serialization.py`.
+    """
+
+    def test_campos_repetidos_se_descartan(self):
+        self.assertEqual(DatosBasicosSerializer.validar_campos("cedula,nombre,cedula, nombre"), ["cedula", "nombre"])
+
+    def test_cache_de_planes_acotada(self):
+        self.assertEqual(_compiled.cache_info().maxsize, COMPILED_CACHE_SIZE)
+
+
+class RutasPublicasTests(UsuariosMixin, TestCase):
+    """
+    @brief Las vistas con `IsPublic` o `AllowAny` solo son públicas para los métodos de lectura.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.crear_roles()
+        cls.admin = cls.crear_usuario("A1")
+        datos_maestria.objects.create(cod_maestria=1, nombre_maestria="GERENCIA")
+
+    def test_lectura_anonima(self):
+        response = self.cliente().get("/api/maestrias/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+
+    def test_escrituras_anonimas_rechazadas(self):
+        client = self.cliente()
+
+        self.assertEqual(
+            client.post("/api/maestrias/", {"cod_maestria": 2, "nombre_maestria": "X"}, format="json").status_code,
+            403,
+        )
+        self.assertEqual(client.delete("/api/maestrias/1/").status_code, 403)
+        self.assertEqual(client.post("/api/datos-maestria/", {}, format="json").status_code, 403)
+        self.assertTrue(datos_maestria.objects.filter(cod_maestria=1).exists())
+        self.assertFalse(datos_maestria.objects.filter(cod_maestria=2).exists())
+
+    def test_escritura_autenticada(self):
+        response = self.cliente(self.admin).post(
+            "/api/maestrias/", {"cod_maestria": 2, "nombre_maestria": "X"}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 201)
+
+
+class AutenticacionTests(UsuariosMixin, TestCase):
+    """
+    @brief Caché de usuarios autenticados de `CustomJWTAuthentication` y revocación de tokens por versión.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.crear_roles()
+        cls.admin = cls.crear_usuario("A1")
+
+    def setUp(self):
+        principal_cache.clear()
+        self.addCleanup(principal_cache.clear)
+
+    def solicitud(self, token):
+        return APIRequestFactory().get("/api/user-info/", HTTP_AUTHORIZATION="Bearer " + token)
+
+    def test_solicitud_repetida_sin_consultas(self):
+        token = generar_tokens(self.admin)["access"]
+        auth = CustomJWTAuthentication()
+
+        user, _ = auth.authenticate(self.solicitud(token))
+        with self.assertNumQueries(0):
+            cached, _ = auth.authenticate(self.solicitud(token))
+
+        self.assertEqual(cached.pk, self.admin.pk)
+        self.assertEqual(cached.tipo_usuario.codigo_rol, Roles.ADMIN.value)
+
+    def test_cambio_de_contrasena_revoca_el_token(self):
+        token = generar_tokens(self.admin)["access"]
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION="Bearer " + token)
+        self.assertEqual(client.get("/api/user-info/").status_code, 200)
+
+        self.admin.contraseña_usuario = "nueva"
+        self.admin.save()
+
+        response = client.get("/api/user-info/")
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json()["detail"], "Token revoked")
+        self.assertEqual(self.cliente(self.admin).get("/api/user-info/").status_code, 200)
+
+
+@override_settings(JWT_STATELESS_AUTH=True)
+class AutenticacionSinEstadoTests(UsuariosMixin, TestCase):
+    """
+    @brief Modo `JWT_STATELESS_AUTH`: el usuario se construye con los claims y solo se verifica su versión.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.crear_roles()
+        cls.profesor = cls.crear_usuario("P1", Roles.PROFESOR)
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def autenticar(self, token):
+        request = APIRequestFactory().get("/api/user-info/", HTTP_AUTHORIZATION="Bearer " + token)
+        return CustomJWTAuthentication().authenticate(request)[0]
+
+    def test_usuario_desde_los_claims(self):
+        token = generar_tokens(self.profesor)["access"]
+
+        with self.assertNumQueries(1):
+            self.autenticar(token)
+        with self.assertNumQueries(0):
+            user = self.autenticar(token)
+
+        self.assertEqual(user.pk, self.profesor.pk)
+        self.assertEqual(user.cedula_usuario_id, "P1")
+        self.assertEqual(user.tipo_usuario.codigo_rol, Roles.PROFESOR.value)
+
+    def test_cambio_de_rol_revoca_el_token(self):
+        token = generar_tokens(self.profesor)["access"]
+        self.autenticar(token)
+
+        self.profesor.tipo_usuario_id = Roles.ADMIN.value
+        self.profesor.save()
+
+        with self.assertRaisesMessage(AuthenticationFailed, "Token revoked"):
+            self.autenticar(token)
+        self.assertEqual(self.autenticar(generar_tokens(self.profesor)["access"]).tipo_usuario.codigo_rol, 1)
+
+    def test_usuario_eliminado(self):
+        token = generar_tokens(self.profesor)["access"]
+        self.profesor.delete()
+
+        with self.assertRaisesMessage(AuthenticationFailed, "User not found"):
+            self.autenticar(token)
+
+
+class PaginacionCursorTests(UsuariosMixin, TestCase):
+    """
+    @brief Paginación por cursor de `BaseCRUDView` sobre `/api/pagos/` (orden `-fecha_pago`, con empates).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.crear_roles()
+        cls.admin = cls.crear_usuario("A1")
+        cls.crear_pagos("A1", range(1, 8))
+
+    def test_recorre_todas_las_paginas_sin_repetir(self):
+        client = self.cliente(self.admin)
+        referencias, cursor = [], None
+        while True:
+            params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+            body = client.get("/api/pagos/", params).json()
+            self.assertLessEqual(len(body["results"]), 3)
+            referencias += [pago["numero_referencia"] for pago in body["results"]]
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+
+        esperadas = list(
+            tabla_pagos.objects.order_by("-fecha_pago", "-numero_referencia")
+            .values_list("numero_referencia", flat=True)
+        )
+        self.assertEqual(referencias, esperadas)
+
+    def test_sin_parametros_devuelve_el_listado_completo(self):
+        body = self.cliente(self.admin).get("/api/pagos/").json()
+
+        self.assertIsInstance(body, list)
+        self.assertEqual(len(body), 7)
+
+    def test_parametros_invalidos(self):
+        client = self.cliente(self.admin)
+
+        self.assertEqual(client.get("/api/pagos/", {"cursor": "no-es-un-cursor"}).status_code, 400)
+        self.assertEqual(client.get("/api/pagos/", {"limit": "abc"}).status_code, 400)
+        self.assertEqual(client.get("/api/pagos/", {"limit": 0}).status_code, 400)
+
+
+class ProyeccionCamposTests(UsuariosMixin, TestCase):
+    """
+    @brief `?fields=` limita tanto la respuesta como las columnas que se leen de la base de datos.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.crear_roles()
+        cls.admin = cls.crear_usuario("A1")
+        cls.crear_pagos("A1", [1, 2])
+
+    def test_solo_se_consultan_los_campos_pedidos(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.cliente(self.admin).get("/api/pagos/", {"fields": "numero_referencia,monto_pago"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            sorted(response.json(), key=lambda pago: pago["numero_referencia"]),
+            [{"numero_referencia": 1, "monto_pago": 10}, {"numero_referencia": 2, "monto_pago": 20}],
+        )
+        listado = [q["sql"] for q in queries.captured_queries if 'FROM "main_tabla_pagos"' in q["sql"]]
+        self.assertEqual(len(listado), 1)
+        self.assertIn('"monto_pago"', listado[0])
+        self.assertNotIn('"banco_pago"', listado[0])
+
+    def test_campo_desconocido(self):
+        response = self.cliente(self.admin).get("/api/pagos/", {"fields": "numero_referencia,clave"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("clave", response.json()["fields"])
+
+
+@override_settings(CACHES=cache_compartida())
+class RespuestasCondicionalesTests(UsuariosMixin, TestCase):
+    """
+    @brief ETag / If-None-Match de los listados, que solo se envían con una caché compartida.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.crear_roles()
+        cls.admin = cls.crear_usuario("A1")
+        cls.crear_pagos("A1", [1])
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = self.cliente(self.admin)
+
+    def test_304_si_la_tabla_no_cambio(self):
+        etag = self.client.get("/api/pagos/")["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/pagos/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_etag_nuevo_tras_una_escritura(self):
+        etag = self.client.get("/api/pagos/")["ETag"]
+
+        pago = tabla_pagos.objects.get(pk=1)
+        pago.estado_pago = "Confirmado"
+        with self.captureOnCommitCallbacks(execute=True):
+            pago.save()
+
+        response = self.client.get("/api/pagos/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.json()[0]["estado_pago"], "Confirmado")
+
+    def test_sin_cache_compartida_no_hay_etag(self):
+        with self.settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}):
+            response = self.client.get("/api/pagos/", HTTP_IF_NONE_MATCH="*")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("ETag"))
+
+
+@override_settings(STREAMING_CHUNK_SIZE=2)
+class ListadosTransmitidosTests(UsuariosMixin, TestCase):
+    """
+    @brief `?stream=1` transmite el listado por bloques con el mismo contenido que la respuesta normal.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.crear_roles()
+        cls.admin = cls.crear_usuario("A1")
+        cls.crear_pagos("A1", range(1, 6))
+
+    def test_mismo_contenido_por_bloques(self):
+        client = self.cliente(self.admin)
+        normal = client.get("/api/pagos/", {"fields": "numero_referencia,fecha_pago,monto_pago"})
+        transmitida = client.get("/api/pagos/", {"fields": "numero_referencia,fecha_pago,monto_pago", "stream": "1"})
+
+        self.assertTrue(transmitida.streaming)
+        bloques = list(transmitida.streaming_content)
+        self.assertGreater(len(bloques), 3)
+        self.assertEqual(json.loads(b"".join(bloques)), normal.json())
+
+    def test_listado_vacio(self):
+        tabla_pagos.objects.all().delete()
+
+        response = self.cliente(self.admin).get("/api/pagos/", {"stream": "si"})
+
+        self.assertEqual(b"".join(response.streaming_content), b"[]")
+
+
+class ConsultasListadosTests(TestCase):
+    """
+    @brief El número de consultas de cada listado de `BaseCRUDView` no crece con el número de filas (N+1).
+    """
+
+    def setUp(self):
+        index = RouteIndex()
+        index.build()
+        self.rutas = {}
+        for route, _, callback, _ in index.routes():
+            view_class = view_class_of(callback)
+            if view_class is not None and issubclass(view_class, BaseCRUDView):
+                self.rutas.setdefault(view_class, (route, callback))
+        # Usuario no persistido: la autenticación se fuerza y no se consulta datos_login
+        self.user = datos_login(id=0, tipo_usuario=roles(codigo_rol=Roles.ADMIN.value))
+
+    def consultas(self, route, callback, params):
+        request = APIRequestFactory().get(f"/{route}", params)
+        force_authenticate(request, user=self.user)
+        with CaptureQueriesContext(connection) as context:
+            response = callback(request)
+            response.render()
+        self.assertEqual(response.status_code, 200, route)
+        return len(context.captured_queries), len(json.loads(response.content))
+
+    def parametros(self, view_class):
+        serializer = view_class.serializer_class
+        todos = ",".join([*serializer().fields, *serializer.campos_extra])
+        return [{}, {"fields": todos}]
+
+    def test_consultas_constantes(self):
+        self.assertEqual(len(self.rutas), 8)
+        sembrar_listados(range(1, 3))
+        pocas = {
+            (view_class, str(params)): self.consultas(route, callback, params)
+            for view_class, (route, callback) in self.rutas.items()
+            for params in self.parametros(view_class)
+        }
+
+        sembrar_listados(range(3, 13))
+        for view_class, (route, callback) in self.rutas.items():
+            for params in self.parametros(view_class):
+                with self.subTest(vista=view_class.__name__, params=params):
+                    consultas, filas = self.consultas(route, callback, params)
+                    consultas_pocas, filas_pocas = pocas[view_class, str(params)]
+                    self.assertGreater(filas, filas_pocas)
+                    self.assertEqual(consultas, consultas_pocas)
+
+
+class SerializacionRapidaTests(UsuariosMixin, TestCase):
+    """
+    @brief `RowSerializer` produce el mismo JSON que el serializador de DRF de cada modelo, con y sin `?fields=`.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.crear_roles()
+        cls.crear_usuario("A1")
+        sembrar_listados(range(1, 4))
+        for i, estado in ((1, "Activo"), (2, "Inactivo")):
+            estudiante_datos.objects.create(
+                cedula_estudiante_id=f"U{i}", cod_maestria_id=i, año_ingreso="2024", estado_estudiante=estado,
+                carrera="ADMINISTRACION",
+            )
+            PlanificacionProfesor.objects.create(
+                codplanificacion=f"PL{i}", actividades_planificacion="EXAMEN", cod_materia_id=f"M{i}",
+                codigo_cohorte_id=f"C{i}", cedula_profesor_id=f"U{i}", nombre_materia="MATERIA",
+            )
+
+    def serializadores(self):
+        for _, serializer_class in inspect.getmembers(serializers, inspect.isclass):
+            meta = getattr(serializer_class, "Meta", None)
+            if issubclass(serializer_class, serializers.CamposDinamicosMixin) and meta:
+                yield meta.model, serializer_class
+
+    def subconjuntos(self, serializer_class):
+        campos = list(serializer_class().fields)
+        yield None
+        yield from ([campo] for campo in campos)
+        yield campos[::2]
+
+    def test_misma_salida_que_drf(self):
+        renderer = JSONRenderer()
+        comparados = set()
+        for model, serializer_class in self.serializadores():
+            if RowSerializer.for_serializer(serializer_class) is None:
+                continue
+            queryset = model.objects.order_by("pk")
+            self.assertTrue(queryset.exists(), model.__name__)
+            for fields in self.subconjuntos(serializer_class):
+                with self.subTest(serializador=serializer_class.__name__, fields=fields):
+                    fast = RowSerializer.for_serializer(serializer_class, fields)
+                    esperado = renderer.render(serializer_class(queryset, many=True, fields=fields).data)
+                    obtenido = renderer.render([fast(row) for row in fast.values(queryset)])
+                    self.assertEqual(obtenido, esperado)
+            comparados.add(model)
+
+        self.assertTrue({tabla_pagos, tabla_solicitudes, Cohorte, profesores, listado_estudiantes} <= comparados)
+
+
+class RendererJSONTests(TestCase):
+    """
+    @brief `FastJSONRenderer` y `FastJSONParser` producen y aceptan lo mismo que los de DRF, con y sin orjson.
+    """
+
+    datos = {
+        "texto": "Año – línea\u2028separador",
+        "fecha": datetime.datetime(2026, 1, 2, 3, 4, 5, 678000, tzinfo=datetime.timezone.utc),
+        "dia": datetime.date(2026, 1, 2),
+        "monto": decimal.Decimal("10.50"),
+        "id": uuid.UUID(int=1),
+        "grande": 2 ** 70,
+        "claves": {1: "uno"},
+        "lista": [None, True, 1.5],
+    }
+
+    def test_misma_salida_que_drf(self):
+        esperado = JSONRenderer().render(self.datos)
+
+        self.assertEqual(renderers.FastJSONRenderer().render(self.datos), esperado)
+        with mock.patch.object(renderers, "orjson", None):
+            self.assertEqual(renderers.FastJSONRenderer().render(self.datos), esperado)
+
+    def test_sangria_delegada_a_drf(self):
+        salida = renderers.FastJSONRenderer().render({"a": 1}, "application/json; indent=2")
+
+        self.assertEqual(salida, b'{\n  "a": 1\n}')
+
+    def test_parser(self):
+        parser = renderers.FastJSONParser()
+        documento = '{"cedula": "V-1", "notas": [15, 20.5], "nombre": "Ñandú"}'.encode()
+
+        self.assertEqual(parser.parse(io.BytesIO(documento)), json.loads(documento))
+        for invalido in (b"{", b'{"a": NaN}'):
+            with self.subTest(documento=invalido):
+                with self.assertRaises(ParseError):
+                    parser.parse(io.BytesIO(invalido))
+                with mock.patch.object(renderers, "orjson", None), self.assertRaises(ParseError):
+                    parser.parse(io.BytesIO(invalido))
+
+
+class CompresionRespuestasTests(UsuariosMixin, TestCase):
+    """
+    @brief Negociación de `Accept-Encoding` y compresión de `CompressionMiddleware`.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.crear_roles()
+        cls.admin = cls.crear_usuario("A1")
+        cls.crear_pagos("A1", range(1, 41))
+
+    def test_negociacion(self):
+        preferidas = ("zstd", "br", "gzip")
+
+        self.assertEqual(negotiate_encoding("gzip, deflate", preferidas), "gzip")
+        self.assertEqual(negotiate_encoding("gzip;q=0, identity", preferidas), None)
+        self.assertEqual(negotiate_encoding("", preferidas), None)
+        self.assertEqual(negotiate_encoding("*", ("gzip",)), "gzip")
+        self.assertEqual(negotiate_encoding("br;q=0.5, gzip;q=1.0", preferidas), "gzip")
+        self.assertEqual(negotiate_encoding("zstd, gzip", preferidas), "zstd" if "zstd" in ENCODERS else "gzip")
+
+    def test_listado_comprimido_con_gzip(self):
+        client = self.cliente(self.admin)
+        plano = client.get("/api/pagos/")
+        comprimido = client.get("/api/pagos/", HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertFalse(plano.has_header("Content-Encoding"))
+        self.assertEqual(comprimido["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", comprimido["Vary"])
+        self.assertLess(len(comprimido.content), len(plano.content))
+        self.assertEqual(zlib.decompress(comprimido.content, 16 + zlib.MAX_WBITS), plano.content)
+
+    def test_respuesta_pequena_sin_comprimir(self):
+        response = self.cliente(self.admin).get("/api/pagos/", {"limit": 1}, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_transmision_comprimida_por_bloques(self):
+        client = self.cliente(self.admin)
+        plano = client.get("/api/pagos/", {"stream": "1"})
+        comprimido = client.get("/api/pagos/", {"stream": "1"}, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(comprimido["Content-Encoding"], "gzip")
+        self.assertFalse(comprimido.has_header("Content-Length"))
+        contenido = b"".join(comprimido.streaming_content)
+        self.assertEqual(zlib.decompress(contenido, 16 + zlib.MAX_WBITS), b"".join(plano.streaming_content))
+
+    @override_settings(CACHES=cache_compartida())
+    def test_etag_debil_tras_comprimir(self):
+        response = self.cliente(self.admin).get("/api/pagos/", HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertTrue(response["ETag"].startswith('W/"'))
+        revalidada = self.cliente(self.admin).get(
+            "/api/pagos/", HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(revalidada.status_code, 304)
+
+
+class CatalogosTests(UsuariosMixin, TestCase):
+    """
+    @brief Catálogos en memoria de `main/catalog.py` y su invalidación por señales.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.crear_roles()
+        sembrar_listados(range(1, 3))
+
+    def setUp(self):
+        for catalog in CATALOGS.values():
+            catalog.invalidate()
+            self.addCleanup(catalog.invalidate)
+
+    def test_busquedas_sin_consultas(self):
+        with self.assertNumQueries(1):
+            materia = materia_catalog.get("M1")
+        with self.assertNumQueries(0):
+            self.assertIs(materia_catalog.get("M1"), materia)
+            self.assertEqual(materia.cod_maestria.nombre_maestria, "MAESTRIA1")
+            self.assertEqual([m.pk for m in materia_catalog.filter_by("cod_maestria_id", 2)], ["M2"])
+            self.assertIsNone(materia_catalog.get("NO-EXISTE"))
+
+    def test_clave_convertida_al_tipo_de_la_columna(self):
+        self.assertEqual(role_catalog.get("3").codigo_rol, 3)
+        self.assertIsNone(role_catalog.get("abc"))
+
+    def test_invalidacion_por_senales(self):
+        materia_catalog.get("M1")
+
+        materias_pensum.objects.create(cod_materia="M9", cod_maestria_id=1, nombre_materia="NUEVA")
+        self.assertTrue(materia_catalog.exists("M9"))
+
+        maestria = datos_maestria.objects.get(pk=1)
+        maestria.nombre_maestria = "RENOMBRADA"
+        maestria.save()
+        self.assertEqual(materia_catalog.get("M1").cod_maestria.nombre_maestria, "RENOMBRADA")
+
+
+@override_settings(CACHES=cache_compartida())
+class BusInvalidacionTests(UsuariosMixin, TestCase):
+    """
+    @brief Bus de invalidación entre procesos; cada instancia de `InvalidationBus` hace las veces de un proceso.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.crear_roles()
+        cls.admin = cls.crear_usuario("A1")
+        cls.profesor = cls.crear_usuario("P1", Roles.PROFESOR)
+
+    def setUp(self):
+        cache.clear()
+        principal_cache.clear()
+        self.addCleanup(cache.clear)
+        self.addCleanup(principal_cache.clear)
+        self.recibidas = []
+        self.receptor = InvalidationBus(poll_interval=0)
+        self.receptor.subscribe_keys(datos_login, self.recibidas.append)
+        self.receptor.poll()
+
+    def test_claves_publicadas_por_otro_proceso(self):
+        emisor = InvalidationBus()
+        emisor.publish_keys(datos_login, [1, 2])
+        emisor.publish_keys(datos_login, [3])
+
+        self.assertEqual(self.receptor.poll(), [datos_login])
+        self.assertEqual(self.recibidas, [{1, 2, 3}])
+        self.assertEqual(self.receptor.poll(), [])
+        self.assertEqual(len(self.recibidas), 1)
+
+    def test_publicacion_expirada_descarta_todo(self):
+        emisor = InvalidationBus()
+        emisor.publish_keys(datos_login, [1])
+        emisor.publish_keys(datos_login, [2])
+        cache.delete(_event_key(datos_login, 1))
+
+        self.receptor.poll()
+
+        self.assertEqual(self.recibidas, [None])
+
+    def test_solo_se_descarta_el_usuario_modificado(self):
+        invalidation_bus.poll(force=True)
+        principal_cache.set("token-admin", self.admin)
+        principal_cache.set("token-profesor", self.profesor)
+
+        # Otro proceso cambia la contraseña del profesor
+        InvalidationBus().publish_keys(datos_login, [self.profesor.pk])
+        invalidation_bus.poll(force=True)
+
+        self.assertIs(principal_cache.get("token-admin"), self.admin)
+        self.assertIsNone(principal_cache.get("token-profesor"))
+
+    def test_las_senales_publican_la_clave(self):
+        self.profesor.contraseña_usuario = "nueva"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profesor.save()
+
+        self.receptor.poll()
+
+        self.assertEqual(self.recibidas, [{self.profesor.pk}])
+
+    def test_sin_cache_compartida_no_hace_nada(self):
+        with self.settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}):
+            InvalidationBus().publish_keys(datos_login, [1])
+            self.assertEqual(self.receptor.poll(), [])
+        self.assertEqual(self.receptor.poll(), [])
+        self.assertEqual(self.recibidas, [])
+
+
+class BusquedaPersonasTests(UsuariosMixin, TestCase):
+    """
+    @brief Búsqueda de personas por trigramas (`/api/buscar-personas/`); requiere la extensión `pg_trgm`.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            if cursor.fetchone() is None:
+                raise unittest.SkipTest("La base de datos no tiene la extensión pg_trgm.")
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.crear_roles()
+        cls.admin = cls.crear_usuario("A1")
+        personas = [("V-100", "MARIA", "GONZALES"), ("V-200", "JOSE", "GONZALEZ"), ("V-300", "ANA", "RODRIGUEZ")]
+        personas += [(f"V-{i}", f"NOMBRE{i}", f"APELLIDO{i}") for i in range(1000, 1500)]
+        Datos_basicos.objects.bulk_create(
+            Datos_basicos(cedula=cedula, nombre=nombre, apellido=apellido, tipo_usuario=2, contraseña="x", correo="")
+            for cedula, nombre, apellido in personas
+        )
+
+    def test_tolera_errores_de_escritura(self):
+        response = self.cliente(self.admin).get("/api/buscar-personas/", {"q": "gonzales"})
+
+        self.assertEqual(response.status_code, 200)
+        cedulas = [persona["cedula"] for persona in response.json()]
+        self.assertEqual(cedulas[0], "V-100")
+        self.assertIn("V-200", cedulas)
+        self.assertNotIn("V-300", cedulas)
+
+    def test_usa_los_indices_de_trigramas(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.cliente(self.admin).get("/api/buscar-personas/", {"q": "gonzales"})
+
+        busqueda = next(q["sql"] for q in queries.captured_queries if "similitud" in q["sql"])
+        usados = indices_de_la_consulta(busqueda)
+        self.assertTrue(any(nombre.endswith("_trgm_idx") for nombre in usados), usados)
+
+    def test_busqueda_corta(self):
+        self.assertEqual(self.cliente(self.admin).get("/api/buscar-personas/", {"q": "ab"}).status_code, 400)
+
+
+class IndicesFiltrosTests(TestCase):
+    """
+    @brief Los filtros frecuentes de los listados usan sus índices y no recorren la tabla completa.
+
+    Las filas sintéticas imitan la distribución real: muchos estudiantes y pocos profesores, 20 cohortes con
+    10 materias cada una y un 5% de pagos pendientes. Tras `ANALYZE`, el plan es el que elige PostgreSQL.
+    """
+
+    filas = 5000
+
+    @classmethod
+    def setUpTestData(cls):
+        ahora = timezone.now()
+        maestria = datos_maestria.objects.create(cod_maestria=1, nombre_maestria="MAESTRIA")
+        cohortes = Cohorte.objects.bulk_create(
+            Cohorte(codigo_cohorte=f"C{i}", fecha_inicio=ahora, fecha_fin=ahora, sede_cohorte="barcelona")
+            for i in range(20)
+        )
+        materias = materias_pensum.objects.bulk_create(
+            materias_pensum(cod_materia=f"M{i}", cod_maestria=maestria, nombre_materia=f"MATERIA {i}")
+            for i in range(10)
+        )
+        personas = Datos_basicos.objects.bulk_create(
+            Datos_basicos(
+                cedula=f"{'P' if i % 100 == 0 else 'E'}{i}", nombre=f"NOMBRE {i}", apellido=f"APELLIDO {i}",
+                tipo_usuario=3 if i % 100 == 0 else 2, contraseña="x", correo=f"U{i}@EJEMPLO.COM",
+            )
+            for i in range(cls.filas)
+        )
+        docentes = [persona for persona in personas if persona.tipo_usuario == 3]
+        PlanificacionProfesor.objects.bulk_create(
+            PlanificacionProfesor(
+                codplanificacion=f"PL{i}", cod_materia=materias[i % 10], codigo_cohorte=cohortes[i % 20],
+                cedula_profesor=docentes[i % len(docentes)], nombre_materia="MATERIA",
+            )
+            for i in range(cls.filas)
+        )
+        listado_estudiantes.objects.bulk_create(
+            listado_estudiantes(
+                cedula_estudiante=persona, nombre=persona.nombre, apellido=persona.apellido,
+                cod_materia=materias[i % 10], codigo_cohorte=cohortes[(i // 10) % 20], nombre_materia="MATERIA",
+                profesor_ci=docentes[0].cedula,
+            )
+            for i, persona in enumerate(personas)
+        )
+        estados = ["Confirmado"] * 15 + ["Negado"] * 4 + ["Pendiente"]
+        tabla_pagos.objects.bulk_create(
+            tabla_pagos(
+                cedula_responsable=persona, numero_referencia=i + 1, banco_pago="BANCO",
+                fecha_pago=ahora - datetime.timedelta(hours=i), monto_pago=10, estado_pago=estados[i % len(estados)],
+            )
+            for i, persona in enumerate(personas)
+        )
+        with connection.cursor() as cursor:
+            for model in (Datos_basicos, PlanificacionProfesor, listado_estudiantes, tabla_pagos):
+                cursor.execute(f'ANALYZE "{model._meta.db_table}"')
+
+    def assertUsaIndice(self, queryset, esperados):
+        plan = json.loads(queryset.explain(format="json"))
+        tabla = queryset.model._meta.db_table
+        self.assertNotIn(("Seq Scan", tabla), tipos_de_nodo(plan))
+        self.assertTrue(set(esperados) & set(nombres_indices(plan)), nombres_indices(plan))
+
+    def test_listado_por_cohorte_y_materia(self):
+        self.assertUsaIndice(
+            listado_estudiantes.objects.filter(codigo_cohorte="C1", cod_materia="M1"), {"listado_coh_mat_nota_idx"}
+        )
+
+    def test_planificaciones_por_profesor(self):
+        with connection.cursor() as cursor:
+            restricciones = connection.introspection.get_constraints(cursor, PlanificacionProfesor._meta.db_table)
+        esperados = {
+            nombre for nombre, info in restricciones.items() if info["index"] and info["columns"] == ["cedula_profesor"]
+        }
+        self.assertUsaIndice(PlanificacionProfesor.objects.filter(cedula_profesor="P100"), esperados)
+
+    def test_usuarios_por_tipo(self):
+        self.assertUsaIndice(
+            Datos_basicos.objects.filter(tipo_usuario=3).values("cedula", "nombre", "apellido", "correo"),
+            {"basicos_tipo_usuario_idx"},
+        )
+
+    def test_pagos_pendientes(self):
+        self.assertUsaIndice(
+            tabla_pagos.objects.filter(estado_pago="Pendiente").order_by("-fecha_pago", "-numero_referencia")[:51],
+            {"pagos_pendientes_fecha_idx", "pagos_estado_fecha_idx"},
+        )
+
+    def test_pagos_por_estado(self):
+        self.assertUsaIndice(
+            tabla_pagos.objects.filter(estado_pago="Negado").order_by("-fecha_pago", "-numero_referencia")[:51],
+            {"pagos_estado_fecha_idx"},
+        )
+
+
+class AsignacionProfesoresTests(UsuariosMixin, TestCase):
+    """
+    @brief Alta en lote de `AsignarProfesorMateriaView`: todo el lote se guarda o no se guarda nada.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.crear_roles()
+        cls.admin = cls.crear_usuario("A1")
+        sembrar_listados(range(1, 4))
+
+    def asignacion(self, i, **cambios):
+        return {
+            "cod_materia": f"M{i}", "nom_materia": "materia", "cedula_profesor": f"U{i}",
+            "fecha_inicio": "2026-01-01T00:00:00Z", "fecha_fin": "2026-06-01T00:00:00Z", "codigo_cohorte": f"C{i}",
+            **cambios,
+        }
+
+    def test_lote_valido(self):
+        antes = AsignarProfesorMateria.objects.count()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.cliente(self.admin).post(
+                "/api/asignar-profesor-materia/", {"planning": [self.asignacion(i) for i in (1, 2, 3)]}, format="json"
+            )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()["created"]), 3)
+        self.assertEqual(response.json()["created"][0]["nom_materia"], "MATERIA")
+        self.assertEqual(AsignarProfesorMateria.objects.count(), antes + 3)
+        inserts = [
+            q for q in queries.captured_queries if q["sql"].startswith('INSERT INTO "main_asignarprofesormateria"')
+        ]
+        self.assertEqual(len(inserts), 1)
+
+    def test_un_elemento_invalido_no_guarda_nada(self):
+        antes = AsignarProfesorMateria.objects.count()
+
+        response = self.cliente(self.admin).post(
+            "/api/asignar-profesor-materia/",
+            {"planning": [self.asignacion(1), self.asignacion(2, cod_materia="NO-EXISTE")]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error["index"] for error in response.json()["errors"]], [1])
+        self.assertIn("cod_materia", response.json()["errors"][0]["errors"])
+        self.assertEqual(AsignarProfesorMateria.objects.count(), antes)
+
+    def test_formato_invalido(self):
+        client = self.cliente(self.admin)
+
+        self.assertEqual(
+            client.post("/api/asignar-profesor-materia/", {"planning": []}, format="json").status_code, 400
+        )
+        self.assertEqual(
+            client.post("/api/asignar-profesor-materia/", {"planning": ["M1"]}, format="json").status_code, 400
+        )
+
+
+class ActualizacionPagosTests(UsuariosMixin, TestCase):
+    """
+    @brief Cambio de estado en lote de `actualizar_estado_pagos` con un único `UPDATE`.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.crear_roles()
+        cls.crear_usuario("A1")
+        cls.crear_pagos("A1", [1, 2, 3])
+
+    def actualizar(self, pagos):
+        return self.client.post("/api/actualizar-pago/", {"pagos": pagos}, content_type="application/json")
+
+    def estados(self):
+        return dict(tabla_pagos.objects.values_list("numero_referencia", "estado_pago"))
+
+    def test_actualizacion_en_lote(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.actualizar([
+                {"numero_referencia": 1, "nuevoEstado": "Negado"},
+                {"numero_referencia": "2", "nuevoEstado": "Confirmado"},
+                {"numero_referencia": 1, "nuevoEstado": "Confirmado"},
+                {"numero_referencia": 99, "nuevoEstado": "Confirmado"},
+            ])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["updated_count"], 2)
+        self.assertEqual(response.json()["no_encontrados"], [99])
+        self.assertEqual(self.estados(), {1: "Confirmado", 2: "Confirmado", 3: "Pendiente"})
+        updates = [q for q in queries.captured_queries if q["sql"].startswith('UPDATE "main_tabla_pagos"')]
+        self.assertEqual(len(updates), 1)
+
+    def test_un_pago_invalido_no_modifica_ninguno(self):
+        response = self.actualizar([
+            {"numero_referencia": 1, "nuevoEstado": "Confirmado"},
+            {"numero_referencia": 2, "nuevoEstado": "Aprobado"},
+            {"numero_referencia": "x", "nuevoEstado": "Confirmado"},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error["index"] for error in response.json()["errores"]], [1, 2])
+        self.assertEqual(set(self.estados().values()), {"Pendiente"})
+
+
+class ActualizacionSolicitudesTests(UsuariosMixin, TestCase):
+    """
+    @brief Cambio de estado en lote de `actualizar_estado_solicitudes`, con un `UPDATE` por estado destino.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.crear_roles()
+        sembrar_listados(range(1, 4))
+
+    def test_actualizacion_en_lote(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                "/api/actualizar-solicitudes/",
+                {"solicitudes": [
+                    {"cod_solicitudes": "S1", "nuevoEstado": "APROBADA"},
+                    {"cod_solicitudes": "S2", "nuevoEstado": "APROBADA"},
+                    {"cod_solicitudes": "S3", "nuevoEstado": "APROBADA"},
+                    {"cod_solicitudes": "S3", "nuevoEstado": "RECHAZADA"},
+                    {"cod_solicitudes": "S9", "nuevoEstado": "APROBADA"},
+                ]},
+                content_type="application/json",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["updated_count"], 3)
+        self.assertEqual(response.json()["no_encontrados"], ["S9"])
+        self.assertEqual(
+            dict(tabla_solicitudes.objects.values_list("cod_solicitudes", "status_solicitud")),
+            {"S1": "APROBADA", "S2": "APROBADA", "S3": "RECHAZADA"},
+        )
+        updates = [q for q in queries.captured_queries if q["sql"].startswith('UPDATE "main_tabla_solicitudes"')]
+        self.assertEqual(len(updates), 2)
+        selects = [
+            q for q in queries.captured_queries
+            if q["sql"].startswith("SELECT") and "main_tabla_solicitudes" in q["sql"]
+        ]
+        self.assertEqual(len(selects), 1)
+
+    def test_lista_vacia(self):
+        response = self.client.post(
+            "/api/actualizar-solicitudes/", {"solicitudes": []}, content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+
+@mock.patch.object(deletion, "RUN_IN_THREAD", False)
+@mock.patch.object(deletion, "CHUNK_SIZE", 2)
+class EliminacionUsuariosTests(UsuariosMixin, TestCase):
+    """
+    @brief Eliminación de usuarios por bloques de `main/deletion.py` y sus vistas, solo para administradores.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.crear_roles()
+        cls.admin = cls.crear_usuario("A1")
+        sembrar_listados(range(1, 6))
+        for i in range(1, 4):
+            datos_login.objects.create(cedula_usuario_id=f"U{i}", contraseña_usuario="x", tipo_usuario_id=2)
+
+    def filas(self, cedulas):
+        return {
+            "basicos": Datos_basicos.objects.filter(cedula__in=cedulas).count(),
+            "login": datos_login.objects.filter(cedula_usuario__in=cedulas).count(),
+            "listado": listado_estudiantes.objects.filter(cedula_estudiante__in=cedulas).count(),
+            "pagos": tabla_pagos.objects.filter(cedula_responsable__in=cedulas).count(),
+            "solicitudes": tabla_solicitudes.objects.filter(cedula_responsable__in=cedulas).count(),
+            "profesores": profesores.objects.filter(ci_profesor__in=cedulas).count(),
+            "asignaciones": AsignarProfesorMateria.objects.filter(cedula_profesor__in=cedulas).count(),
+        }
+
+    def test_requiere_administrador(self):
+        estudiante = datos_login.objects.get(cedula_usuario="U1")
+        cuerpo = {"user_ids": ["U2"], "asincrono": True}
+
+        antes = TareaEliminacion.objects.count()
+        self.assertEqual(self.cliente().post("/api/eliminar-usuarios/", cuerpo, format="json").status_code, 403)
+        self.assertEqual(
+            self.cliente(estudiante).post("/api/eliminar-usuarios/", cuerpo, format="json").status_code, 403
+        )
+        tarea = TareaEliminacion.objects.create(cedulas=["U2"])
+        self.assertEqual(self.cliente().get(f"/api/eliminar-usuarios/{tarea.pk}/").status_code, 403)
+        self.assertEqual(TareaEliminacion.objects.count(), antes + 1)
+        self.assertEqual(self.filas(["U2"])["basicos"], 1)
+
+    def test_ciclo_de_vida_de_la_tarea(self):
+        client = self.cliente(self.admin)
+        cedulas = ["U1", "U2", "U3", "U4", "V-27943668"]
+
+        response = client.post("/api/eliminar-usuarios/", {"user_ids": cedulas, "asincrono": True}, format="json")
+        self.assertEqual(response.status_code, 202)
+        url = response.json()["url_estado"]
+        self.assertEqual(client.get(url).json()["estado"], TareaEliminacion.PENDIENTE)
+
+        self.assertTrue(deletion.run_job(response.json()["tarea_id"]))
+        self.assertFalse(deletion.run_job(response.json()["tarea_id"]))
+
+        estado = client.get(url).json()
+        self.assertEqual(estado["estado"], TareaEliminacion.COMPLETADA)
+        self.assertEqual((estado["total"], estado["procesados"], estado["porcentaje"]), (4, 4, 100.0))
+        self.assertEqual(estado["deleted_users_count"], 4)
+        self.assertEqual(estado["detalle"]["main.datos_login"], 3)
+        self.assertEqual(estado["detalle"]["main.tabla_pagos"], 4)
+        self.assertEqual(set(self.filas(cedulas[:4]).values()), {0})
+        self.assertEqual(self.filas(["U5"]), dict.fromkeys(self.filas([]), 1) | {"login": 0})
+        self.assertTrue(Datos_basicos.objects.filter(cedula="A1").exists())
+
+    def test_reanuda_desde_el_ultimo_bloque(self):
+        tarea = deletion.start_job(["U1", "U2", "U3"])
+        TareaEliminacion.objects.filter(pk=tarea.pk).update(estado=TareaEliminacion.EN_PROCESO)
+
+        self.assertTrue(deletion.process_chunk(tarea.pk))
+        tarea.refresh_from_db()
+        self.assertEqual(tarea.procesados, 2)
+        self.assertEqual(self.filas(["U1", "U2"])["basicos"], 0)
+        self.assertEqual(self.filas(["U3"])["basicos"], 1)
+
+        self.assertFalse(deletion.run_job(tarea.pk))
+        self.assertTrue(deletion.run_job(tarea.pk, resume=True))
+        tarea.refresh_from_db()
+        self.assertEqual((tarea.estado, tarea.procesados, tarea.eliminados), (TareaEliminacion.COMPLETADA, 3, 3))
+
+    def test_plan_de_cascada(self):
+        plan = deletion.cascade_plan(Datos_basicos.objects.filter(cedula="U1"))
+        modelos = [step.model for step in plan]
+
+        self.assertIs(modelos[-1], Datos_basicos)
+        for dependiente in (datos_login, listado_estudiantes, tabla_pagos, tabla_solicitudes, profesores):
+            self.assertIn(dependiente, modelos[:-1])
+        pendientes = plan[-2].count()
+        self.assertEqual(deletion.delete_rows(plan[-2]), pendientes)
+        self.assertFalse(plan[-2].exists())
+
+    def test_eliminacion_inmediata(self):
+        response = self.cliente(self.admin).post("/api/eliminar-usuarios/", {"user_ids": ["U5"]}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(self.filas(["U5"]).values()), {0})
+
+    def test_parametros_invalidos(self):
+        client = self.cliente(self.admin)
+
+        self.assertEqual(client.post("/api/eliminar-usuarios/", {"user_ids": []}, format="json").status_code, 400)
+        self.assertEqual(client.post("/api/eliminar-usuarios/", ["U1"], format="json").status_code, 400)
+        self.assertEqual(client.post("/api/eliminar-usuarios/", {"user_ids": "U1"}, format="json").status_code, 400)
+        self.assertEqual(client.get("/api/eliminar-usuarios/999999/").status_code, 404)
+
+
+class CodigosCohorteTests(UsuariosMixin, TestCase):
+    """
+    @brief Asignación de códigos de cohorte libres de `main/cohort_codes.py`.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.crear_roles()
+        cls.admin = cls.crear_usuario("A1")
+        for codigo in ("GG-BAR-A-2024", "GG-BAR-B-2024", "GG-BAR-D-2024", "GG-BAR-Z-2024", "GG-BARX-C-2024",
+                       "GG-BAR-C-2025", "ESPECIAL"):
+            cls.crear_cohorte(codigo)
+
+    @classmethod
+    def crear_cohorte(cls, codigo):
+        return Cohorte.objects.create(
+            codigo_cohorte=codigo, fecha_inicio=timezone.now(), fecha_fin=timezone.now(), sede_cohorte="barcelona",
+            tipo_maestria="GG",
+        )
+
+    def setUp(self):
+        for catalog in CATALOGS.values():
+            catalog.invalidate()
+            self.addCleanup(catalog.invalidate)
+
+    def test_letras_como_columnas_de_hoja_de_calculo(self):
+        for letras, numero in (("A", 1), ("Z", 26), ("AA", 27), ("AZ", 52), ("BA", 53), ("ZZ", 702), ("AAA", 703)):
+            with self.subTest(letras=letras):
+                self.assertEqual(cohort_codes.letters_to_number(letras), numero)
+                self.assertEqual(cohort_codes.number_to_letters(numero), letras)
+        self.assertEqual(cohort_codes.parse_code("GG-BAR-AB-2024"), ("GG-BAR-", 28, "2024"))
+        with self.assertRaises(ValueError):
+            cohort_codes.parse_code("GG-BAR-a-2024")
+
+    def test_primer_codigo_libre_del_mismo_prefijo_y_anio(self):
+        self.assertEqual(cohort_codes.next_free_code("GG-BAR-A-2024"), "GG-BAR-C-2024")
+        self.assertEqual(cohort_codes.next_free_code("GG-BAR-D-2024"), "GG-BAR-E-2024")
+        self.assertEqual(cohort_codes.next_free_code("GG-BAR-Z-2024"), "GG-BAR-AA-2024")
+        self.assertEqual(cohort_codes.next_free_code("GG-BAR-C-2025"), "GG-BAR-D-2025")
+        self.assertEqual(cohort_codes.next_free_code("GG-BAR-E-2024"), "GG-BAR-E-2024")
+
+    def test_codigos_sin_formato(self):
+        self.assertEqual(cohort_codes.next_free_code("LIBRE"), "LIBRE")
+        with self.assertRaisesMessage(ValueError, "ESPECIAL"):
+            cohort_codes.next_free_code("ESPECIAL")
+
+    def test_crear_cohorte_con_una_consulta_de_codigos(self):
+        with CaptureQueriesContext(connection) as consultas:
+            cohorte = cohort_codes.create_cohort(
+                "GG-BAR-A-2024", fecha_inicio=timezone.now(), fecha_fin=timezone.now(), sede_cohorte="barcelona",
+                tipo_maestria="GG",
+            )
+
+        self.assertEqual(cohorte.codigo_cohorte, "GG-BAR-C-2024")
+        self.assertEqual(sum("codigo_cohorte" in q["sql"] and q["sql"].startswith("SELECT")
+                             for q in consultas.captured_queries), 1)
+
+    def test_reintenta_si_el_codigo_se_ocupa(self):
+        ocupado = cohort_codes.next_free_code
+        respuestas = iter(["GG-BAR-A-2024"])
+
+        def siguiente(codigo):
+            return next(respuestas, None) or ocupado(codigo)
+
+        with mock.patch.object(cohort_codes, "next_free_code", side_effect=siguiente):
+            cohorte = cohort_codes.create_cohort(
+                "GG-BAR-A-2024", fecha_inicio=timezone.now(), fecha_fin=timezone.now(), sede_cohorte="barcelona",
+                tipo_maestria="GG",
+            )
+
+        self.assertEqual(cohorte.codigo_cohorte, "GG-BAR-C-2024")
+
+    def test_vistas(self):
+        client = self.cliente(self.admin)
+
+        response = client.post("/api/verificar-codigo-cohorte/", {"codigo_cohorte": "GG-BAR-B-2024"}, format="json")
+        self.assertEqual(response.json(), {"exists": True, "new_code": "GG-BAR-C-2024"})
+        response = client.post("/api/verificar-codigo-cohorte/", {"codigo_cohorte": "GG-BAR-C-2024"}, format="json")
+        self.assertEqual(response.json(), {"exists": False})
+
+        response = client.post("/api/cohorte-generar-codigo/", {
+            "codigo_cohorte": "GG-BAR-A-2024", "fecha_inicio": "2024-01-08", "fecha_fin": "2024-12-20",
+            "sede_cohorte": "barcelona", "tipo_maestria": "GG",
+        }, format="json")
+        self.assertEqual((response.status_code, response.json()), (201, {"codigo_cohorte": "GG-BAR-C-2024"}))
+        self.assertTrue(Cohorte.objects.filter(codigo_cohorte="GG-BAR-C-2024").exists())
+
+
+class ImportacionUsuariosTests(UsuariosMixin, TestCase):
+    """
+    @brief Importación masiva de usuarios desde CSV de `main/user_import.py`.
+    """
+
+    ENCABEZADO = "cedula,nombre,apellido,tipo_usuario,contraseña,correo\n"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.crear_roles()
+        cls.admin = cls.crear_usuario("A1")
+        cls.existente = cls.crear_usuario("E1", Roles.ESTUDIANTE)
+        cls.sin_cambios = cls.crear_usuario("E2", Roles.ESTUDIANTE)
+
+    def setUp(self):
+        principal_cache.clear()
+        self.addCleanup(principal_cache.clear)
+        for catalog in CATALOGS.values():
+            catalog.invalidate()
+            self.addCleanup(catalog.invalidate)
+
+    def csv(self, *filas):
+        return self.ENCABEZADO + "".join(fila + "\n" for fila in filas)
+
+    def test_valida_cada_fila(self):
+        result = user_import.ImportResult()
+        validas = user_import.validate_rows(io.StringIO(self.csv(
+            "n1,nombre,apellido,2,Clave,n1@correo.com",
+            ",SIN,CEDULA,2,x,",
+            "N2,ROL,INEXISTENTE,9,x,",
+            "N3,CORREO,INVALIDO,2,x,no-es-correo",
+            "N1,REPETIDA,OTRA,2,x,",
+        )), result)
+
+        self.assertEqual(validas, [("N1", "NOMBRE", "APELLIDO", 2, "Clave", "N1@CORREO.COM")])
+        self.assertEqual(result.total, 5)
+        self.assertEqual(
+            [(error["fila"], list(error["errores"])) for error in result.errores],
+            [(3, ["cedula"]), (4, ["tipo_usuario"]), (5, ["correo"]), (6, ["cedula"])],
+        )
+        with self.assertRaisesMessage(ValueError, "correo"):
+            user_import.validate_rows(io.StringIO("cedula,nombre,apellido,tipo_usuario,contraseña\n"), result)
+
+    def test_crea_y_actualiza_usuarios(self):
+        version_sin_cambios = self.sin_cambios.version_token
+        with self.captureOnCommitCallbacks(execute=True):
+            result = user_import.import_users(io.StringIO(self.csv(
+                "N1,NUEVO,ESTUDIANTE,2,x,",
+                "P1,NUEVO,PROFESOR,3,x,",
+                "E1,CAMBIA,CLAVE,2,otra,",
+                "E2,NOMBRE,APELLIDO,2,x,",
+                "N2,ROL,INEXISTENTE,9,x,",
+            )))
+
+        self.assertEqual(result.as_dict() | {"errores": len(result.errores)}, {
+            "total": 5, "importados": 4, "creados": 2, "actualizados": 2, "logins_creados": 2,
+            "logins_actualizados": 2, "profesores_creados": 1, "errores": 1,
+        })
+        self.existente.refresh_from_db()
+        self.sin_cambios.refresh_from_db()
+        self.assertEqual(self.existente.contraseña_usuario, "otra")
+        self.assertEqual(self.existente.version_token, 1)
+        self.assertEqual(self.sin_cambios.version_token, version_sin_cambios)
+        self.assertEqual(Datos_basicos.objects.get(cedula="E1").nombre, "CAMBIA")
+        self.assertEqual(datos_login.objects.get(cedula_usuario="P1").tipo_usuario_id, Roles.PROFESOR.value)
+        self.assertTrue(profesores.objects.filter(ci_profesor="P1").exists())
+        self.assertFalse(Datos_basicos.objects.filter(cedula="N2").exists())
+
+    def test_importacion_revoca_tokens_anteriores(self):
+        client = self.cliente(self.existente)
+        self.assertEqual(client.get("/api/user-info/").status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user_import.import_users(io.StringIO(self.csv("E1,NOMBRE,APELLIDO,2,otra,")))
+
+        response = client.get("/api/user-info/")
+        self.assertEqual((response.status_code, response.json()["detail"]), (403, "Token revoked"))
+
+    def test_vista(self):
+        client = self.cliente(self.admin)
+
+        response = client.generic(
+            "POST", "/api/importar-usuarios/", self.csv("N1,NUEVO,ESTUDIANTE,2,x,").encode(), "text/csv"
+        )
+        self.assertEqual((response.status_code, response.json()["creados"]), (200, 1))
+
+        archivo = io.BytesIO(("\ufeff" + self.csv("N2,NUEVO,ESTUDIANTE,2,x,")).encode())
+        archivo.name = "usuarios.csv"
+        response = client.post("/api/importar-usuarios/", {"archivo": archivo}, format="multipart")
+        self.assertEqual((response.status_code, response.json()["creados"]), (200, 1))
+
+        self.assertEqual(client.post("/api/importar-usuarios/", {}, format="multipart").status_code, 400)
+        response = client.generic("POST", "/api/importar-usuarios/", b"cedula,nombre\nN3,X\n", "text/csv")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Datos_basicos.objects.filter(cedula__in=["N1", "N2", "N3"]).count(), 2)
+
+
+class EstadisticasNotasTests(UsuariosMixin, TestCase):
+    """
+    @brief Estadísticas de notas por sección y por profesor de `main/grades.py`, calculadas en PostgreSQL.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.crear_roles()
+        cls.admin = cls.crear_usuario("A1")
+        sembrar_listados(range(1, 7))
+        # Cinco inscripciones en la sección C1/M1 (una sin nota y una fuera de la escala) y una sin notas en C6/M6
+        for i, nota in zip(range(1, 6), (10, 15, 20, None, 25)):
+            listado_estudiantes.objects.filter(cedula_estudiante=f"U{i}").update(
+                codigo_cohorte="C1", cod_materia="M1", profesor_ci="P1", nota=nota,
+            )
+        listado_estudiantes.objects.filter(cedula_estudiante="U6").update(profesor_ci="P2", nota=None)
+
+    def test_estadisticas_por_seccion(self):
+        seccion, sin_notas = grades.grade_statistics()
+
+        self.assertEqual((seccion["codigo_cohorte"], seccion["cod_materia"]), ("C1", "M1"))
+        self.assertEqual(
+            {clave: seccion[clave] for clave in ("inscritos", "evaluados", "promedio", "desviacion", "minima",
+                                                  "maxima", "aprobados", "porcentaje_aprobados", "fuera_de_escala")},
+            {"inscritos": 5, "evaluados": 4, "promedio": 17.5, "desviacion": 6.45, "minima": 10, "maxima": 25,
+             "aprobados": 3, "porcentaje_aprobados": 75.0, "fuera_de_escala": 1},
+        )
+        self.assertEqual(seccion["percentiles"], {"p25": 13.75, "p50": 17.5, "p75": 21.25, "p90": 23.5})
+        self.assertEqual(len(seccion["histograma"]), grades.GRADE_MAX - grades.GRADE_MIN + 1)
+        self.assertEqual(
+            [(cubeta["desde"], cubeta["cantidad"]) for cubeta in seccion["histograma"] if cubeta["cantidad"]],
+            [(10, 1), (15, 1), (20, 1)],
+        )
+
+        self.assertEqual((sin_notas["inscritos"], sin_notas["evaluados"]), (1, 0))
+        self.assertIsNone(sin_notas["promedio"])
+        self.assertIsNone(sin_notas["porcentaje_aprobados"])
+        self.assertEqual(set(sin_notas["percentiles"].values()), {None})
+        self.assertEqual({cubeta["cantidad"] for cubeta in sin_notas["histograma"]}, {0})
+
+    def test_cubetas_y_filtros(self):
+        (seccion,) = grades.grade_statistics(buckets=4, codigo_cohorte="C1", cod_materia="M1")
+
+        self.assertEqual(
+            [(cubeta["desde"], cubeta["hasta"], cubeta["cantidad"]) for cubeta in seccion["histograma"]],
+            [(0, 5.25, 0), (5.25, 10.5, 1), (10.5, 15.75, 1), (15.75, 21.0, 1)],
+        )
+        self.assertEqual(grades.grade_statistics(codigo_cohorte="C9"), [])
+
+    def test_por_profesor_desde_la_vista(self):
+        client = self.cliente(self.admin)
+
+        response = client.get("/api/estadisticas-notas/", {"agrupar": "profesor", "profesor_ci": "p1"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["escala"]["aprobatoria"], grades.PASSING_GRADE)
+        self.assertEqual(
+            [(grupo["profesor_ci"], grupo["inscritos"]) for grupo in response.json()["grupos"]], [("P1", 5)]
+        )
+
+        self.assertEqual(client.get("/api/estadisticas-notas/", {"agrupar": "maestria"}).status_code, 400)
+        self.assertEqual(client.get("/api/estadisticas-notas/", {"cubetas": "0"}).status_code, 400)
+        self.assertEqual(client.get("/api/estadisticas-notas/", {"cubetas": "abc"}).status_code, 400)
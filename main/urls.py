@@ -35,8 +35,8 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 
 
-@permission_classes([AllowAny])
 @api_view(["*"])
+@permission_classes([AllowAny])
 def test(request: HttpRequest):
     print("test")
     return JsonResponse(
@@ -86,13 +86,22 @@ urlpatterns = [
     # @route /eliminar-usuarios/
     # @brief Ruta para eliminar usuarios seleccionados.
     # @note Permite eliminar uno o varios usuarios del sistema basado en los IDs proporcionados.
-    # @see eliminar_usuarios
+    # @see EliminarUsuariosView
     path(
         'eliminar-usuarios/', 
-         eliminar_usuarios, 
+         EliminarUsuariosView.as_view(), 
          name='eliminar_usuarios'
     ),
 
+    ## @route /eliminar-usuarios/<tarea_id>/
+    # @brief Ruta para consultar el avance de una eliminación de usuarios en segundo plano.
+    # @see EstadoEliminacionView
+    path(
+        'eliminar-usuarios/<int:tarea_id>/',
+        EstadoEliminacionView.as_view(),
+        name='estado_eliminacion'
+    ),
+
     ## @route /asignar-profesor-materia/
     # @brief Ruta para asignar un profesor a una materia.
     # @note Permite vincular a un profesor con una materia específica dentro del sistema.
@@ -151,6 +160,16 @@ urlpatterns = [
     # @see UserInfoView
     path("user-info/", UserInfoView.as_view(), name="user-info"),
 
+    ## @route /estadisticas-cache/
+    # @brief Ruta para consultar los contadores de las cachés en memoria.
+    # @note Solo se puede acceder si el usuario está autenticado.
+    # @see EstadisticasCacheView
+    path(
+        "estadisticas-cache/",
+        EstadisticasCacheView.as_view(),
+        name="estadisticas-cache",
+    ),
+
     ## @route /verificar-codigo-cohorte/
     # @brief Ruta para verificar un código de cohorte.
     # @see verificar_codigo_cohorte
@@ -176,6 +195,22 @@ urlpatterns = [
         "listado_estudiantes/", ListadoEstudiantes.as_view(), name="almacenarest-list"
     ),
 
+    ## @route /inscribir-estudiantes/
+    # @brief Ruta para inscribir en lote a varios estudiantes en una materia de una cohorte.
+    # @see InscribirEstudiantesView
+    path("inscribir-estudiantes/", InscribirEstudiantesView.as_view(), name="inscribir-estudiantes"),
+
+    ## @route /cargar-notas/
+    # @brief Ruta para que el profesor autenticado cargue en lote las notas de una sección.
+    # @see CargarNotasView
+    path("cargar-notas/", CargarNotasView.as_view(), name="cargar-notas"),
+
+    ## @route /estadisticas-notas/
+    # @brief Ruta para obtener las estadísticas de las notas por sección o por profesor.
+    # @note Acepta `agrupar` (`seccion` o `profesor`), `cubetas`, `q_code`, `m_code` y `profesor_ci`.
+    # @see EstadisticasNotasView
+    path("estadisticas-notas/", EstadisticasNotasView.as_view(), name="estadisticas-notas"),
+
     ## @route /almacenarestudiante/
     # @brief Ruta para almacenar o actualizar los datos de un estudiante.
     # @see AlmacenarDatosEstView
@@ -216,11 +251,44 @@ urlpatterns = [
     # @see PagosListAPIView
     path("pagos/", PagosListAPIView.as_view(), name="pagos-list"),
 
+    ## @route /buscar-personas/
+    # @brief Ruta para buscar personas por coincidencia parcial de cédula, nombre, apellido o correo.
+    # @note Parámetros: `q`, `tipo_usuario` y `limit`. Solo se puede acceder si el usuario está autenticado.
+    # @see BuscarPersonasView
+    path("buscar-personas/", BuscarPersonasView.as_view(), name="buscar-personas"),
+
+    ## @route /exportar/<nombre>/
+    # @brief Ruta para exportar un listado: CSV transmitido (`GET`) o tarea de XLSX (`POST`).
+    # @note `nombre` es `listado_estudiantes`, `pagos` o `usuarios`; acepta los filtros de la ruta de consulta
+    # correspondiente (`q_code`, `m_code`, `estado_pago`, `tipo_usuario`).
+    # @see ExportarListadoView
+    path("exportar/<str:nombre>/", ExportarListadoView.as_view(), name="exportar_listado"),
+
+    ## @route /exportaciones/<tarea_id>/
+    # @brief Ruta para consultar el estado de una exportación XLSX.
+    # @see EstadoExportacionView
+    path("exportaciones/<int:tarea_id>/", EstadoExportacionView.as_view(), name="estado_exportacion"),
+
+    ## @route /exportaciones/<tarea_id>/descarga/
+    # @brief Ruta para descargar el archivo XLSX de una exportación terminada.
+    # @see EstadoExportacionView
+    path(
+        "exportaciones/<int:tarea_id>/descarga/",
+        EstadoExportacionView.as_view(),
+        {"descargar": True},
+        name="descargar_exportacion",
+    ),
+
     ## @route /datosbasicos/
     # @brief Ruta para agregar un nuevo usuario con datos básicos.
     # @see DatosBasicosCreateView
     path("datosbasicos/", DatosBasicosCreateView.as_view(), name="agregar_usuario"),
 
+    ## @route /importar-usuarios/
+    # @brief Ruta para registrar usuarios en lote a partir de un archivo CSV.
+    # @see ImportarUsuariosView
+    path("importar-usuarios/", ImportarUsuariosView.as_view(), name="importar_usuarios"),
+
     # @route /datos-maestria/
     # @brief Ruta para obtener datos de las maestrías.
     # @note Proporciona una lista de todas las maestrías disponibles y sus detalles asociados.
@@ -0,0 +1,220 @@
+##
+# @file user_import.py
+# @brief Importación masiva de usuarios desde un CSV mediante `COPY` de PostgreSQL.
+#
+# `DatosBasicosCreateView` registra una persona por solicitud con 4 o 5 viajes a la base de datos. Para los
+# ingresos de una cohorte completa, `import_users` lee el CSV fila a fila, valida y convierte a mayúsculas cada
+# fila igual que esa vista (`ImportacionUsuarioSerializer`), carga las filas válidas en una tabla temporal con
+# `COPY ... FROM STDIN` y las fusiona con unas pocas sentencias:
+#
+# - `Datos_basicos`: `INSERT ... ON CONFLICT (cedula) DO UPDATE`, que crea o actualiza a cada usuario.
+# - `datos_login`: actualiza la contraseña y el rol de los registros existentes, incrementando `version_token`
+#   si cambiaron (lo que revoca sus tokens), y crea los que faltan.
+# - `profesores`: crea el registro de los usuarios con `tipo_usuario = 3` que aún no lo tienen.
+#
+# Todo ocurre en una transacción. Las filas inválidas no se importan y se informan con su número de línea.
+#
+# Columnas del CSV (con encabezado): `cedula`, `nombre`, `apellido`, `tipo_usuario`, `contraseña`, `correo`.
+#
+# @see `main/management/commands/importar_usuarios.py`
+#
+
+import csv
+import tempfile
+from dataclasses import dataclass, field
+
+from django.db import NotSupportedError, connection, transaction
+from rest_framework.exceptions import ValidationError
+
+from .cache import principal_cache, set_token_versions
+from .invalidation import invalidation_bus
+from .models import Datos_basicos, Roles, datos_login, profesores
+from .serializers import ImportacionUsuarioSerializer
+from .table_versions import bump_table_version
+
+## @brief Columnas obligatorias del CSV, en el orden en que se cargan en la tabla temporal.
+COLUMNS = ("cedula", "nombre", "apellido", "tipo_usuario", "contraseña", "correo")
+
+## @brief Tamaño a partir del cual los datos para `COPY` se guardan en disco en lugar de en memoria.
+SPOOL_SIZE = 8 * 1024 * 1024
+
+
+@dataclass
+class ImportResult:
+    """
+    @brief Resultado de una importación.
+    """
+
+    total: int = 0
+    creados: int = 0
+    actualizados: int = 0
+    logins_creados: int = 0
+    logins_actualizados: int = 0
+    profesores_creados: int = 0
+    errores: list = field(default_factory=list)
+
+    def as_dict(self):
+        """
+        @brief Devuelve el resultado en un diccionario serializable.
+        """
+        return {
+            "total": self.total,
+            "importados": self.creados + self.actualizados,
+            "creados": self.creados,
+            "actualizados": self.actualizados,
+            "logins_creados": self.logins_creados,
+            "logins_actualizados": self.logins_actualizados,
+            "profesores_creados": self.profesores_creados,
+            "errores": self.errores,
+        }
+
+
+def validate_rows(lines, result):
+    """
+    @brief Valida las filas del CSV y devuelve las válidas; los errores se agregan a `result.errores`.
+
+    Como en `DatosBasicosCreateView`, todos los valores excepto la contraseña se convierten a mayúsculas. Si una
+    cédula se repite en el archivo, solo se importa su primera aparición.
+
+    @param lines Iterable de líneas de texto del CSV.
+    @return list: Tuplas con los valores de `COLUMNS` de cada fila válida.
+    @throws ValueError Si al encabezado le faltan columnas obligatorias.
+    """
+    reader = csv.DictReader(lines)
+    faltantes = [column for column in COLUMNS if column not in (reader.fieldnames or ())]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en el CSV: {', '.join(faltantes)}.")
+
+    # Una sola instancia del serializador valida todas las filas
+    serializer = ImportacionUsuarioSerializer()
+    filas = {}
+    validas = []
+    for row in reader:
+        result.total += 1
+        fila = reader.line_num
+        data = {
+            column: value.upper() if column != "contraseña" and isinstance(value, str) else value
+            for column, value in row.items()
+            if column in COLUMNS
+        }
+        try:
+            values = serializer.run_validation(data)
+        except ValidationError as e:
+            errores = {campo: [str(mensaje) for mensaje in mensajes] for campo, mensajes in e.detail.items()}
+            result.errores.append({"fila": fila, "cedula": data.get("cedula"), "errores": errores})
+            continue
+        cedula = values["cedula"]
+        if cedula in filas:
+            result.errores.append({
+                "fila": fila,
+                "cedula": cedula,
+                "errores": {"cedula": [f"Cédula repetida en el archivo (fila {filas[cedula]})."]},
+            })
+            continue
+        filas[cedula] = fila
+        validas.append(tuple(values[column] for column in COLUMNS))
+    return validas
+
+
+def _copy_to_staging(cursor, rows):
+    cursor.execute(
+        "CREATE TEMPORARY TABLE importacion_usuarios ("
+        " cedula text PRIMARY KEY, nombre text, apellido text, tipo_usuario integer,"
+        " contraseña text, correo text"
+        ") ON COMMIT DROP"
+    )
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE, mode="w+", newline="") as buffer:
+        # Con todas las columnas entre comillas, un texto vacío no se confunde con NULL
+        csv.writer(buffer, quoting=csv.QUOTE_ALL).writerows(rows)
+        buffer.seek(0)
+        cursor.copy_expert(
+            f"COPY importacion_usuarios ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+
+
+def _merge(cursor, result):
+    q = connection.ops.quote_name
+    basicos = q(Datos_basicos._meta.db_table)
+    login = q(datos_login._meta.db_table)
+    profesor = q(profesores._meta.db_table)
+
+    # `xmax = 0` distingue las filas insertadas de las actualizadas por ON CONFLICT
+    cursor.execute(
+        f"INSERT INTO {basicos} (cedula, nombre, apellido, tipo_usuario, {q('contraseña')}, correo) "
+        f"SELECT cedula, nombre, apellido, tipo_usuario, contraseña, correo FROM importacion_usuarios "
+        f"ON CONFLICT (cedula) DO UPDATE SET nombre = EXCLUDED.nombre, apellido = EXCLUDED.apellido, "
+        f"tipo_usuario = EXCLUDED.tipo_usuario, {q('contraseña')} = EXCLUDED.{q('contraseña')}, "
+        f"correo = EXCLUDED.correo "
+        f"RETURNING (xmax = 0)"
+    )
+    insertados = [creado for creado, in cursor.fetchall()]
+    result.creados = sum(insertados)
+    result.actualizados = len(insertados) - result.creados
+
+    versiones = {}
+    cursor.execute(
+        f"UPDATE {login} AS l SET {q('contraseña_usuario')} = s.contraseña, tipo_usuario = s.tipo_usuario, "
+        f"version_token = l.version_token + CASE WHEN l.{q('contraseña_usuario')} IS DISTINCT FROM s.contraseña "
+        f"OR l.tipo_usuario IS DISTINCT FROM s.tipo_usuario THEN 1 ELSE 0 END "
+        f"FROM importacion_usuarios AS s WHERE l.cedula_usuario = s.cedula "
+        f"RETURNING l.id, l.version_token"
+    )
+    actualizados = cursor.fetchall()
+    result.logins_actualizados = len(actualizados)
+    versiones.update(actualizados)
+
+    cursor.execute(
+        f"INSERT INTO {login} (cedula_usuario, {q('contraseña_usuario')}, tipo_usuario, version_token) "
+        f"SELECT s.cedula, s.contraseña, s.tipo_usuario, 0 FROM importacion_usuarios AS s "
+        f"WHERE NOT EXISTS (SELECT 1 FROM {login} AS l WHERE l.cedula_usuario = s.cedula) "
+        f"RETURNING id, version_token"
+    )
+    creados = cursor.fetchall()
+    result.logins_creados = len(creados)
+    versiones.update(creados)
+
+    cursor.execute(
+        f"INSERT INTO {profesor} (ci_profesor, nom_profesor_materia, ape_profesor_materia, cod_maestria_prof) "
+        f"SELECT s.cedula, s.nombre, s.apellido, NULL FROM importacion_usuarios AS s "
+        f"WHERE s.tipo_usuario = %s "
+        f"AND NOT EXISTS (SELECT 1 FROM {profesor} AS p WHERE p.ci_profesor = s.cedula)",
+        [Roles.PROFESOR.value],
+    )
+    result.profesores_creados = cursor.rowcount
+    return versiones
+
+
+def import_users(lines):
+    """
+    @brief Importa usuarios desde las líneas de un CSV.
+
+    Las escrituras no disparan señales, por lo que al confirmar la transacción se publican las versiones de
+    token de los registros de login tocados y las versiones de las tablas modificadas.
+
+    @param lines Iterable de líneas de texto del CSV (por ejemplo, un archivo abierto en modo texto).
+    @return ImportResult: Conteos de la importación y errores por fila.
+    @throws ValueError Si al encabezado le faltan columnas obligatorias.
+    @throws NotSupportedError Si la base de datos no es PostgreSQL.
+    """
+    if connection.vendor != "postgresql":
+        raise NotSupportedError("La importación masiva de usuarios requiere PostgreSQL (COPY).")
+
+    result = ImportResult()
+    rows = validate_rows(lines, result)
+    if not rows:
+        return result
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        _copy_to_staging(cursor, rows)
+        versiones = _merge(cursor, result)
+        # ON COMMIT DROP no alcanza si la importación ocurre dentro de una transacción mayor que hace otra
+        cursor.execute("DROP TABLE importacion_usuarios")
+
+        def publish():
+            set_token_versions(versiones)
+            principal_cache.invalidate_users(versiones)
+            invalidation_bus.publish_keys(datos_login, versiones)
+            bump_table_version(Datos_basicos, datos_login, profesores)
+
+        transaction.on_commit(publish)
+    return result
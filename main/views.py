@@ -10,31 +10,52 @@ from rest_framework import status, viewsets, generics
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
-from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-from rest_framework_simplejwt.tokens import RefreshToken
+from django.http import FileResponse
+from django.urls import reverse
 from django.utils import timezone
-import json
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import IntegrityError, NotSupportedError, transaction
+from django.db.models import Case, F, Q, TextField, Value, When
+from django.db.models.functions import Concat, Greatest, Upper
+import codecs
+import csv
 import sys
 import traceback
 import datetime
 
-from main.permissions import IsPublic
-from . import models
+from main.permissions import IsAdmin, IsProfesor, IsPublic
+from . import deletion, exports, models
+from .authentication import generar_tokens
+from .cache import principal_cache
+from .catalog import catalog_stats, cohorte_catalog, maestria_catalog, materia_catalog, role_catalog
+from .cohort_codes import create_cohort, next_free_code
+from .enrollment import enroll_students, find_teacher
+from .grades import GRADE_MAX, GRADE_MIN, PASSING_GRADE, STATISTICS_GROUPS, apply_grades, grade_statistics
+from .fast_serialization import RowSerializer
+from .invalidation import invalidation_bus
+from .pagination import KeysetPagination
+from .renderers import CSVStreamParser, JsonResponse, json_loads
+from .streaming import streaming_json_response, streaming_requested
+from .table_versions import ConditionalListMixin, bump_table_version
+from .user_import import import_users
 from .models import (
     AsignarProfesorMateria, materias_pensum, profesores, Cohorte, 
     PlanificacionProfesor, listado_estudiantes, tabla_solicitudes, 
     tabla_pagos, Datos_basicos, datos_login, roles, estudiante_datos,
-    datos_maestria
+    datos_maestria, TareaEliminacion, TareaExportacion
 )
 from .serializers import (
     AsignarProfesorMateriaSerializer, MateriasPensumSerializer, 
     ProfesoresSerializer, CohorteSerializer, PlanificacionProfesorSerializer,
     ListadoEstudiantesSerializer, TablaSolicitudesSerializer, 
     TablaPagosSerializer, DatosBasicosSerializer, DatosLoginSerializer,
-    EstudianteDatosSerializer, DatosMaestriaSerializer
+    EstudianteDatosSerializer, DatosMaestriaSerializer, NotaEstudianteSerializer,
+    InscripcionEstudiantesSerializer
 )
 
 # Utilidad para convertir texto a mayúsculas
@@ -53,21 +74,79 @@ def convert_to_uppercase(data):
     return uppercase_data
 
 # Clase base para vistas CRUD simples
-class BaseCRUDView(APIView):
+class BaseCRUDView(ConditionalListMixin, APIView):
     """
     @brief Clase base para operaciones CRUD simples.
     """
     model = None
     serializer_class = None
     permission_classes = []
+    # Columna usada por la paginación por cursor (prefijo "-" para orden descendente); None = clave primaria
+    cursor_ordering = None
+
+    def get_etag_models(self):
+        """
+        @brief Tablas de las que depende el listado; por defecto solo la del modelo de la vista.
+        """
+        return self.etag_models or (self.model,)
+
+    def get_queryset(self, request):
+        """
+        @brief Devuelve el queryset que lista la vista; las subclases lo sobrescriben para filtrar.
+        """
+        return self.model.objects.all()
     
     def get(self, request, format=None):
         """
         @brief Obtiene todos los registros del modelo.
+        Si se envían los parámetros `cursor` o `limit`, devuelve una página paginada por cursor.
+        Con `fields=a,b` solo se consultan y devuelven esos campos; con `stream=1` el listado se transmite
+        por partes sin cargarlo completo en memoria.
+        Responde 304 sin consultar la base de datos si el ETag del cliente sigue vigente.
         """
-        objects = self.model.objects.all()
-        serializer = self.serializer_class(objects, many=True)
-        return Response(serializer.data)
+        etag, not_modified = self.not_modified_response(request)
+        if not_modified is not None:
+            return not_modified
+
+        fields = self.serializer_class.validar_campos(request.query_params.get("fields"))
+        paginator = KeysetPagination(self.cursor_ordering)
+        paginated = paginator.is_requested(request)
+        objects, to_representation = self.prepare_listing(
+            self.get_queryset(request), fields,
+            [f.name for f in paginator.cursor_fields(self.model)] if paginated else [],
+        )
+
+        if paginated:
+            page, next_cursor = paginator.paginate_queryset(objects, request)
+            data = [to_representation(obj) for obj in page]
+            return self.with_etag(paginator.get_paginated_response(data, next_cursor), etag)
+        if streaming_requested(request.query_params):
+            return self.with_etag(streaming_json_response(objects, to_representation), etag)
+        return self.with_etag(Response([to_representation(obj) for obj in objects]), etag)
+
+    def prepare_listing(self, objects, fields, extra_columns=()):
+        """
+        @brief Prepara el queryset de un listado y la función que convierte cada fila.
+
+        Si el serializador lo permite, las filas se leen con `.values()` y se convierten con el serializador
+        rápido de solo lectura; si no, se restringen las columnas con `.only()`, se cargan las relaciones
+        anidadas y se usa el serializador de la vista.
+
+        @param objects Queryset del listado.
+        @param fields Campos solicitados o None.
+        @param extra_columns Columnas adicionales que deben leerse (por ejemplo, las del cursor).
+        @return tuple: (queryset, función de conversión por fila).
+        """
+        fast = RowSerializer.for_serializer(self.serializer_class, fields)
+        if fast is not None:
+            return fast.values(objects, *extra_columns), fast
+
+        if fields is not None:
+            columnas = self.serializer_class.columnas_modelo(fields)
+            columnas += [c for c in extra_columns if c not in columnas]
+            objects = objects.only(*columnas)
+        objects = self.serializer_class.cargar_relaciones(objects, fields)
+        return objects, self.serializer_class(fields=fields).to_representation
     
     def post(self, request, format=None):
         """
@@ -86,10 +165,15 @@ class AsignarProfesorMateriaView(BaseCRUDView):
     """
     model = AsignarProfesorMateria
     serializer_class = AsignarProfesorMateriaSerializer
+    etag_models = (AsignarProfesorMateria, materias_pensum, datos_maestria)
     
     def post(self, request):
         """
         @brief Crea nuevas asignaciones de profesor a materia.
+
+        Todo el lote se valida antes de escribir. Las claves foráneas se resuelven con una consulta por relación y
+        las filas se insertan con un único `bulk_create` dentro de una transacción: si algún elemento es inválido
+        no se guarda ninguno y la respuesta indica los errores de cada elemento por su posición (`index`).
         """
         planning_data = request.data.get("planning", [])
         if not planning_data:
@@ -97,22 +181,34 @@ class AsignarProfesorMateriaView(BaseCRUDView):
                 {"detail": "No se proporcionaron datos de planificación."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        if not isinstance(planning_data, list) or not all(isinstance(item, dict) for item in planning_data):
+            return Response(
+                {"detail": "planning debe ser una lista de objetos."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        created_assignments = []
-        errors = []
-
-        for item in planning_data:
-            uppercase_item = convert_to_uppercase(item)
-            serializer = self.serializer_class(data=uppercase_item)
-            if serializer.is_valid():
-                serializer.save()
-                created_assignments.append(serializer.data)
-            else:
-                errors.append(serializer.errors)
+        items = [convert_to_uppercase(item) for item in planning_data]
+        context = {"precargados": self.serializer_class.precargar_relaciones(items)}
+        serializers_lote = [self.serializer_class(data=item, context=context) for item in items]
 
+        errors = [
+            {"index": index, "errors": serializer.errors}
+            for index, serializer in enumerate(serializers_lote)
+            if not serializer.is_valid()
+        ]
         if errors:
             return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
 
+        asignaciones = [self.model(**serializer.validated_data) for serializer in serializers_lote]
+        try:
+            with transaction.atomic():
+                self.model.objects.bulk_create(asignaciones)
+                # `bulk_create` no dispara señales, por lo que la versión de la tabla se cambia explícitamente
+                transaction.on_commit(lambda: bump_table_version(self.model))
+        except IntegrityError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        created_assignments = self.serializer_class(asignaciones, many=True).data
         return Response(
             {"created": created_assignments}, status=status.HTTP_201_CREATED
         )
@@ -123,6 +219,7 @@ class MateriasPensumAPIView(BaseCRUDView):
     """
     model = materias_pensum
     serializer_class = MateriasPensumSerializer
+    etag_models = (materias_pensum, datos_maestria)
     permission_classes = [IsAuthenticated]
 
 class ProfesoresAPIView(BaseCRUDView):
@@ -226,9 +323,9 @@ class ListadoEstudiantes(BaseCRUDView):
     model = listado_estudiantes
     serializer_class = ListadoEstudiantesSerializer
     
-    def get(self, request):
+    def get_queryset(self, request):
         """
-        @brief Método GET: Para obtener todos los estudiantes con filtros opcionales.
+        @brief Obtiene todos los estudiantes con filtros opcionales por cohorte (`q_code`) y materia (`m_code`).
         """
         q_code = request.query_params.get("q_code")
         m_code = request.query_params.get("m_code")
@@ -239,8 +336,146 @@ class ListadoEstudiantes(BaseCRUDView):
         if m_code:
             estudiantes = estudiantes.filter(cod_materia=m_code)
             
-        serializer = self.serializer_class(estudiantes, many=True)
-        return Response(serializer.data)
+        return estudiantes
+
+class InscribirEstudiantesView(APIView):
+    """
+    @brief Inscribe en lote a varios estudiantes en una materia de una cohorte (ver `main/enrollment.py`).
+    """
+
+    def post(self, request):
+        """
+        @brief Inscribe las `cedulas` indicadas en `cod_materia` de `codigo_cohorte`.
+
+        Los datos del estudiante, de la materia y del profesor (`cedula_profesor` opcional; si no se indica, el de la
+        planificación o asignación de la materia) se copian con una sola consulta. Los estudiantes ya inscritos se
+        omiten sin error. Si el cuerpo no es válido o alguna cédula no es de un estudiante se responde 400.
+        """
+        serializer = InscripcionEstudiantesSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+        codigo_cohorte = data["codigo_cohorte"]
+        cod_materia = data["cod_materia"]
+
+        # Catálogos en memoria
+        if not cohorte_catalog.exists(codigo_cohorte):
+            return Response({"error": "Cohorte no encontrada."}, status=status.HTTP_400_BAD_REQUEST)
+        if not materia_catalog.exists(cod_materia):
+            return Response({"error": "Materia no encontrada."}, status=status.HTTP_400_BAD_REQUEST)
+
+        profesor = find_teacher(cod_materia, codigo_cohorte, data.get("cedula_profesor"))
+        if profesor is None:
+            return Response(
+                {"error": "La materia no tiene un profesor asignado en esta cohorte."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        result = enroll_students(codigo_cohorte, cod_materia, data["cedulas"], profesor)
+        return Response(
+            result.as_dict(),
+            status=status.HTTP_201_CREATED if result.inscritos else status.HTTP_200_OK,
+        )
+
+class CargarNotasView(APIView):
+    """
+    @brief Permite al profesor autenticado cargar en lote las notas de una de sus secciones (ver `main/grades.py`).
+    """
+    permission_classes = [IsProfesor]
+
+    def post(self, request):
+        """
+        @brief Guarda las `notas` de `cod_materia` en `codigo_cohorte`.
+
+        Cada elemento de `notas` tiene `cedula_estudiante`, `nota` y la `version` de la inscripción que se leyó.
+        Si alguna inscripción cambió desde entonces no se guarda ninguna nota y se responde 409 con sus valores
+        actuales; si alguna no pertenece a la sección del profesor se responde 400.
+        """
+        codigo_cohorte = request.data.get("codigo_cohorte")
+        cod_materia = request.data.get("cod_materia")
+        notas = request.data.get("notas")
+
+        if not isinstance(codigo_cohorte, str) or not isinstance(cod_materia, str):
+            return Response(
+                {"error": "Se requieren codigo_cohorte y cod_materia."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not notas or not isinstance(notas, list):
+            return Response(
+                {"error": "notas debe ser una lista no vacía."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Una sola instancia del serializador valida todas las notas
+        serializer = NotaEstudianteSerializer()
+        validas = []
+        errores = []
+        vistas = set()
+        for index, item in enumerate(notas):
+            try:
+                nota = serializer.run_validation(item)
+            except ValidationError as e:
+                errores.append({"index": index, "errors": e.detail})
+                continue
+            if nota["cedula_estudiante"] in vistas:
+                errores.append({"index": index, "errors": {"cedula_estudiante": ["Cédula repetida en la carga."]}})
+                continue
+            vistas.add(nota["cedula_estudiante"])
+            validas.append(nota)
+        if errores:
+            return Response({"errors": errores}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = apply_grades(
+            codigo_cohorte.upper(), cod_materia.upper(), request.user.cedula_usuario_id, validas
+        )
+        if result.actualizados:
+            return Response(result.as_dict(), status=status.HTTP_200_OK)
+        if result.no_encontrados and not result.conflictos:
+            return Response(result.as_dict(), status=status.HTTP_400_BAD_REQUEST)
+        return Response(result.as_dict(), status=status.HTTP_409_CONFLICT)
+
+class EstadisticasNotasView(APIView):
+    """
+    @brief Estadísticas de las notas por sección (cohorte y materia) o por profesor, calculadas en PostgreSQL.
+    """
+
+    def get(self, request):
+        """
+        @brief Devuelve cantidad, promedio, percentiles, porcentaje de aprobados e histograma de cada grupo.
+
+        Parámetros: `agrupar` (`seccion` o `profesor`), `cubetas` (del histograma) y los filtros `q_code`
+        (cohorte), `m_code` (materia) y `profesor_ci`.
+        """
+        agrupar = request.query_params.get("agrupar", "seccion")
+        if agrupar not in STATISTICS_GROUPS:
+            return Response(
+                {"error": f"agrupar debe ser uno de: {', '.join(STATISTICS_GROUPS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        cubetas = request.query_params.get("cubetas")
+        if cubetas is not None:
+            if not cubetas.isdigit() or not 1 <= int(cubetas) <= 100:
+                return Response(
+                    {"error": "cubetas debe ser un entero entre 1 y 100."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            cubetas = int(cubetas)
+
+        try:
+            grupos = grade_statistics(
+                agrupar,
+                cubetas,
+                codigo_cohorte=request.query_params.get("q_code", "").upper(),
+                cod_materia=request.query_params.get("m_code", "").upper(),
+                profesor_ci=request.query_params.get("profesor_ci", "").upper(),
+            )
+        except NotSupportedError as e:
+            return Response({"error": str(e)}, status=status.HTTP_501_NOT_IMPLEMENTED)
+        return Response({
+            "agrupar": agrupar,
+            "escala": {"min": GRADE_MIN, "max": GRADE_MAX, "aprobatoria": PASSING_GRADE},
+            "grupos": grupos,
+        })
 
 class SolicitudesListAPIView(BaseCRUDView):
     """
@@ -248,6 +483,7 @@ class SolicitudesListAPIView(BaseCRUDView):
     """
     model = tabla_solicitudes
     serializer_class = TablaSolicitudesSerializer
+    cursor_ordering = "-fecha_solicitud"
 
 class PagosListAPIView(BaseCRUDView):
     """
@@ -255,14 +491,17 @@ class PagosListAPIView(BaseCRUDView):
     """
     model = tabla_pagos
     serializer_class = TablaPagosSerializer
-    
-    def get(self, request):
+    cursor_ordering = "-fecha_pago"
+
+    def get_queryset(self, request):
         """
-        @brief Recupera todos los pagos con relaciones.
+        @brief Obtiene los pagos, opcionalmente filtrados por estado (`estado_pago`, por ejemplo `Pendiente`).
         """
-        pagos = self.model.objects.select_related().all()
-        serializer = self.serializer_class(pagos, many=True)
-        return Response(serializer.data)
+        pagos = self.model.objects.all()
+        estado_pago = request.query_params.get("estado_pago")
+        if estado_pago:
+            pagos = pagos.filter(estado_pago=estado_pago)
+        return pagos
 
 class DatosBasicosCreateView(BaseCRUDView):
     """
@@ -284,11 +523,10 @@ class DatosBasicosCreateView(BaseCRUDView):
         cedula_exp = data.get("cedula")
         tipo_usuario_exp = data.get("tipo_usuario")
         
-        # Buscar la instancia del rol correspondiente al tipo_usuario
+        # Buscar la instancia del rol correspondiente al tipo_usuario (catálogo en memoria)
         if tipo_usuario_exp:
-            try:
-                tipo_usuario_obj = roles.objects.get(codigo_rol=tipo_usuario_exp)
-            except roles.DoesNotExist:
+            tipo_usuario_obj = role_catalog.get(tipo_usuario_exp)
+            if tipo_usuario_obj is None:
                 return Response(
                     {"error": "Tipo de usuario no encontrado."},
                     status=status.HTTP_400_BAD_REQUEST,
@@ -364,6 +602,39 @@ class DatosBasicosCreateView(BaseCRUDView):
             else:
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+class ImportarUsuariosView(APIView):
+    """
+    @brief Registra usuarios en lote a partir de un archivo CSV (ver `main/user_import.py`).
+
+    El CSV puede enviarse como cuerpo `text/csv` o como el archivo `archivo` de un formulario `multipart`. Las
+    filas válidas se crean o actualizan como en `DatosBasicosCreateView` y las inválidas se informan por línea.
+    """
+    parser_classes = [CSVStreamParser, MultiPartParser]
+
+    def post(self, request):
+        """
+        @brief Importa los usuarios del CSV y devuelve los conteos y los errores por fila.
+        """
+        if request.content_type.startswith("text/csv"):
+            lines = request.data
+        else:
+            archivo = request.FILES.get("archivo")
+            if archivo is None:
+                return Response(
+                    {"error": "Se requiere un CSV como cuerpo text/csv o en el campo 'archivo'."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            lines = codecs.iterdecode(archivo, "utf-8-sig")
+
+        try:
+            result = import_users(lines)
+        except (ValueError, csv.Error) as e:
+            # Incluye UnicodeDecodeError
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except NotSupportedError as e:
+            return Response({"error": str(e)}, status=status.HTTP_501_NOT_IMPLEMENTED)
+        return Response(result.as_dict(), status=status.HTTP_200_OK)
+
 class BuscarCedulaEstView(APIView):
     """
     @brief Vista para obtener y buscar datos básicos de estudiantes por cédula.
@@ -398,6 +669,74 @@ class BuscarCedulaEstView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
+class BuscarPersonasView(APIView):
+    """
+    @brief Búsqueda parcial de personas en `Datos_basicos` por cédula, nombre, apellido o correo.
+
+    Cada palabra de la búsqueda debe aparecer en alguna de las columnas (`icontains`) o parecerse a una palabra del
+    nombre o del apellido (`trigram_word_similar`, tolera errores de escritura). Ambas condiciones usan los índices
+    GIN de trigramas (`pg_trgm`) sobre `UPPER(columna)`. Los resultados se ordenan por similitud.
+
+    Parámetros: `q` (al menos 3 caracteres), `tipo_usuario` (opcional) y `limit` (por defecto 20, máximo 100).
+    """
+    campos = ("cedula", "nombre", "apellido", "correo", "tipo_usuario")
+    longitud_minima = 3
+    limite_por_defecto = 20
+    limite_maximo = 100
+
+    def get(self, request):
+        """
+        @brief Devuelve las personas que coinciden con `q`, de la más a la menos parecida.
+        """
+        termino = request.query_params.get("q", "").strip().upper()
+        if len(termino) < self.longitud_minima:
+            return Response(
+                {"q": f"La búsqueda requiere al menos {self.longitud_minima} caracteres."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            limite = int(request.query_params.get("limit", self.limite_por_defecto))
+            tipo_usuario = request.query_params.get("tipo_usuario")
+            tipo_usuario = int(tipo_usuario) if tipo_usuario else None
+        except ValueError:
+            return Response(
+                {"error": "Los parámetros limit y tipo_usuario deben ser números enteros."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        limite = max(1, min(limite, self.limite_maximo))
+
+        personas = Datos_basicos.objects.annotate(
+            nombre_mayus=Upper("nombre"), apellido_mayus=Upper("apellido")
+        )
+        if tipo_usuario is not None:
+            personas = personas.filter(tipo_usuario=tipo_usuario)
+        for palabra in termino.split():
+            personas = personas.filter(
+                Q(cedula__icontains=palabra)
+                | Q(nombre__icontains=palabra)
+                | Q(apellido__icontains=palabra)
+                | Q(correo__icontains=palabra)
+                | Q(nombre_mayus__trigram_word_similar=palabra)
+                | Q(apellido_mayus__trigram_word_similar=palabra)
+            )
+
+        personas = personas.annotate(
+            similitud=Greatest(
+                TrigramWordSimilarity(
+                    termino, Concat("nombre_mayus", Value(" "), "apellido_mayus", output_field=TextField())
+                ),
+                TrigramWordSimilarity(termino, "apellido_mayus"),
+                TrigramWordSimilarity(termino, Upper("cedula")),
+                TrigramWordSimilarity(termino, Upper("correo")),
+            )
+        ).order_by("-similitud", "apellido", "nombre").values(*self.campos, "similitud")[:limite]
+
+        resultados = [
+            {**persona, "similitud": round(persona["similitud"], 3)} for persona in personas
+        ]
+        return Response(resultados, status=status.HTTP_200_OK)
+
 class AlmacenarDatosEstView(APIView):
     """
     @brief Vista para registrar o actualizar los datos de un estudiante.
@@ -423,10 +762,8 @@ class AlmacenarDatosEstView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Buscar la instancia de datos_maestria
-        datos_maestria_instance = datos_maestria.objects.filter(
-            cod_maestria=cod_maestria
-        ).first()
+        # Buscar la instancia de datos_maestria (catálogo en memoria)
+        datos_maestria_instance = maestria_catalog.get(cod_maestria) if cod_maestria else None
         if cod_maestria and not datos_maestria_instance:
             return Response(
                 {"message": "Código de maestría no encontrado."},
@@ -509,25 +846,32 @@ class ProfMaterias(APIView):
         user = request.user
         try:
             serializedUser = DatosLoginSerializer(user).data
-            profesor = profesores.objects.select_related(
-                "cod_maestria_prof", "ci_profesor"
-            ).get(ci_profesor=serializedUser["cedula_usuario"])
+            profesor = profesores.objects.get(ci_profesor=serializedUser["cedula_usuario"])
             
-            materias = materias_pensum.objects.filter(
-                cod_maestria=profesor.cod_maestria_prof
-            )
+            # Las materias (con su maestría) salen del catálogo en memoria
+            materias = materia_catalog.filter_by("cod_maestria_id", profesor.cod_maestria_prof_id)
             serializer = MateriasPensumSerializer(materias, many=True)
             return Response(serializer.data, status=200)
         except materias_pensum.DoesNotExist:
             return Response({"error": "Usuario no encontrado"}, status=404)
 
-class DatosMaestriaViewSet(viewsets.ModelViewSet):
+class DatosMaestriaViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     """
     @brief ViewSet para gestionar datos de maestrías.
     """
     serializer_class = DatosMaestriaSerializer
     queryset = datos_maestria.objects.all()
     permission_classes = [IsPublic]
+    etag_models = (datos_maestria,)
+
+    def list(self, request, *args, **kwargs):
+        """
+        @brief Lista las maestrías; responde 304 si el ETag del cliente sigue vigente.
+        """
+        etag, not_modified = self.not_modified_response(request)
+        if not_modified is not None:
+            return not_modified
+        return self.with_etag(super().list(request, *args, **kwargs), etag)
 
 class UsuariosPorTipoAPIView(APIView):
     """
@@ -536,7 +880,9 @@ class UsuariosPorTipoAPIView(APIView):
     def get(self, request, format=None):
         """
         @brief Maneja las solicitudes GET para obtener usuarios por tipo.
+        Con `fields=a,b` solo se consultan y devuelven esos campos.
         """
+        fields = DatosBasicosSerializer.validar_campos(request.query_params.get('fields'))
         tipo_usuario = request.query_params.get('tipo_usuario')
         
         if tipo_usuario is not None:
@@ -550,9 +896,125 @@ class UsuariosPorTipoAPIView(APIView):
                 )
         else:
             usuarios = Datos_basicos.objects.all()
-        
-        serializer = DatosBasicosSerializer(usuarios, many=True)
-        return Response(serializer.data)
+
+        fast = RowSerializer.for_serializer(DatosBasicosSerializer, fields)
+        return Response([fast(row) for row in fast.values(usuarios)])
+
+class ExportarListadoView(APIView):
+    """
+    @brief Exporta un listado (`listado_estudiantes`, `pagos` o `usuarios`) con los filtros de su ruta de consulta.
+
+    `GET` transmite el CSV directamente desde un cursor del lado del servidor. `POST` crea una tarea que genera el
+    XLSX en otro proceso y responde 202 con la ruta para consultar su estado (ver `main/exports.py`).
+    """
+
+    def get(self, request, nombre):
+        """
+        @brief Transmite el listado `nombre` como CSV.
+        """
+        if nombre not in exports.EXPORTS:
+            return Response({"error": "Listado no exportable."}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            params = exports.export_params(nombre, request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return exports.streaming_csv_response(nombre, params)
+
+    def post(self, request, nombre):
+        """
+        @brief Inicia la generación del XLSX del listado `nombre`.
+        """
+        if nombre not in exports.EXPORTS:
+            return Response({"error": "Listado no exportable."}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            params = exports.export_params(nombre, request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            tarea = exports.start_xlsx_job(nombre, params)
+        except RuntimeError as e:
+            return Response({"error": str(e)}, status=status.HTTP_501_NOT_IMPLEMENTED)
+        return Response(
+            {
+                "tarea_id": tarea.pk,
+                "estado": tarea.estado,
+                "url_estado": reverse("estado_exportacion", args=[tarea.pk]),
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class EstadoExportacionView(APIView):
+    """
+    @brief Consulta el estado de una exportación XLSX y descarga el archivo cuando está listo.
+    """
+
+    def get(self, request, tarea_id, descargar=False):
+        """
+        @brief Devuelve el estado de la tarea o, con `descargar`, el archivo generado.
+        """
+        tarea = TareaExportacion.objects.filter(pk=tarea_id).first()
+        if tarea is None:
+            return Response({"error": "Exportación no encontrada."}, status=status.HTTP_404_NOT_FOUND)
+
+        if descargar:
+            if exports.is_expired(tarea):
+                exports.expire(tarea)
+                tarea.estado = TareaExportacion.EXPIRADA
+            if tarea.estado == TareaExportacion.EXPIRADA:
+                return Response(
+                    {"error": "El archivo de la exportación expiró; solicítelo de nuevo."},
+                    status=status.HTTP_410_GONE,
+                )
+            if tarea.estado != TareaExportacion.COMPLETADA:
+                return Response(
+                    {"error": "La exportación aún no está disponible.", "estado": tarea.estado},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            try:
+                archivo = open(tarea.archivo, "rb")
+            except FileNotFoundError:
+                return Response(
+                    {"error": "El archivo de la exportación ya no existe; solicítelo de nuevo."},
+                    status=status.HTTP_410_GONE,
+                )
+            return FileResponse(
+                archivo,
+                as_attachment=True,
+                filename=f"{tarea.listado}.xlsx",
+                content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            )
+
+        data = {
+            "tarea_id": tarea.pk,
+            "listado": tarea.listado,
+            "parametros": tarea.parametros,
+            "estado": tarea.estado,
+            "filas": tarea.filas,
+            "error": tarea.error,
+            "fecha_creacion": tarea.fecha_creacion,
+            "fecha_actualizacion": tarea.fecha_actualizacion,
+        }
+        if tarea.estado == TareaExportacion.COMPLETADA:
+            data["url_descarga"] = reverse("descargar_exportacion", args=[tarea.pk])
+        return Response(data)
+
+
+class EstadisticasCacheView(APIView):
+    """
+    @brief Endpoint que expone los contadores de las cachés en memoria del proceso.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        @brief Devuelve aciertos, fallos y ocupación de cada caché.
+        """
+        return Response({
+            "principal": principal_cache.stats(),
+            "catalogos": catalog_stats(),
+            "bus": invalidation_bus.stats(),
+        })
 
 # Funciones para autenticación
 @csrf_exempt
@@ -561,21 +1023,14 @@ def admin_login(request):
     """
     @brief Autenticación de usuario admin utilizando nombre de usuario y contraseña.
     """
-    data = json.loads(request.body)
+    data = json_loads(request.body)
     cedula = data.get("username")
     password = data.get("password")
 
     try:
         user = datos_login.objects.get(cedula_usuario=cedula, tipo_usuario=1)
         if user.contraseña_usuario == password:
-            refresh = RefreshToken.for_user(user)
-            return JsonResponse(
-                {
-                    "access": str(refresh.access_token),
-                    "refresh": str(refresh),
-                },
-                status=200,
-            )
+            return JsonResponse(generar_tokens(user), status=200)
         else:
             return JsonResponse({"error": "Contraseña invalida"}, status=401)
     except datos_login.DoesNotExist:
@@ -590,20 +1045,13 @@ def login_profesor(request):
     @brief Endpoint para el login de un profesor.
     """
     try:
-        data = json.loads(request.body)
+        data = json_loads(request.body)
         cedula = data.get("username")
         password = data.get("password")
 
         user = datos_login.objects.get(cedula_usuario=cedula, tipo_usuario=3)
         if user.contraseña_usuario == password:
-            refresh = RefreshToken.for_user(user)
-            return JsonResponse(
-                {
-                    "access": str(refresh.access_token),
-                    "refresh": str(refresh),
-                },
-                status=200,
-            )
+            return JsonResponse(generar_tokens(user), status=200)
         else:
             return JsonResponse({"error": "Contraseña invalida"}, status=401)
     except Exception as e:
@@ -623,20 +1071,13 @@ def login_estudiante(request):
     @brief Endpoint para el login de un estudiante.
     """
     try:
-        data = json.loads(request.body)
+        data = json_loads(request.body)
         cedula = data.get("username")
         password = data.get("password")
 
         user = datos_login.objects.get(cedula_usuario=cedula, tipo_usuario=2)
         if user.contraseña_usuario == password:
-            refresh = RefreshToken.for_user(user)
-            return JsonResponse(
-                {
-                    "access": str(refresh.access_token),
-                    "refresh": str(refresh),
-                },
-                status=200,
-            )
+            return JsonResponse(generar_tokens(user), status=200)
         else:
             return JsonResponse({"error": "Contraseña invalida"}, status=401)
     except Exception as e:
@@ -662,27 +1103,16 @@ def generar_codigo_cohorte(request):
         sede_cohorte = request.data.get("sede_cohorte")
         tipo_maestria = request.data.get("tipo_maestria")
 
-        # Función para generar un nuevo código
-        def generate_new_code(code):
-            prefix = code[:-6]
-            year = code[-4:]
-            current_letter = code[-6]
-            next_letter = chr(ord(current_letter) + 1)
-            return f"{prefix}{next_letter}-{year}"
-
-        # Verifica si el código de cohorte ya existe
-        while Cohorte.objects.filter(codigo_cohorte=codigo_cohorte).exists():
-            codigo_cohorte = generate_new_code(codigo_cohorte)
-
-        # Crea el nuevo cohorte
+        # Crea el nuevo cohorte con el primer código libre a partir del solicitado
         try:
-            cohorte = Cohorte.objects.create(
-                codigo_cohorte=codigo_cohorte,
+            cohorte = create_cohort(
+                codigo_cohorte,
                 fecha_inicio=datetime.datetime.strptime(fecha_inicio, "%Y-%m-%d"),
                 fecha_fin=datetime.datetime.strptime(fecha_fin, "%Y-%m-%d"),
                 sede_cohorte=sede_cohorte,
                 tipo_maestria=tipo_maestria,
             )
+            codigo_cohorte = cohorte.codigo_cohorte
             serializer = CohorteSerializer(cohorte)
             return Response({"codigo_cohorte": codigo_cohorte}, status=201)
         except Exception as e:
@@ -701,53 +1131,91 @@ def verificar_codigo_cohorte(request):
                 {"error": "Código de cohorte no proporcionado"}, status=400
             )
 
-        # Función para generar un nuevo código
-        def generate_new_code(code):
-            prefix = code[:-6]
-            year = code[-4:]
-            current_letter = code[-6]
-            next_letter = chr(ord(current_letter) + 1)
-            return f"{prefix}{next_letter}-{year}"
-
-        # Verifica si el código de cohorte ya existe
-        if Cohorte.objects.filter(codigo_cohorte=codigo_cohorte).exists():
-            new_code = generate_new_code(codigo_cohorte)
+        # Verifica si el código de cohorte ya existe (catálogo en memoria)
+        if cohorte_catalog.exists(codigo_cohorte):
+            try:
+                new_code = next_free_code(codigo_cohorte)
+            except ValueError as e:
+                return JsonResponse({"error": str(e)}, status=400)
             return JsonResponse({"exists": True, "new_code": new_code})
         else:
             return JsonResponse({"exists": False})
 
-# Funciones para eliminar usuarios y actualizar estados
-@csrf_exempt
-@require_http_methods(["POST"])
-def eliminar_usuarios(request):
+# Vistas para eliminar usuarios y funciones para actualizar estados
+class EliminarUsuariosView(APIView):
     """
     @brief Elimina usuarios seleccionados y sus datos de login asociados, excepto el usuario con cédula "V-27943668".
+
+    Con `"asincrono": true` la eliminación se hace en segundo plano y por bloques (ver `main/deletion.py`): la
+    respuesta (202) solo crea la tarea e indica la ruta para consultar su avance. Solo para administradores.
     """
-    try:
-        data = json.loads(request.body)
-        user_ids = data.get('user_ids', [])
-        
+    permission_classes = [IsAdmin]
+
+    def post(self, request):
+        """
+        @brief Elimina los usuarios `user_ids`, en la solicitud o en una tarea en segundo plano.
+        """
+        data = request.data
+        user_ids = data.get('user_ids', []) if isinstance(data, dict) else None
+
         if not user_ids:
-            return JsonResponse({'error': 'No se proporcionaron IDs de usuario'}, status=400)
-        
+            return Response({'error': 'No se proporcionaron IDs de usuario'}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(user_ids, list) or not all(isinstance(uid, (str, int)) for uid in user_ids):
+            return Response({'error': 'user_ids debe ser una lista de cédulas'}, status=status.HTTP_400_BAD_REQUEST)
+
         # Excluir el usuario con cédula "V-27943668"
         protected_user_id = "V-27943668"
-        user_ids = [uid for uid in user_ids if uid != protected_user_id]
-        
+        user_ids = [str(uid) for uid in user_ids if uid != protected_user_id]
+
+        if data.get('asincrono'):
+            tarea = deletion.start_job(user_ids)
+            return Response({
+                'message': 'La eliminación de los usuarios seleccionados se procesará en segundo plano',
+                'tarea_id': tarea.pk,
+                'estado': tarea.estado,
+                'url_estado': reverse('estado_eliminacion', args=[tarea.pk]),
+            }, status=status.HTTP_202_ACCEPTED)
+
         login_count = datos_login.objects.filter(cedula_usuario__cedula__in=user_ids).count()
-        deleted_count = Datos_basicos.objects.filter(cedula__in=user_ids).exclude(cedula=protected_user_id).delete()[0]
-        
-        message = f'Se eliminó la lista de usuarios seleccionados'
-        if protected_user_id in data.get('user_ids', []):
+        deleted_count = Datos_basicos.objects.filter(cedula__in=user_ids).delete()[0]
+
+        message = 'Se eliminó la lista de usuarios seleccionados'
+        if protected_user_id in data['user_ids']:
             message += f', excepto el usuario con cédula {protected_user_id}'
-        
-        return JsonResponse({
+
+        return Response({
             'message': message,
             'deleted_users_count': deleted_count,
             'deleted_login_count': login_count
         })
-    except Exception as e:
-        return JsonResponse({'error': str(e)}, status=500)
+
+class EstadoEliminacionView(APIView):
+    """
+    @brief Devuelve el estado y el avance de una tarea de eliminación de usuarios. Solo para administradores.
+    """
+    permission_classes = [IsAdmin]
+
+    def get(self, request, tarea_id):
+        """
+        @brief Consulta la tarea `tarea_id`.
+        """
+        tarea = TareaEliminacion.objects.filter(pk=tarea_id).first()
+        if tarea is None:
+            return Response({'error': 'Tarea de eliminación no encontrada'}, status=status.HTTP_404_NOT_FOUND)
+
+        total = len(tarea.cedulas)
+        return Response({
+            'tarea_id': tarea.pk,
+            'estado': tarea.estado,
+            'total': total,
+            'procesados': tarea.procesados,
+            'porcentaje': round(100 * tarea.procesados / total, 1) if total else 100.0,
+            'deleted_users_count': tarea.eliminados,
+            'detalle': tarea.detalle,
+            'error': tarea.error,
+            'fecha_creacion': tarea.fecha_creacion,
+            'fecha_actualizacion': tarea.fecha_actualizacion,
+        })
 
 @require_http_methods(["GET"])
 def listar_usuarios(request):
@@ -767,30 +1235,74 @@ def listar_usuarios(request):
 def actualizar_estado_pagos(request):
     """
     @brief Actualiza el estado de los pagos proporcionados.
+
+    Todos los pagos se validan antes de escribir (número de referencia entero y estado dentro de
+    `tabla_pagos.ESTADOS_PAGO`); si alguno es inválido no se modifica ninguno. Los cambios se aplican con un único
+    `UPDATE ... SET estado_pago = CASE ...` agrupado por estado, dentro de una transacción. Si una referencia se
+    repite, prevalece su última aparición. Las referencias que no existen se informan en `no_encontrados`.
     """
     try:
-        data = json.loads(request.body)
+        data = json_loads(request.body)
         pagos = data.get('pagos', [])
 
         if not pagos:
             return JsonResponse({'error': 'No se proporcionaron pagos para actualizar'}, status=400)
+        if not isinstance(pagos, list):
+            return JsonResponse({'error': 'pagos debe ser una lista'}, status=400)
 
-        updated_count = 0
-        for pago in pagos:
+        estados_validos = {estado for estado, _ in tabla_pagos.ESTADOS_PAGO}
+        nuevos_estados = {}
+        errores = []
+        for index, pago in enumerate(pagos):
+            if not isinstance(pago, dict):
+                errores.append({'index': index, 'error': 'El pago debe ser un objeto'})
+                continue
             numero_referencia = pago.get('numero_referencia')
             nuevo_estado = pago.get('nuevoEstado')
+            try:
+                if isinstance(numero_referencia, bool):
+                    raise ValueError
+                numero_referencia = int(numero_referencia)
+            except (TypeError, ValueError):
+                errores.append({'index': index, 'error': f'Número de referencia inválido: {numero_referencia}'})
+                continue
+            if nuevo_estado not in estados_validos:
+                errores.append({'index': index, 'error': f'Estado de pago inválido: {nuevo_estado}'})
+                continue
+            nuevos_estados[numero_referencia] = nuevo_estado
 
-            if numero_referencia and nuevo_estado:
-                try:
-                    numero_referencia = int(numero_referencia)
-                    updated = tabla_pagos.objects.filter(numero_referencia=numero_referencia).update(estado_pago=nuevo_estado)
-                    updated_count += updated
-                except ValueError:
-                    return JsonResponse({'error': f'Número de referencia inválido: {numero_referencia}'}, status=400)
+        if errores:
+            return JsonResponse(
+                {'error': 'Hay pagos inválidos; no se actualizó ninguno', 'errores': errores}, status=400
+            )
+
+        por_estado = {}
+        for numero_referencia, nuevo_estado in nuevos_estados.items():
+            por_estado.setdefault(nuevo_estado, []).append(numero_referencia)
+
+        with transaction.atomic():
+            existentes = set(
+                tabla_pagos.objects.filter(numero_referencia__in=nuevos_estados)
+                .values_list('numero_referencia', flat=True)
+            )
+            updated_count = 0
+            if existentes:
+                updated_count = tabla_pagos.objects.filter(numero_referencia__in=existentes).update(
+                    estado_pago=Case(
+                        *(
+                            When(numero_referencia__in=referencias, then=Value(estado))
+                            for estado, referencias in por_estado.items()
+                        ),
+                        default=F('estado_pago'),
+                    )
+                )
+                # `update()` no dispara señales, por lo que la versión de la tabla se cambia explícitamente
+                transaction.on_commit(lambda: bump_table_version(tabla_pagos))
 
         return JsonResponse({
             'message': f'Se actualizaron {updated_count} pagos exitosamente',
-            'updated_count': updated_count
+            'updated_count': updated_count,
+            'no_encontrados': [ref for ref in nuevos_estados if ref not in existentes],
         })
     except Exception as e:
         print("Error en actualizar_estado_pagos:", traceback.format_exc())
@@ -801,31 +1313,53 @@ def actualizar_estado_pagos(request):
 def actualizar_estado_solicitudes(request):
     """
     @brief Actualiza el estado de las solicitudes proporcionadas.
+
+    Las claves existentes se obtienen con una sola consulta y luego se ejecuta un `UPDATE` por cada estado
+    destino, que solo modifica `status_solicitud` y `fecha_solicitud`. Si un código se repite, prevalece su última
+    aparición. Los códigos que no existen se informan en `no_encontrados`.
     """
     try:
-        data = json.loads(request.body)
+        data = json_loads(request.body)
         solicitudes = data.get('solicitudes', [])
         
         if not solicitudes:
             return JsonResponse({'error': 'No se proporcionaron solicitudes para actualizar'}, status=400)
-        
-        updated_count = 0
+        if not isinstance(solicitudes, list):
+            return JsonResponse({'error': 'solicitudes debe ser una lista'}, status=400)
+
+        nuevos_estados = {}
         for solicitud in solicitudes:
+            if not isinstance(solicitud, dict):
+                continue
             cod_solicitudes = solicitud.get('cod_solicitudes')
             nuevo_estado = solicitud.get('nuevoEstado')
             if cod_solicitudes and nuevo_estado:
-                try:
-                    solicitud_obj = tabla_solicitudes.objects.get(cod_solicitudes=cod_solicitudes)
-                    solicitud_obj.status_solicitud = nuevo_estado
-                    solicitud_obj.fecha_solicitud = timezone.now()
-                    solicitud_obj.save()
-                    updated_count += 1
-                except tabla_solicitudes.DoesNotExist:
-                    continue
-        
+                nuevos_estados[str(cod_solicitudes)] = nuevo_estado
+
+        updated_count = 0
+        existentes = set()
+        if nuevos_estados:
+            ahora = timezone.now()
+            with transaction.atomic():
+                existentes = set(
+                    tabla_solicitudes.objects.filter(cod_solicitudes__in=nuevos_estados)
+                    .values_list('cod_solicitudes', flat=True)
+                )
+                por_estado = {}
+                for cod_solicitudes in existentes:
+                    por_estado.setdefault(nuevos_estados[cod_solicitudes], []).append(cod_solicitudes)
+                for nuevo_estado, codigos in por_estado.items():
+                    updated_count += tabla_solicitudes.objects.filter(cod_solicitudes__in=codigos).update(
+                        status_solicitud=nuevo_estado, fecha_solicitud=ahora
+                    )
+                if updated_count:
+                    # `update()` no dispara señales, por lo que la versión de la tabla se cambia explícitamente
+                    transaction.on_commit(lambda: bump_table_version(tabla_solicitudes))
+
         return JsonResponse({
             'message': f'Se actualizaron {updated_count} solicitudes exitosamente',
-            'updated_count': updated_count
+            'updated_count': updated_count,
+            'no_encontrados': [cod for cod in nuevos_estados if cod not in existentes],
         })
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)